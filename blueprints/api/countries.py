@@ -3,7 +3,7 @@ import logging
 from fastapi import HTTPException, status, Depends, APIRouter
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db  
+from database import get_read_db
 from services.country_postgres import CountryPostgres
 from services.leagues_postgres import LeaguePostgres
 from dotenv import load_dotenv
@@ -26,20 +26,18 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 
 @countries_router.get("/countries")
-async def get_countries(db: AsyncSession = Depends(get_db)):
+async def get_countries(db: AsyncSession = Depends(get_read_db)):
     try:
         country_postgres = CountryPostgres()
 
         logger.info("Fetching countries from database...")
 
-        countries = await country_postgres.get_all_countries(db)
+        json_countries = await country_postgres.get_all_countries_json(db)
 
         logger.info(
-            f"Countries process completed: obtained={len(countries)}"
+            f"Countries process completed: obtained={len(json_countries)}"
         )
 
-        json_countries = country_postgres.countries_to_json(countries)
-
         return JSONResponse(
             content={
                 "status": "success",
@@ -52,21 +50,18 @@ async def get_countries(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Unexpected error fetching database countries")
     
 @countries_router.get("/countries_with_league")
-async def get_countries_with_league(db: AsyncSession = Depends(get_db)):
+async def get_countries_with_league(db: AsyncSession = Depends(get_read_db)):
     try:
         league_postgres = LeaguePostgres()
-        country_postgres = CountryPostgres()
 
         logger.info("Fetching countries with leagues from database...")
 
-        countries = await league_postgres.get_all_countries_with_league(db)
+        json_countries = await league_postgres.get_all_countries_with_league_json(db)
 
         logger.info(
-            f"Countries process completed: obtained={len(countries)}"
+            f"Countries process completed: obtained={len(json_countries)}"
         )
 
-        json_countries = country_postgres.countries_to_json(countries)
-
         return JSONResponse(
             content={
                 "status": "success",
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_read_db
+from services.events_valkey import event_broker, league_channel, tournament_channel
+from services.tournament_postgres import TournamentPostgres
+from services.tournament_participation_postgres import TournamentParticipationPostgres
+from blueprints.auth.utils import get_optional_current_user, CurrentUser
+from settings import EVENTS_HEARTBEAT_SECONDS
+
+events_router = APIRouter()
+
+logger = logging.getLogger("events_logger")
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter(
+    '{"time": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s"}'
+)
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+# Milliseconds the browser's EventSource waits before reconnecting
+RECONNECT_DELAY_MS = 3000
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Proxies (nginx) must not buffer the stream
+    "X-Accel-Buffering": "no"
+}
+
+
+async def _event_stream(request: Request, channel: str):
+    queue = event_broker.subscribe(channel)
+    logger.info(f"Client subscribed to {channel} ({event_broker.subscriber_count()} on this worker)")
+    try:
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line, keeps idle connections open through proxies
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {data}\n\n"
+    finally:
+        event_broker.unsubscribe(channel, queue)
+
+
+def _sse_response(request: Request, channel: str) -> StreamingResponse:
+    return StreamingResponse(_event_stream(request, channel), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@events_router.get("/events/leagues/{league_id}")
+async def stream_league_events(league_id: int, request: Request):
+    """
+    Stream (Server-Sent Events) de cambios de resultado o estado de los
+    fixtures de una liga. Cada evento es un JSON:
+    {"type": "fixture", "fixture": {...}} con el mismo formato que GET /fixtures,
+    o {"type": "resync"} cuando el cliente debe volver a pedir los fixtures.
+    """
+    return _sse_response(request, league_channel(league_id))
+
+
+@events_router.get("/events/tournaments/{tournament_id}")
+async def stream_tournament_events(
+    tournament_id: int,
+    request: Request,
+    # Released before streaming, the stream itself never touches Postgres
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: Optional[CurrentUser] = Depends(get_optional_current_user)
+):
+    """
+    Stream (Server-Sent Events) de cambios del leaderboard de un torneo:
+    {"type": "leaderboard", "tournament_id", "changes": [entry + "rank" + "previous_rank"]}
+    con los participantes cuyos puntos o posición cambiaron, o {"type": "resync"}.
+    Mismos permisos que GET /tournaments/{id}/leaderboard.
+    """
+    tournament = await TournamentPostgres().get_tournament_by_id(db, tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tournament with id {tournament_id} not found")
+
+    if not getattr(tournament, 'is_public', True):
+        if not current_user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required for private tournament leaderboard")
+        if tournament.creator_id != current_user.id:
+            is_participant = await TournamentParticipationPostgres().is_participant(db, tournament_id, current_user.id)
+            if not is_participant:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied: you are not a participant in this private tournament")
+
+    return _sse_response(request, tournament_channel(tournament_id))
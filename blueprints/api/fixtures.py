@@ -3,24 +3,13 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
+from database import get_read_db
 from services.fixture_valkey import FixtureValkey
 from services.fixture_postgres import FixturePostgres
 from services.leagues_postgres import LeaguePostgres
 from services.round_postgres import RoundPostgres
 from models.fixtures.fixture import Fixture
-from dotenv import load_dotenv
-import os
-import valkey
-
-async def get_valkey_client():
-    """Create and return Valkey client using valkey library"""
-    load_dotenv()
-    valkey_uri = os.getenv("VALKEY_URI")
-    if not valkey_uri:
-        raise ValueError("VALKEY_URI not found in environment variables")
-    
-    return valkey.from_url(valkey_uri)
+from core.valkey_connection import get_valkey
 
 fixtures_router = APIRouter()
 
@@ -38,19 +27,20 @@ logger.addHandler(handler)
 async def get_fixtures_by_league_and_round(
     league_id: int = Query(..., description="ID de la liga"),
     round_name: str = Query(..., description="Nombre de la ronda"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Devuelve todos los fixtures de una liga y ronda específica.
     Ejemplo: /fixtures?league_id=39&round_name=Regular Season - 10
     """
     try:
-        fixture_valkey = FixtureValkey(await get_valkey_client())
+        fixture_valkey = FixtureValkey(valkey_client)
         league_postgres = LeaguePostgres()
         round_postgres = RoundPostgres()
 
         json_fixtures = await fixture_valkey.get_fixtures_by_league_and_round_and_teams(league_id, round_name, db)
-        league = await league_postgres.get_league_by_id(db, league_id)
+        league = await league_postgres.get_league_json_by_id(db, league_id)
         round = await round_postgres.get_round_by_name(db, round_name)
 
         logger.info(f"Process completed: obtained={len(json_fixtures)} fixtures")
@@ -58,7 +48,7 @@ async def get_fixtures_by_league_and_round(
         return JSONResponse(
             content={
                 "status": "success",
-                "league": league.to_json(),
+                "league": league,
                 "round": round.to_json(),
                 "fixtures": json_fixtures
             },
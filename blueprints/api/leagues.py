@@ -3,7 +3,7 @@ import logging
 from fastapi import HTTPException, status, Depends, APIRouter, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db  
+from database import get_read_db
 from services.leagues_postgres import LeaguePostgres
 from services.country_postgres import CountryPostgres
 from dotenv import load_dotenv
@@ -28,7 +28,7 @@ logger.addHandler(handler)
 @leagues_router.get("/leagues")
 async def get_leagues(
     country_name: str | None = Query(None, description="Filtrar por nombre de país (opcional)"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     try:
         leagues_postgres = LeaguePostgres()
@@ -36,18 +36,16 @@ async def get_leagues(
 
         if country_name:
             logger.info(f"Fetching leagues from database for country: {country_name}...")
-            leagues = await leagues_postgres.get_leagues_by_country(db, country_name)
+            json_leagues = await leagues_postgres.get_leagues_json_by_country(db, country_name)
         else:
             logger.info("Fetching all leagues from database...")
-            leagues = await leagues_postgres.get_all_leagues(db)
+            json_leagues = await leagues_postgres.get_all_leagues_json(db)
 
-        json_leagues = leagues_postgres.leagues_to_json(leagues)
-        logger.info(f"Leagues process completed. obtained={len(leagues)}")
+        logger.info(f"Leagues process completed. obtained={len(json_leagues)}")
 
         country_data = None
-        if country_name and leagues:
-            country = await country_postgres.get_country_by_name(db, json_leagues[0]["country"])
-            country_data = country.to_json()
+        if country_name and json_leagues:
+            country_data = await country_postgres.get_country_json_by_name(db, json_leagues[0]["country"])
 
         return JSONResponse(
             content={
@@ -67,7 +65,7 @@ async def get_leagues(
 @leagues_router.get("/leagues/{league_id}")
 async def get_league_by_id(
     league_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a league by its ID.
@@ -77,21 +75,14 @@ async def get_league_by_id(
         leagues_postgres = LeaguePostgres()
 
         logger.info(f"Fetching league from database for ID: {league_id}...")
-        league = await leagues_postgres.get_league_by_id(db, league_id)
+        league_json = await leagues_postgres.get_league_json_by_id(db, league_id)
 
-        if not league:
+        if not league_json:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"League with ID {league_id} not found."
             )
 
-        league_json = league.to_json() if hasattr(league, "to_json") else {
-            "id": league.id,
-            "name": league.name,
-            "country": league.country,
-            "season": league.season,
-        }
-
         logger.info(f"League fetched successfully: {league_json.get('name', 'unknown')}")
 
         return JSONResponse(
@@ -2,10 +2,9 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from database import get_db
+from database import get_db, get_read_db
 from services.prediction_postgres import PredictionPostgres
-from models.auth.auth_models import User
-from blueprints.auth.utils import get_current_user, get_optional_current_user
+from blueprints.auth.utils import get_current_user, get_optional_current_user, CurrentUser
 from schemas.prediction_schemas import (
     PredictionCreate,
     PredictionUpdate,
@@ -19,6 +18,8 @@ from schemas.prediction_schemas import (
 )
 from typing import Optional, List
 from datetime import datetime
+from services.leaderboard_valkey import LeaderboardValkey
+from core.valkey_connection import get_valkey
 
 predictions_router = APIRouter()
 
@@ -31,11 +32,21 @@ formatter = logging.Formatter(
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+async def _refresh_leaderboards(valkey_client, db: AsyncSession, prediction_service: PredictionPostgres, match_id: int, user_id: int):
+    """Refresh the user's materialized standings after their prediction count changed."""
+    try:
+        fixture = await prediction_service.get_match_by_id(db, match_id)
+        if fixture:
+            await LeaderboardValkey(valkey_client).apply_score_changes(db, fixture.league_id, [user_id])
+    except Exception as e:
+        logger.warning(f"Could not refresh leaderboards for user {user_id} after match {match_id}: {e}")
+
 @predictions_router.post("/predictions", response_model=PredictionResponse)
 async def create_or_update_prediction(
     prediction_data: PredictionCreate,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Create or update a prediction for a match.
@@ -77,6 +88,7 @@ async def create_or_update_prediction(
                 penalties_away=prediction_data.penalties_away
             )
             logger.info(f"Prediction created for user {current_user.username} on match {prediction_data.match_id}")
+            await _refresh_leaderboards(valkey_client, db, prediction_service, prediction_data.match_id, current_user.id)
         
         return prediction
         
@@ -98,8 +110,8 @@ async def get_user_predictions(
     round_id: Optional[int] = Query(None, description="Filter by round ID"),
     league_id: Optional[int] = Query(None, description="Filter by league ID"),
     match_id: Optional[int] = Query(None, description="Filter by match ID"),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all predictions for the current user.
@@ -164,8 +176,9 @@ async def get_user_predictions(
 @predictions_router.delete("/predictions/{match_id}")
 async def delete_prediction(
     match_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Delete a prediction for a specific match.
@@ -190,6 +203,7 @@ async def delete_prediction(
             )
         
         logger.info(f"Prediction deleted for user {current_user.username} on match {match_id}")
+        await _refresh_leaderboards(valkey_client, db, prediction_service, match_id, current_user.id)
         
         return {"message": "Prediction deleted successfully", "match_id": match_id}
         
@@ -210,8 +224,8 @@ async def delete_prediction(
 
 @predictions_router.get("/predictions/stats", response_model=PredictionStats)
 async def get_user_prediction_stats(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get prediction statistics for the current user.
@@ -244,8 +258,8 @@ async def get_user_prediction_stats(
 @predictions_router.get("/predictions/match/{match_id}", response_model=List[PredictionResponse])
 async def get_match_predictions(
     match_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all predictions for a specific match.
@@ -274,8 +288,8 @@ async def get_match_predictions(
 @predictions_router.get("/admin/predictions/match/{match_id}", response_model=List[AdminPredictionResponse])
 async def get_admin_match_predictions(
     match_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all predictions for a specific match (admin only).
@@ -337,7 +351,7 @@ async def get_admin_match_predictions(
 @predictions_router.post("/admin/predictions/score", response_model=ScoreCalculationResponse)
 async def calculate_match_scores(
     score_data: ScoreCalculationRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
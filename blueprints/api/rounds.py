@@ -3,15 +3,13 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
+from database import get_read_db
 from services.fixture_valkey import FixtureValkey
 from services.fixture_postgres import FixturePostgres
 from services.leagues_postgres import LeaguePostgres
 from services.round_postgres import RoundPostgres
 from models.fixtures.fixture import Fixture
-from dotenv import load_dotenv
-import os
-import valkey
+from core.valkey_connection import get_valkey
 
 
 rounds_router = APIRouter()
@@ -30,19 +28,20 @@ logger.addHandler(handler)
 async def get_fixtures_by_league_and_round(
     league_id: int = Query(..., description="ID de la liga"),
     round_name: str = Query(..., description="Nombre de la ronda"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Devuelve todos los fixtures de una liga y ronda específica.
     Ejemplo: /fixtures?league_id=39&round_name=Regular Season - 10
     """
     try:
-        fixture_valkey = FixtureValkey(await get_valkey_client())
+        fixture_valkey = FixtureValkey(valkey_client)
         league_postgres = LeaguePostgres()
         round_postgres = RoundPostgres()
 
         json_fixtures = await fixture_valkey.get_fixtures_by_league_and_round_and_teams(league_id, round_name, db)
-        league = await league_postgres.get_league_by_id(db, league_id)
+        league = await league_postgres.get_league_json_by_id(db, league_id)
         round = await round_postgres.get_round_by_name(db, round_name)
 
         logger.info(f"Process completed: obtained={len(json_fixtures)} fixtures")
@@ -50,7 +49,7 @@ async def get_fixtures_by_league_and_round(
         return JSONResponse(
             content={
                 "status": "success",
-                "league": league.to_json(),
+                "league": league,
                 "round": round.to_json(),
                 "fixtures": json_fixtures
             },
@@ -65,7 +64,7 @@ async def get_fixtures_by_league_and_round(
 async def get_rounds_by_league(
     league_id: int = Query(..., description="ID de la liga"),
     season: int = Query(None, description="Temporada (opcional)"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Devuelve todas las rondas de una liga específica.
@@ -77,7 +76,7 @@ async def get_rounds_by_league(
         league_postgres = LeaguePostgres()
 
         # Obtener la liga para validar que existe
-        league = await league_postgres.get_league_by_id(db, league_id)
+        league = await league_postgres.get_league_json_by_id(db, league_id)
         if not league:
             raise HTTPException(status_code=404, detail=f"League with ID {league_id} not found")
 
@@ -90,7 +89,7 @@ async def get_rounds_by_league(
         return JSONResponse(
             content={
                 "status": "success",
-                "league": league.to_json(),
+                "league": league,
                 "rounds": json_rounds,
                 "count": len(rounds)
             },
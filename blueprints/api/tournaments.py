@@ -3,12 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from database import get_db
+from database import get_db, get_read_db, AsyncSessionLocal
 from services.tournament_postgres import TournamentPostgres
 from services.tournament_participation_postgres import TournamentParticipationPostgres
 from services.leagues_postgres import LeaguePostgres
 from models.auth.auth_models import User
-from blueprints.auth.utils import get_current_user, get_optional_current_user
+from blueprints.auth.utils import get_current_user, get_optional_current_user, CurrentUser
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
@@ -24,9 +24,8 @@ from schemas.tournament_schemas import (
     TournamentVisibilityResponse
 )
 from schemas.tournament_schemas import TournamentLeaderboardEntry
-
-from services.prediction_postgres import PredictionPostgres
-from models.fixtures.fixture_status import FixtureStatus
+from services.leaderboard_valkey import LeaderboardValkey
+from core.valkey_connection import get_valkey
 
 # Request model for partial updates
 class TournamentUpdate(BaseModel):
@@ -69,10 +68,24 @@ formatter = logging.Formatter(
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+async def _sync_leaderboard_participant(valkey_client, db: AsyncSession, tournament, user_id: int, joined: bool):
+    """Keep the materialized leaderboard in sync with membership changes.
+
+    Failures are only logged, the leaderboard can be rebuilt from Postgres.
+    """
+    try:
+        leaderboard = LeaderboardValkey(valkey_client)
+        if joined:
+            await leaderboard.update_participants(db, tournament.id, tournament.league_id, [user_id])
+        else:
+            await leaderboard.remove_participant(tournament.id, user_id)
+    except Exception as e:
+        logger.warning(f"Could not update leaderboard of tournament {tournament.id} for user {user_id}: {e}")
+
 @tournaments_router.get("/tournaments", response_model=List[TournamentResponse])
 async def get_public_tournaments(
     league_id: Optional[int] = Query(None, description="Filter by league ID (optional)"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all public tournaments.
@@ -102,7 +115,7 @@ async def get_public_tournaments(
 @tournaments_router.post("/tournaments", response_model=TournamentResponse)
 async def create_tournament(
     tournament_data: TournamentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -172,8 +185,8 @@ async def create_tournament(
 
 @tournaments_router.get("/tournaments/my", response_model=List[TournamentResponse])
 async def get_my_tournaments(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all tournaments where the current user is a participant.
@@ -197,7 +210,8 @@ async def get_my_tournaments(
 @tournaments_router.get("/tournaments/{tournament_id}", response_model=TournamentResponse)
 async def get_tournament_by_id(
     tournament_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_current_user)
 ):
     """
     Get a specific tournament by ID.
@@ -219,7 +233,6 @@ async def get_tournament_by_id(
             return tournament
 
         # Private tournament: require authentication and membership
-        current_user = await get_optional_current_user(db=db)
         if not current_user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required for private tournament")
 
@@ -249,8 +262,9 @@ async def get_tournament_by_id(
 @tournaments_router.post("/tournaments/{tournament_id}/join", response_model=TournamentJoinResponse)
 async def join_tournament(
     tournament_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Join a tournament.
@@ -282,6 +296,7 @@ async def join_tournament(
         
         # Join the tournament
         participation = await participation_service.join_tournament(db, tournament_id, current_user.id)
+        await _sync_leaderboard_participant(valkey_client, db, tournament, current_user.id, joined=True)
         
         logger.info(f"User {current_user.username} successfully joined tournament {tournament.name}")
         
@@ -311,7 +326,7 @@ async def join_tournament(
 async def update_tournament(
     tournament_id: int,
     update_data: TournamentUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update tournament information (only creator can update)."""
@@ -338,8 +353,9 @@ async def update_tournament(
 @tournaments_router.delete("/tournaments/{tournament_id}/leave", response_model=TournamentLeaveResponse)
 async def leave_tournament(
     tournament_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Leave a tournament.
@@ -370,6 +386,8 @@ async def leave_tournament(
         
         # Leave the tournament
         success = await participation_service.leave_tournament(db, tournament_id, current_user.id)
+        if success:
+            await _sync_leaderboard_participant(valkey_client, db, tournament, current_user.id, joined=False)
         
         if not success:
             logger.warning(f"User {current_user.id} was not a participant in tournament {tournament_id}")
@@ -397,8 +415,9 @@ async def leave_tournament(
 @tournaments_router.delete("/tournaments/{tournament_id}", response_model=TournamentDeleteResponse)
 async def delete_tournament(
     tournament_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Delete a tournament.
@@ -430,6 +449,11 @@ async def delete_tournament(
         
         # Delete the tournament (cascade deletes participants)
         success = await participation_service.delete_tournament(db, tournament_id)
+        if success:
+            try:
+                await LeaderboardValkey(valkey_client).delete(tournament_id)
+            except Exception as e:
+                logger.warning(f"Could not delete leaderboard of tournament {tournament_id}: {e}")
         
         if not success:
             logger.error(f"Failed to delete tournament {tournament_id}")
@@ -458,8 +482,9 @@ async def delete_tournament(
 async def remove_participant(
     tournament_id: int,
     user_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Remove a participant from a tournament.
@@ -499,6 +524,8 @@ async def remove_participant(
         
         # Remove the participant
         success = await participation_service.remove_participant(db, tournament_id, user_id)
+        if success:
+            await _sync_leaderboard_participant(valkey_client, db, tournament, user_id, joined=False)
         
         if not success:
             logger.warning(f"User {user_id} was not a participant in tournament {tournament_id}")
@@ -527,8 +554,8 @@ async def remove_participant(
 @tournaments_router.get("/tournaments/{tournament_id}/participants", response_model=List[ParticipantOut])
 async def get_tournament_participants(
     tournament_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_current_user)
 ):
     """
     Get all participants of a tournament.
@@ -586,8 +613,9 @@ async def get_tournament_participants(
 async def invite_user_to_tournament(
     tournament_id: int,
     invite_data: TournamentInviteRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Invite a user to a tournament.
@@ -638,6 +666,7 @@ async def invite_user_to_tournament(
         # For now, directly add the user to the tournament
         # In the future, this could create an invitation that requires acceptance
         participation = await participation_service.join_tournament(db, tournament_id, invite_data.user_id)
+        await _sync_leaderboard_participant(valkey_client, db, tournament, invite_data.user_id, joined=True)
         
         logger.info(f"User {invite_data.user_id} invited to tournament {tournament.name} by creator {current_user.username}")
         
@@ -666,17 +695,22 @@ async def invite_user_to_tournament(
 @tournaments_router.get("/tournaments/{tournament_id}/leaderboard", response_model=List[TournamentLeaderboardEntry])
 async def get_tournament_leaderboard(
     tournament_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (all entries when omitted)"),
+    offset: int = Query(0, ge=0, description="Entries to skip"),
+    around_me: bool = Query(False, description="Return the entries around the current user"),
+    radius: int = Query(5, ge=1, le=50, description="Entries above and below the user when around_me is set"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[CurrentUser] = Depends(get_optional_current_user),
+    valkey_client = Depends(get_valkey)
 ):
     """
     Get leaderboard for a tournament (ranked by total points).
+    Served from the materialized standings in Valkey, built from Postgres on first read.
     Public endpoint for public tournaments. Private tournaments require membership.
     """
     try:
         tournament_service = TournamentPostgres()
         participation_service = TournamentParticipationPostgres()
-        prediction_service = PredictionPostgres()
 
         tournament = await tournament_service.get_tournament_by_id(db, tournament_id)
         if not tournament:
@@ -692,54 +726,30 @@ async def get_tournament_leaderboard(
                 if not is_participant:
                     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied: you are not a participant in this private tournament")
 
-        # Get participants
-        participants = await participation_service.get_tournament_participants(db, tournament_id)
+        if around_me and not current_user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required for around_me")
 
-        leaderboard = []
-        # For each participant, gather prediction stats for this tournament's league
-        for participation in participants:
-            user = participation.user
-            # get predictions with match details filtered by league
-            preds_with_details = await prediction_service.get_predictions_with_match_details(db, user.id, league_id=getattr(tournament, 'league_id', None))
-
-            total_points = 0
-            total_preds = 0
-            correct_preds = 0
-
-            for pred, fixture, *_rest in preds_with_details:
-                # Only consider finished fixtures for correctness
-                if getattr(fixture, 'status', None) != FixtureStatus.FT:
-                    # Still count prediction, but points may be None until calculated
-                    pass
-                pts = getattr(pred, 'points', None)
-                total_points += 0 if pts is None else int(pts)
-                total_preds += 1
-
-                # Correct prediction if exact score matches fixture final score
-                if getattr(fixture, 'home_team_score', None) is not None and getattr(fixture, 'away_team_score', None) is not None:
-                    if getattr(pred, 'goals_home', None) == getattr(fixture, 'home_team_score') and getattr(pred, 'goals_away', None) == getattr(fixture, 'away_team_score'):
-                        correct_preds += 1
-
-            leaderboard.append({
-                'username': user.username,
-                'points': total_points,
-                'correct_predictions': correct_preds,
-                'total_predictions': total_preds
-            })
-
-        # Sort by points desc, then by correct_predictions desc
-        leaderboard.sort(key=lambda x: (x['points'], x['correct_predictions']), reverse=True)
-
-        # Attach rank
-        response = []
-        for idx, row in enumerate(leaderboard, start=1):
-            response.append(TournamentLeaderboardEntry(
-                rank=idx,
-                username=row['username'],
-                points=row['points'],
-                correct_predictions=row['correct_predictions'],
-                total_predictions=row['total_predictions']
-            ))
+        try:
+            leaderboard_store = LeaderboardValkey(valkey_client)
+            if not await leaderboard_store.is_built(tournament_id):
+                # The materialized standings outlive this request, build them from the primary
+                async with AsyncSessionLocal() as primary_db:
+                    await leaderboard_store.rebuild(primary_db, tournament)
+
+            if around_me:
+                leaderboard = await leaderboard_store.get_around_user(tournament_id, current_user.id, radius)
+            else:
+                leaderboard = await leaderboard_store.get_page(tournament_id, offset, limit)
+        except Exception as e:
+            logger.warning(f"Leaderboard store unavailable for tournament {tournament_id}, using Postgres: {e}")
+            if around_me:
+                leaderboard = await tournament_service.get_leaderboard(db, tournament_id, tournament.league_id)
+                position = next((i for i, row in enumerate(leaderboard) if row["user_id"] == current_user.id), None)
+                leaderboard = [] if position is None else leaderboard[max(position - radius, 0):position + radius + 1]
+            else:
+                leaderboard = await tournament_service.get_leaderboard(db, tournament_id, tournament.league_id, offset, limit)
+
+        response = [TournamentLeaderboardEntry(**row) for row in leaderboard]
 
         return response
 
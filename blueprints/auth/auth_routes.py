@@ -1,11 +1,20 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select
 from datetime import datetime, timedelta
 from database import get_db
-from models.auth.auth_models import Token, User
-from blueprints.auth.utils import hash_password, verify_password
+from models.auth.auth_models import User
+from blueprints.auth.utils import hash_password, verify_password, password_needs_rehash, token_claims, CurrentUser, get_current_user, get_token_version
 from blueprints.auth.jwt_handler import create_access_token, create_refresh_token, decode_jwt
+from core.valkey_connection import get_valkey
+from services.auth_valkey import AuthValkey, hash_token
+from services.token_postgres import TokenPostgres
+from settings import REFRESH_TOKEN_EXPIRE_DAYS
+
+logger = logging.getLogger("auth_logger")
+
+REFRESH_TOKEN_TTL_SECONDS = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
 
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -49,7 +58,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         email=user_data.email,
         username=user_data.username,   # guardamos el username
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password(user_data.password),
     )
     db.add(user)
     await db.commit()
@@ -61,33 +70,47 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 async def login(
     user_data: UserLogin, 
     user_agent: str | None = Header(None),  # capturamos User-Agent
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
 ):
     # Buscar usuario por username
     user = await db.scalar(select(User).where(User.email == user_data.email))
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user or not await verify_password(user_data.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
 
-    # Crear tokens
-    access_token = create_access_token({"user_id": user.id, "username": user.username})
-    refresh_token = create_refresh_token({ "user_id": user.id, "username": user.username})
-
-    # Guardar refresh token en la base con User-Agent
-    token_entry = Token(
+    # Si cambió el método o el costo configurado, aprovechamos que tenemos la contraseña
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password(user_data.password)
+
+    # Crear tokens con la versión vigente del usuario
+    auth_valkey = AuthValkey(valkey_client)
+    version = await get_token_version(user.id, valkey_client, db)
+    claims = token_claims(user, version)
+    access_token = create_access_token(claims)
+    refresh_token = create_refresh_token(claims)
+
+    # Guardar el hash del refresh token en la base (respaldo) con User-Agent...
+    token_hash = hash_token(refresh_token)
+    TokenPostgres().add_token(
+        db,
         user_id=user.id,
-        refresh_token=refresh_token,
-        expires_at=datetime.utcnow() + timedelta(days=7),
-        revoked=False,
+        token_hash=token_hash,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
         user_agent=user_agent
     )
-    db.add(token_entry)
     await db.commit()
 
+    # ...y en Valkey, que lo vence solo
+    try:
+        await auth_valkey.store_refresh_token(token_hash, user.id, REFRESH_TOKEN_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not store refresh token in Valkey, Postgres fallback only: {e}")
+
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 
 @auth_router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db), valkey_client = Depends(get_valkey)):
     try:
         payload = decode_jwt(refresh_token)
         if payload.get("type") != "refresh":
@@ -95,33 +118,82 @@ async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
 
-    user_id = int(payload.get("sub"))
-    db_token = await db.scalar(
-        select(Token).where(
-            Token.refresh_token == refresh_token,
-            Token.revoked == False,
-            Token.expires_at > datetime.utcnow()
-        )
-    )
+    user_id = int(payload.get("user_id"))
+    version = int(payload.get("ver", 0))
+    token_hash = hash_token(refresh_token)
+    auth_valkey = AuthValkey(valkey_client)
 
-    if not db_token:
-        raise HTTPException(status_code=401, detail="Refresh token inválido o expirado")
+    if await get_token_version(user_id, valkey_client, db) != version:
+        raise HTTPException(status_code=401, detail="Refresh token revocado")
 
-    new_access_token = create_access_token({"sub": str(user_id)})
+    try:
+        active_user_id = await auth_valkey.get_refresh_token_user(token_hash)
+    except Exception as e:
+        logger.warning(f"Refresh token store unavailable, falling back to database: {e}")
+        active_user_id = None
+
+    if active_user_id != user_id:
+        # Not in Valkey (flushed, stored while it was down, or a legacy token)
+        db_token = await TokenPostgres().get_active_token(db, token_hash, refresh_token)
+        if not db_token or db_token.user_id != user_id:
+            raise HTTPException(status_code=401, detail="Refresh token inválido o expirado")
+        try:
+            remaining = int((db_token.expires_at - datetime.utcnow()).total_seconds())
+            await auth_valkey.store_refresh_token(token_hash, user_id, max(remaining, 1))
+        except Exception as e:
+            logger.warning(f"Could not restore refresh token in Valkey: {e}")
+
+    new_access_token = create_access_token(token_claims(CurrentUser(user_id, payload.get("username")), version))
     return {"access_token": new_access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 
 # --- LOGOUT ---
 @auth_router.post("/logout")
-async def logout(refresh_token: str, db: AsyncSession = Depends(get_db)):
-    db_token = await db.scalar(select(Token).where(Token.refresh_token == refresh_token))
-    if not db_token:
-        raise HTTPException(status_code=404, detail="Token no encontrado")
+async def logout(refresh_token: str, db: AsyncSession = Depends(get_db), valkey_client = Depends(get_valkey)):
+    token_hash = hash_token(refresh_token)
+    auth_valkey = AuthValkey(valkey_client)
 
     # Revocar token
-    await db.execute(
-        update(Token).where(Token.id == db_token.id).values(revoked=True)
-    )
-    await db.commit()
+    user_id = await TokenPostgres().revoke_token(db, token_hash, refresh_token)
+    try:
+        if user_id is None:
+            user_id = await auth_valkey.get_refresh_token_user(token_hash)
+        if user_id is not None:
+            await auth_valkey.revoke_refresh_token(token_hash, user_id)
+    except Exception as e:
+        logger.warning(f"Could not revoke refresh token in Valkey: {e}")
+
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Token no encontrado")
 
     return {"detail": "Sesión cerrada correctamente"}
+
+
+@auth_router.post("/logout-all")
+async def logout_all(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    valkey_client = Depends(get_valkey)
+):
+    """Cierra todas las sesiones del usuario: refresh tokens y access tokens ya emitidos."""
+    token_postgres = TokenPostgres()
+    revoked = await token_postgres.revoke_all_tokens(db, current_user.id)
+
+    auth_valkey = AuthValkey(valkey_client)
+    try:
+        # Versions cached before the column existed may be ahead of it
+        cached_version = await auth_valkey.get_token_version(current_user.id)
+    except Exception as e:
+        logger.warning(f"Token version cache unavailable: {e}")
+        cached_version = None
+    version = await token_postgres.bump_token_version(db, current_user.id, floor=cached_version or 0)
+    logger.info(f"Token version of user {current_user.id} bumped to {version}")
+
+    try:
+        await auth_valkey.cache_token_version(current_user.id, version)
+    except Exception as e:
+        # The stale cached version expires after TOKEN_VERSION_TTL_SECONDS
+        logger.warning(f"Could not cache token version in Valkey: {e}")
+    revoked = max(revoked, await auth_valkey.revoke_all_refresh_tokens(current_user.id))
+
+    return {"detail": "Todas las sesiones fueron cerradas", "revoked_sessions": revoked}
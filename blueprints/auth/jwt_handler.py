@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 import os
+import uuid
 import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError
 from settings import JWT_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
@@ -16,7 +17,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 def create_refresh_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # jti keeps two logins within the same second from producing the same token
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, JWT_KEY, algorithm=ALGORITHM)
 
 def decode_jwt(token: str) -> dict:
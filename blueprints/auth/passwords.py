@@ -0,0 +1,30 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from settings import PASSWORD_HASH_ITERATIONS, PASSWORD_HASH_WORKERS
+
+# Werkzeug method string, e.g. "pbkdf2:sha256:600000"; stored hashes start with it
+PASSWORD_HASH_METHOD = f"pbkdf2:sha256:{PASSWORD_HASH_ITERATIONS}"
+
+# PBKDF2 (hashlib) releases the GIL, so a few threads keep the event loop free
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+async def hash_password(password: str) -> str:
+    """
+    Genera un hash PBKDF2-HMAC-SHA256 con PASSWORD_HASH_ITERATIONS
+    iteraciones, en el pool de hilos para no bloquear el event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    """
+    Verifica si la contraseña 'plain' coincide con el hash almacenado
+    (cualquier método que entienda Werkzeug), en el pool de hilos.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, check_password_hash, hashed, plain)
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True si el hash se generó con otro método o costo que el configurado."""
+    return hashed.split("$", 1)[0] != PASSWORD_HASH_METHOD
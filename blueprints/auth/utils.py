@@ -1,4 +1,4 @@
-from werkzeug.security import generate_password_hash, check_password_hash
+import logging
 from fastapi import HTTPException, status, Header, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -6,50 +6,105 @@ from typing import Optional
 from database import get_db
 from models.auth.auth_models import User
 from blueprints.auth.jwt_handler import decode_jwt
+from blueprints.auth.passwords import hash_password, verify_password, password_needs_rehash
+from core.valkey_connection import get_valkey
+from services.auth_valkey import AuthValkey
+from services.token_postgres import TokenPostgres
+from settings import AUTH_TRUST_TOKEN_CLAIMS
 
-def hash_password(password: str) -> str:
+logger = logging.getLogger("auth_logger")
+
+class CurrentUser:
+    """
+    Usuario autenticado según los claims firmados del access token. Solo
+    tiene lo que viaja en el token (id y username), no es el modelo User.
+    """
+
+    def __init__(self, id: int, username: str | None):
+        self.id = id
+        self.username = username
+
+    def __repr__(self):
+        return f"CurrentUser(id={self.id}, username={self.username!r})"
+
+def token_claims(user, version: int) -> dict:
+    """Claims de identidad que llevan los access y refresh tokens."""
+    return {"user_id": user.id, "username": user.username, "ver": version}
+
+async def _cache_token_version(auth_valkey: AuthValkey, user_id: int, version: int):
+    try:
+        await auth_valkey.cache_token_version(user_id, version)
+    except Exception as e:
+        logger.warning(f"Could not cache token version of user {user_id}: {e}")
+
+async def get_token_version(user_id: int, valkey_client, db: AsyncSession) -> int:
     """
-    Genera un hash seguro usando PBKDF2-HMAC-SHA256 (por defecto de Werkzeug).
+    Versión vigente de los tokens del usuario: la de Valkey si está
+    cacheada, si no (flush, key vencida o Valkey caído) la de Postgres.
     """
-    return generate_password_hash(password)
+    auth_valkey = AuthValkey(valkey_client)
+    try:
+        version = await auth_valkey.get_token_version(user_id)
+    except Exception as e:
+        logger.warning(f"Token version cache unavailable, reading it from database: {e}")
+        return await TokenPostgres().get_token_version(db, user_id)
+    if version is None:
+        version = await TokenPostgres().get_token_version(db, user_id)
+        await _cache_token_version(auth_valkey, user_id, version)
+    return version
 
-def verify_password(plain: str, hashed: str) -> bool:
+async def _user_from_token(authorization: str, valkey_client, db: AsyncSession) -> CurrentUser:
     """
-    Verifica si la contraseña 'plain' coincide con el hash almacenado.
+    Valida el token y devuelve el usuario. Con AUTH_TRUST_TOKEN_CLAIMS se
+    confía en los claims y solo se compara la versión del token contra la
+    cacheada en Valkey (sin SQL); si no está cacheada, Valkey no responde o
+    el modo está apagado, se busca el usuario en Postgres y se compara contra
+    users.token_version.
     """
-    return check_password_hash(hashed, plain)
+    if not authorization.startswith("Bearer "):
+        raise ValueError("Invalid authorization header format")
+
+    payload = decode_jwt(authorization.split(" ")[1])
+    if payload.get("type") != "access":
+        raise ValueError("Tipo de token inválido")
+    user_id = int(payload.get("user_id"))
+    version = int(payload.get("ver", 0))
+
+    auth_valkey = AuthValkey(valkey_client)
+    cached_version = None
+    if AUTH_TRUST_TOKEN_CLAIMS:
+        try:
+            cached_version = await auth_valkey.get_token_version(user_id)
+        except Exception as e:
+            logger.warning(f"Token version check unavailable, falling back to database: {e}")
+            auth_valkey = None
+        if cached_version is not None:
+            if version != cached_version:
+                raise ValueError("Token revocado")
+            return CurrentUser(user_id, payload.get("username"))
+
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user:
+        raise LookupError("User not found")
+    if AUTH_TRUST_TOKEN_CLAIMS and auth_valkey is not None:
+        await _cache_token_version(auth_valkey, user.id, user.token_version)
+    if version != user.token_version:
+        raise ValueError("Token revocado")
+    return CurrentUser(user.id, user.username)
 
 async def get_current_user(
     authorization: str = Header(..., description="Bearer token"),
+    valkey_client = Depends(get_valkey),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> CurrentUser:
     """Extract and validate user from JWT token. Returns user or raises HTTPException."""
     try:
-        # Extract token from "Bearer <token>" format
-        if not authorization.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authorization header format"
-            )
-        
-        token = authorization.split(" ")[1]
-        
-        # Decode JWT token
-        payload = decode_jwt(token)
-        user_id = int(payload.get("user_id"))
-        
-        # Get user from database
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        return user
-        
+        return await _user_from_token(authorization, valkey_client, db)
+    except LookupError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,20 +118,15 @@ async def get_current_user(
 
 async def get_optional_current_user(
     authorization: Optional[str] = Header(None, description="Optional Bearer token"),
+    valkey_client = Depends(get_valkey),
     db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CurrentUser]:
     """Attempt to extract and validate a user from the Authorization header.
     Returns None when no header is provided or when token is invalid.
     """
     if not authorization:
         return None
     try:
-        if not authorization.startswith("Bearer "):
-            return None
-        token = authorization.split(" ")[1]
-        payload = decode_jwt(token)
-        user_id = int(payload.get("user_id"))
-        user = await db.scalar(select(User).where(User.id == user_id))
-        return user
+        return await _user_from_token(authorization, valkey_client, db)
     except Exception:
         return None
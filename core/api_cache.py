@@ -0,0 +1,205 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from settings import API_CACHE_DIR, API_FOOTBALL_OFFLINE, API_CACHE_KEEP_RECORDINGS
+
+logger = logging.getLogger("api_football_cache")
+
+# TTL (segundos) de cada endpoint. Los que no figuran no se cachean.
+ENDPOINT_TTLS = {
+    "countries": 7 * 24 * 3600,
+    "leagues": 24 * 3600,
+    "teams": 24 * 3600,
+    "fixtures/rounds": 24 * 3600,
+    "fixtures": 10 * 60,
+}
+
+
+# Ingest markers unused for this long are dropped. Losing one only costs a
+# redundant (idempotent) database write the next time that request runs.
+INGEST_MARKER_MAX_AGE = 30 * 24 * 3600
+# Leftovers of a write interrupted before os.replace
+TMP_FILE_MAX_AGE = 3600
+
+
+class OfflineCacheMiss(LookupError):
+    """Offline mode is on and the request was never recorded."""
+
+
+class ApiResponse(list):
+    """
+    Lista de items de API-Football con la metadata de caché: la clave de la
+    request, el hash del contenido y el bloque `paging`. Se comporta como la
+    lista de siempre.
+    """
+
+    def __init__(self, items, cache_key: str, content_hash: str, from_cache: bool = False, paging: dict | None = None):
+        super().__init__(items)
+        self.cache_key = cache_key
+        self.content_hash = content_hash
+        self.from_cache = from_cache
+        self.paging = paging
+
+
+def content_hash(items) -> str:
+    return hashlib.sha256(json.dumps(items, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Caché en disco de respuestas de API-Football, un archivo gzip por
+    endpoint + query string.
+
+    Además guarda, por request, el hash del último payload que se escribió en
+    la base (`mark_ingested`), así los jobs pueden saltear la escritura cuando
+    el contenido no cambió (`is_ingested`).
+
+    En modo offline nunca se sale a la red: se sirve lo grabado aunque esté
+    vencido y una request sin grabar levanta OfflineCacheMiss. Sirve para
+    reproducir y medir el pipeline de ingesta sin red ni cuota.
+    """
+
+    def __init__(
+        self,
+        directory: str = API_CACHE_DIR,
+        offline: bool = API_FOOTBALL_OFFLINE,
+        keep_recordings: bool = API_CACHE_KEEP_RECORDINGS
+    ):
+        self.directory = directory
+        self.offline = offline
+        self.keep_recordings = keep_recordings
+
+    def key(self, path: str, params: dict | None) -> str:
+        query = json.dumps({k: str(v) for k, v in (params or {}).items()}, sort_keys=True)
+        return hashlib.sha256(f"{path}?{query}".encode()).hexdigest()
+
+    def _file(self, path: str, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, path.replace("/", "_"), f"{key}{suffix}")
+
+    def ttl(self, path: str) -> int:
+        return ENDPOINT_TTLS.get(path, 0)
+
+    def _read(self, file_path: str):
+        try:
+            with gzip.open(file_path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache file {file_path}: {e}")
+            return None
+
+    def _write(self, file_path: str, entry: dict):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, file_path)
+
+    async def get(self, path: str, params: dict | None) -> ApiResponse | None:
+        """Respuesta grabada si sigue vigente (o cualquiera en modo offline)."""
+        if not self.offline and not self.ttl(path):
+            return None
+
+        key = self.key(path, params)
+        entry = await asyncio.to_thread(self._read, self._file(path, key, ".json.gz"))
+        if entry is None:
+            if self.offline:
+                raise OfflineCacheMiss(f"No recorded response for {path} {params}")
+            return None
+
+        if not self.offline and time.time() - entry["fetched_at"] > self.ttl(path):
+            return None
+
+        return ApiResponse(entry["items"], key, entry["content_hash"], from_cache=True, paging=entry.get("paging"))
+
+    def wrap(self, path: str, params: dict | None, items: list, paging: dict | None = None) -> ApiResponse:
+        """ApiResponse de una respuesta que no se guarda en disco."""
+        return ApiResponse(items, self.key(path, params), content_hash(items), paging=paging)
+
+    async def set(self, path: str, params: dict | None, items: list, paging: dict | None = None) -> ApiResponse:
+        response = self.wrap(path, params, items, paging)
+        if self.ttl(path):
+            entry = {
+                "path": path,
+                "params": {k: str(v) for k, v in (params or {}).items()},
+                "fetched_at": time.time(),
+                "content_hash": response.content_hash,
+                "paging": paging,
+                "items": items,
+            }
+            try:
+                await asyncio.to_thread(self._write, self._file(path, response.cache_key, ".json.gz"), entry)
+            except OSError as e:
+                logger.warning(f"Could not write cache entry for {path}: {e}")
+        return response
+
+    def _read_marker(self, file_path: str) -> str | None:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _write_marker(self, file_path: str, value: str):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(value)
+
+    async def is_ingested(self, response) -> bool:
+        """True si este mismo contenido ya se escribió en la base."""
+        if self.offline or not isinstance(response, ApiResponse):
+            # Offline replay always runs the whole pipeline
+            return False
+        path = self._marker_path(response)
+        return await asyncio.to_thread(self._read_marker, path) == response.content_hash
+
+    async def mark_ingested(self, response):
+        if not isinstance(response, ApiResponse):
+            return
+        try:
+            await asyncio.to_thread(self._write_marker, self._marker_path(response), response.content_hash)
+        except OSError as e:
+            logger.warning(f"Could not write ingest marker: {e}")
+
+    def _marker_path(self, response: ApiResponse) -> str:
+        return os.path.join(self.directory, "ingested", f"{response.cache_key}.sha256")
+
+    def _prune(self) -> int:
+        now = time.time()
+        max_ages = {path.replace("/", "_"): ttl for path, ttl in ENDPOINT_TTLS.items()}
+        max_ages["ingested"] = INGEST_MARKER_MAX_AGE
+        removed = 0
+        for directory, max_age in max_ages.items():
+            try:
+                entries = list(os.scandir(os.path.join(self.directory, directory)))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                limit = TMP_FILE_MAX_AGE if entry.name.endswith(".tmp") else max_age
+                try:
+                    # Files are written in one os.replace, mtime is the fetch time
+                    if now - entry.stat().st_mtime > limit:
+                        os.remove(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    async def prune(self) -> int:
+        """
+        Borra las respuestas vencidas (las de fixtures por rango de fechas
+        cambian de clave y si no se acumularían sin límite) y los marcadores
+        de ingesta viejos. Con offline o keep_recordings no borra nada: lo
+        grabado es lo que se reproduce. Devuelve cuántos archivos borró.
+        """
+        if self.offline or self.keep_recordings:
+            return 0
+        return await asyncio.to_thread(self._prune)
+
+
+response_cache = ResponseCache()
@@ -1,51 +1,231 @@
-import requests
+import asyncio
+import logging
 import os
+import random
+import time
+import httpx
 from dotenv import load_dotenv
+from core.api_cache import ApiResponse, content_hash, response_cache
+from core.json_stream import ResponseStreamParser
+from settings import (
+    API_FOOTBALL_RATE_PER_MINUTE,
+    API_FOOTBALL_MAX_CONCURRENCY,
+    API_FOOTBALL_MAX_RETRIES,
+    API_FOOTBALL_TIMEOUT_SECONDS,
+)
 
 load_dotenv()
 
 secret_key = os.getenv("FOOTBALL_API_KEY")
 
+logger = logging.getLogger("api_football_client")
+
+# Respuestas que vale la pena reintentar
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BACKOFF_SECONDS = 1.0
+RETRY_BACKOFF_MAX_SECONDS = 60.0
+
+# Límite de la API para /fixtures?ids=
+FIXTURE_IDS_PER_REQUEST = 20
+
+
+class ApiFootballError(Exception):
+    """
+    API-Football answered 200 with a non-empty `errors` block (quota, key or
+    plan problems). The page is empty, so it must not be cached as data.
+    """
+
+
+class TokenBucket:
+    """
+    Limitador token-bucket para respetar la cuota por minuto del plan de
+    RapidAPI. Se recarga `rate_per_minute / 60` tokens por segundo hasta
+    `capacity`; cada request consume uno.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, min(rate_per_minute, API_FOOTBALL_MAX_CONCURRENCY))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_client: httpx.AsyncClient | None = None
+_rate_limiter: TokenBucket | None = None
+_semaphore: asyncio.Semaphore | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP compartido (keep-alive) para todas las llamadas a API-Football."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=API_FOOTBALL_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=API_FOOTBALL_MAX_CONCURRENCY,
+                max_keepalive_connections=API_FOOTBALL_MAX_CONCURRENCY
+            )
+        )
+    return _client
+
+def _get_rate_limiter() -> TokenBucket:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = TokenBucket(API_FOOTBALL_RATE_PER_MINUTE)
+    return _rate_limiter
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(API_FOOTBALL_MAX_CONCURRENCY)
+    return _semaphore
+
+async def close_http_client():
+    global _client, _rate_limiter, _semaphore
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _rate_limiter = None
+    _semaphore = None
+
+
+def _retry_delay(response: httpx.Response | None, attempt: int) -> float:
+    """Backoff exponencial con jitter; respeta Retry-After si viene en la respuesta."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_BACKOFF_MAX_SECONDS)
+            except ValueError:
+                pass
+    delay = RETRY_BACKOFF_SECONDS * (2 ** attempt)
+    return min(delay, RETRY_BACKOFF_MAX_SECONDS) + random.uniform(0, RETRY_BACKOFF_SECONDS)
+
+
 class apiFutbolServicio():
+    """
+    Cliente asíncrono de API-Football. Todas las instancias comparten el
+    cliente HTTP, el limitador de cuota y el límite de concurrencia, así que
+    se pueden lanzar varias llamadas en paralelo con asyncio.gather.
+    """
+
     def __init__(self, endpoint: str):
         self.endpoint = endpoint
-        self.__url = ""
-        self.__querystring = {}
         self.__headers = {
             'x-rapidapi-host': "api-football-v1.p.rapidapi.com",
-            "x-rapidapi-key": secret_key,
+            "x-rapidapi-key": secret_key or "",
             "Accept": "application/json"
         }
 
     @property
     def headers(self):
         return self.__headers
-   
-    @property
-    def url(self):
-        return self.__url
-   
-    def __set_url(self, url):
-        if type(url) == str:
-            self.__url = url
 
-    @property
-    def querystring(self):
-        return self.__querystring
-   
-    def __set_querystring(self, key, parametro):
-        self.__querystring[key] = parametro
+    async def _fetch_page(self, path: str, params: dict | None) -> tuple[list, dict]:
+        """
+        Un GET con reintentos. El cuerpo se parsea a medida que llega
+        (ResponseStreamParser): devuelve (items de `response`, resto del sobre).
+        """
+        url = f"{self.endpoint}/{path}"
+        client = get_http_client()
 
-    @property
-    def Respuesta(self):
-        response = requests.get(self.url, headers=self.headers, params=self.querystring)
-        response = response.json()
+        async with _get_semaphore():
+            for attempt in range(API_FOOTBALL_MAX_RETRIES + 1):
+                await _get_rate_limiter().acquire()
+                response = None
+                try:
+                    async with client.stream("GET", url, headers=self.headers, params=params) as response:
+                        if response.status_code not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            parser = ResponseStreamParser()
+                            items = []
+                            async for chunk in response.aiter_bytes():
+                                items.extend(parser.feed(chunk))
+                            items.extend(parser.close())
+                            return items, parser.envelope
+                    error = f"HTTP {response.status_code}"
+                except httpx.TransportError as e:
+                    error = repr(e)
+
+                if attempt == API_FOOTBALL_MAX_RETRIES:
+                    if response is not None and response.status_code in RETRY_STATUSES:
+                        response.raise_for_status()
+                    raise httpx.TransportError(f"GET {url} failed after {attempt + 1} attempts: {error}")
+
+                delay = _retry_delay(response, attempt)
+                logger.warning(f"GET {url} {params} failed ({error}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def iter_pages(self, path: str, params: dict | None = None, use_cache: bool = True):
+        """
+        Recorre todas las páginas de un endpoint siguiendo el bloque `paging`
+        de la respuesta. Genera un ApiResponse por página, así el que consume
+        puede procesar y soltar cada página antes de pedir la siguiente.
+
+        Con `use_cache=False` la respuesta no se lee ni se graba en disco,
+        salvo en modo offline, donde igual solo se reproduce lo grabado.
+        """
+        page = 1
+        total_pages = 1
+        while page <= total_pages:
+            page_params = dict(params or {})
+            if page > 1:
+                page_params["page"] = page
+
+            # Offline never reaches the network: a request never recorded raises OfflineCacheMiss
+            result = await response_cache.get(path, page_params) if use_cache or response_cache.offline else None
+            if result is None:
+                items, envelope = await self._fetch_page(path, page_params)
+                if envelope.get("errors"):
+                    raise ApiFootballError(f"API-Football errors for {path} {page_params}: {envelope['errors']}")
+                if use_cache:
+                    result = await response_cache.set(path, page_params, items, envelope.get("paging"))
+                else:
+                    result = response_cache.wrap(path, page_params, items, envelope.get("paging"))
+
+            yield result
 
-        print(response)
+            total_pages = int((result.paging or {}).get("total") or 1)
+            page += 1
 
-        return response['response']
+    async def iter_items(self, path: str, params: dict | None = None, use_cache: bool = True):
+        """Igual que iter_pages pero de a un item."""
+        async for page in self.iter_pages(path, params, use_cache):
+            for item in page:
+                yield item
 
-    def countries_from_api(self) -> list[dict[str, str,str]]:
+    async def _get(self, path: str, params: dict | None = None, use_cache: bool = True) -> list:
+        """
+        GET a API-Football con todas sus páginas. Devuelve un ApiResponse (una
+        lista con la clave de caché y el hash del contenido). Las respuestas
+        de endpoints con TTL se sirven desde la caché en disco mientras estén
+        vigentes.
+        """
+        pages = [page async for page in self.iter_pages(path, params, use_cache)]
+        if len(pages) == 1:
+            return pages[0]
+        return ApiResponse(
+            [item for page in pages for item in page],
+            response_cache.key(path, params),
+            content_hash([page.content_hash for page in pages]),
+            from_cache=all(page.from_cache for page in pages)
+        )
+
+    async def countries_from_api(self) -> list[dict[str, str,str]]:
         """
         Returns:
         [
@@ -61,60 +241,64 @@ class apiFutbolServicio():
             },
             ]
         """
-        self.__querystring = {}
-        self.__set_url(f"{self.endpoint}/countries")
-        print(f"El prompt: {self.endpoint}/countries")
-        return self.Respuesta
-   
-    def leagues_from_api(self, pais, current = True):
-        self.__querystring = {}
-        self.__set_querystring('country', str(pais))
+        return await self._get("countries")
+
+    async def leagues_from_api(self, pais, current = True):
+        params = {'country': str(pais)}
         if current:
-            self.__set_url(f"{self.endpoint}/leagues?current=true")
-        else:
-            self.__set_url(f"{self.endpoint}/leagues")
-        return self.Respuesta
+            params['current'] = "true"
+        return await self._get("leagues", params)
 
-    def teams_from_api(self, liga: int, season: int) -> list[dict]:
+    async def teams_from_api(self, liga: int, season: int) -> list[dict]:
         """
         Devuelve todos los equipos de una liga y temporada específica.
         Ejemplo: GET /teams?league=39&season=2019
         """
-        self.__querystring = {}
-
         if not liga or not season:
             raise ValueError("Se requieren 'liga' y 'season' para obtener los equipos.")
 
-        self.__set_url(f"{self.endpoint}/teams")
-        self.__set_querystring('league', liga)
-        self.__set_querystring('season', str(season))
-
-        print(f"query: {self.querystring}\nheaders: {self.headers}\nurl: {self.url}")
+        params = {'league': liga, 'season': str(season)}
+        return await self._get("teams", params)
 
-        return self.Respuesta
-
-    def fixtures_from_api(self, liga: int, season: int, from_d: str, to: str) -> list[dict]:
-        self.__querystring = {}
-        self.__set_url(f"{self.endpoint}/fixtures")
-        self.__set_querystring('league', str(liga))
-        self.__set_querystring('season', str(season))
+    def _fixtures_params(self, liga: int, season: int, from_d: str, to: str) -> dict:
+        return {
+            'league': str(liga),
+            'season': str(season),
+            'from': from_d,
+            'to': to,
+            'timezone': "America/Argentina/Buenos_Aires",
+        }
 
-        self.__set_querystring('from', from_d)
-        self.__set_querystring('to', to)
-        self.__set_querystring('timezone', "America/Argentina/Buenos_Aires")
+    async def fixtures_from_api(self, liga: int, season: int, from_d: str, to: str) -> list[dict]:
+        return await self._get("fixtures", self._fixtures_params(liga, season, from_d, to))
 
-        return self.Respuesta
+    def fixture_pages_from_api(self, liga: int, season: int, from_d: str, to: str):
+        """Fixtures de una liga página por página (ver iter_pages)."""
+        return self.iter_pages("fixtures", self._fixtures_params(liga, season, from_d, to))
 
-    def rounds_from_api(self, liga: int, season: int) -> list[dict]:
-        self.__querystring = {}
-        self.__set_url(f"{self.endpoint}/fixtures/rounds")
-        self.__set_querystring('league', str(liga))
-        self.__set_querystring('season', str(season))
-        self.__set_querystring('current', True)
-        return self.Respuesta
+    async def fixtures_by_ids_from_api(self, ids: list[int]) -> list[dict]:
+        """
+        Estado actual de fixtures puntuales (GET /fixtures?ids=1-2-3, máximo
+        FIXTURE_IDS_PER_REQUEST por llamada). No usa la caché en disco (ni la
+        lee ni la graba): es para el seguimiento en vivo.
+        """
+        items = []
+        for start in range(0, len(ids), FIXTURE_IDS_PER_REQUEST):
+            chunk = ids[start:start + FIXTURE_IDS_PER_REQUEST]
+            params = {
+                'ids': "-".join(str(fixture_id) for fixture_id in chunk),
+                'timezone': "America/Argentina/Buenos_Aires",
+            }
+            items.extend(await self._get("fixtures", params, use_cache=False))
+        return items
 
-    # def timezones_from_api(self) -> list[dict]:
-    #     self.__querystring = {}
+    async def rounds_from_api(self, liga: int, season: int) -> list[dict]:
+        params = {
+            'league': str(liga),
+            'season': str(season),
+            'current': "true",
+        }
+        return await self._get("fixtures/rounds", params)
 
-    #     self.__set_url(f"{self.endpoint}/timezone")
-    #     return self.Respuesta
\ No newline at end of file
+    # async def timezones_from_api(self) -> list[dict]:
+    #     return await self._get("timezone")
@@ -0,0 +1,126 @@
+import logging
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from core.valkey_connection import get_valkey_client
+from services.data_version_valkey import DataVersionValkey, is_settled
+from services.reference_cache import reference_cache
+from settings import HTTP_CACHE_MAX_AGE_SECONDS, HTTP_CACHE_LIVE_MAX_AGE_SECONDS
+
+logger = logging.getLogger("http_cache")
+
+# Bump when the body of a cached endpoint changes shape, so clients holding
+# an ETag from the previous release don't get a 304 for the old format
+CACHE_FORMAT_VERSION = 1
+
+# Path -> (datasets the response is built from, Cache-Control max-age)
+CACHED_ROUTES = [
+    (re.compile(r"/countries"), ("countries",), HTTP_CACHE_MAX_AGE_SECONDS),
+    (re.compile(r"/countries_with_league"), ("countries", "leagues"), HTTP_CACHE_MAX_AGE_SECONDS),
+    (re.compile(r"/leagues"), ("countries", "leagues"), HTTP_CACHE_MAX_AGE_SECONDS),
+    (re.compile(r"/leagues/\d+"), ("countries", "leagues"), HTTP_CACHE_MAX_AGE_SECONDS),
+    # Rounds are listed by league country, fixtures embed the teams' country info
+    (re.compile(r"/rounds/by-league"), ("countries", "leagues", "rounds"), HTTP_CACHE_MAX_AGE_SECONDS),
+    (re.compile(r"/fixtures"), ("countries", "leagues", "rounds", "teams", "fixtures"), HTTP_CACHE_LIVE_MAX_AGE_SECONDS),
+]
+
+
+def _match_route(path: str):
+    for pattern, datasets, max_age in CACHED_ROUTES:
+        if pattern.fullmatch(path):
+            return datasets, max_age
+    return None
+
+
+def make_etag(versions: list[int]) -> str:
+    # Weak: the body is equivalent for the same data, not byte-for-byte pinned
+    return f'W/"{CACHE_FORMAT_VERSION}-{"-".join(str(version) for version in versions)}"'
+
+
+def is_not_modified(request_headers: Headers, etag: str, last_modified_ms: int) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have whole-second precision
+        return last_modified_ms // 1000 <= since
+    return False
+
+
+class HTTPCacheMiddleware:
+    """
+    Conditional GET for the reference endpoints (CACHED_ROUTES).
+
+    The ETag comes from the data versions in Valkey (DataVersionValkey),
+    which the ingestion jobs bump when they change data, so it is known
+    before running the endpoint: a matching If-None-Match (or
+    If-Modified-Since) is answered with 304 without touching Postgres. 200
+    responses get ETag, Last-Modified and a public Cache-Control so a CDN
+    can serve them. If Valkey is unavailable requests pass through uncached.
+
+    The ETag must never be newer than the body: the versions are applied to
+    the in-process reference cache before the endpoint runs, and while a
+    change is not settled yet (a replica may still be behind it) responses
+    go out without validators and with `no-store`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        route = _match_route(scope["path"])
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+        datasets, max_age = route
+
+        try:
+            versions = await DataVersionValkey(get_valkey_client()).get_versions(datasets)
+        except Exception as e:
+            logger.warning(f"Data versions unavailable, serving {scope['path']} without cache headers: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        reference_cache.apply_data_versions(dict(zip(datasets, versions)))
+        if not all(is_settled(version) for version in versions):
+            await self.app(scope, receive, self._with_headers(send, {"Cache-Control": "no-store"}))
+            return
+
+        # Read before the endpoint runs: if data changes meanwhile the body is
+        # newer than its ETag, and the next request simply gets a 200 again
+        etag = make_etag(versions)
+        last_modified_ms = max(versions)
+        cache_headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified_ms / 1000, usegmt=True),
+            "Cache-Control": f"public, max-age={max_age}"
+        }
+
+        if is_not_modified(Headers(scope=scope), etag, last_modified_ms):
+            await Response(status_code=304, headers=cache_headers)(scope, receive, send)
+            return
+
+        await self.app(scope, receive, self._with_headers(send, cache_headers))
+
+    def _with_headers(self, send, extra_headers: dict):
+        """Wrap `send` to add headers to 200 responses."""
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for name, value in extra_headers.items():
+                    headers[name] = value
+            await send(message)
+        return send_with_headers
@@ -0,0 +1,143 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class ResponseStreamParser:
+    """
+    Parser incremental para el sobre JSON de API-Football:
+
+        {"get": ..., "paging": {...}, "response": [item, item, ...], ...}
+
+    Se le pasan los bytes a medida que llegan (`feed`) y devuelve los items de
+    `response` apenas están completos, sin armar nunca el documento entero.
+    Las demás claves de primer nivel (paging, errors, results, ...) quedan en
+    `envelope`.
+    """
+
+    def __init__(self, items_key: str = "response"):
+        self.items_key = items_key
+        self.envelope: dict = {}
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        # start -> key -> colon -> value -> comma|end; items / item_sep inside the array
+        self._state = "start"
+        self._key = None
+        self._finished = False
+
+    def feed(self, chunk: bytes) -> list:
+        self._buffer += self._text_decoder.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        items = self._parse(final=True)
+        if not self._finished:
+            raise ValueError("Incomplete JSON response")
+        return items
+
+    def _skip_whitespace(self):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+    def _expect(self, char: str) -> bool:
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            return False
+        if self._buffer[self._pos] != char:
+            raise ValueError(f"Expected {char!r} at position {self._pos}, got {self._buffer[self._pos]!r}")
+        self._pos += 1
+        return True
+
+    def _decode_value(self, final: bool):
+        """Decode one JSON value at the cursor, or return (False, None) if it isn't complete yet."""
+        self._skip_whitespace()
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        # a bare number at the end of the buffer may still be growing
+        if end == len(self._buffer) and not final:
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        while not self._finished:
+            self._skip_whitespace()
+            if self._pos >= len(self._buffer):
+                break
+
+            if self._state == "start":
+                if not self._expect("{"):
+                    break
+                self._state = "key"
+
+            elif self._state == "key":
+                if self._buffer[self._pos] == "}":
+                    self._pos += 1
+                    self._finished = True
+                    break
+                ok, key = self._decode_value(final)
+                if not ok:
+                    break
+                self._key = key
+                self._state = "colon"
+
+            elif self._state == "colon":
+                if not self._expect(":"):
+                    break
+                self._state = "value"
+
+            elif self._state == "value":
+                if self._key == self.items_key and self._buffer[self._pos] == "[":
+                    self._pos += 1
+                    self._state = "items"
+                    continue
+                ok, value = self._decode_value(final)
+                if not ok:
+                    break
+                self.envelope[self._key] = value
+                self._state = "comma"
+
+            elif self._state == "items":
+                if self._buffer[self._pos] == "]":
+                    self._pos += 1
+                    self._state = "comma"
+                    continue
+                ok, item = self._decode_value(final)
+                if not ok:
+                    break
+                items.append(item)
+                self._state = "item_sep"
+
+            elif self._state == "item_sep":
+                char = self._buffer[self._pos]
+                self._pos += 1
+                if char == ",":
+                    self._state = "items"
+                elif char == "]":
+                    self._state = "comma"
+                else:
+                    raise ValueError(f"Unexpected {char!r} in {self.items_key} array")
+
+            elif self._state == "comma":
+                char = self._buffer[self._pos]
+                self._pos += 1
+                if char == ",":
+                    self._state = "key"
+                elif char == "}":
+                    self._finished = True
+                else:
+                    raise ValueError(f"Unexpected {char!r} after value of {self._key!r}")
+
+        # drop what was already consumed so the buffer stays small
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        return items
@@ -0,0 +1,41 @@
+import valkey.asyncio as valkey
+from settings import VALKEY_URI, VALKEY_MAX_CONNECTIONS
+
+_pool: valkey.ConnectionPool | None = None
+_client: valkey.Valkey | None = None
+
+async def init_valkey_pool(max_connections: int = VALKEY_MAX_CONNECTIONS) -> valkey.Valkey:
+    """
+    Crea el pool de conexiones compartido. Se llama una sola vez desde el
+    lifespan de la aplicación (o desde el worker de jobs).
+    """
+    global _pool, _client
+    if _client is not None:
+        return _client
+
+    if not VALKEY_URI:
+        raise ValueError("VALKEY_URI not found in environment variables")
+
+    _pool = valkey.ConnectionPool.from_url(VALKEY_URI, max_connections=max_connections)
+    _client = valkey.Valkey(connection_pool=_pool)
+    await _client.ping()
+    return _client
+
+def get_valkey_client() -> valkey.Valkey:
+    """Devuelve el cliente asíncrono compartido (requiere init_valkey_pool)."""
+    if _client is None:
+        raise RuntimeError("Valkey pool not initialized, call init_valkey_pool() first")
+    return _client
+
+async def get_valkey() -> valkey.Valkey:
+    """Dependencia de FastAPI que provee el cliente Valkey compartido."""
+    return get_valkey_client()
+
+async def close_valkey_pool():
+    global _pool, _client
+    if _client is not None:
+        await _client.aclose()
+    if _pool is not None:
+        await _pool.disconnect()
+    _pool = None
+    _client = None
@@ -1,6 +1,9 @@
 import logging
 from core.api_connection import apiFutbolServicio
+from core.api_cache import response_cache
 from services.country_postgres import CountryPostgres
+from services.reference_cache import reference_cache
+from services.data_version_valkey import bump_data_version
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from database import get_db
@@ -22,31 +25,49 @@ async def get_countries(api_endpoint: str, db: AsyncSession):
     logger.info("Fetching countries from external API...")
 
     try:
-        respuesta = apiFutbol.countries_from_api()
+        respuesta = await apiFutbol.countries_from_api()
         logger.info(f"Received {len(respuesta)} countries from API.")
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
         raise e
-    
-    added_count = 0
+
+    if await response_cache.is_ingested(respuesta):
+        logger.info("Countries payload unchanged since last ingest, skipping database write.")
+        return
+
     failed_count = 0
     failed_countries = []
+    parsed_countries = []
 
     for country in respuesta:
-        try:
-            name = country.get("name", "Unknown")
-            code = country.get("code", name[:3].upper())
-            flag = country.get("flag", "https://example.com/default-flag.png")
-
-            logger.info(f"Adding or updating country: {name} ({code})")
-            await country_postgres.add_or_update_country(db, name, code, flag)
-            added_count += 1
-        except Exception as ex:
+        name = country.get("name")
+        code = country.get("code", name[:3].upper() if name else None)
+        # Repeated or reassigned codes are resolved by bulk_upsert_countries
+        if not name:
             failed_count += 1
-            failed_countries.append(country) 
-            logger.exception(f"Error adding country {name}: {ex}")
+            failed_countries.append(country)
+            logger.warning(f"Skipping country with missing name: {country}")
+            continue
+
+        parsed_countries.append({
+            "name": name,
+            "code": code,
+            "flag": country.get("flag", "https://example.com/default-flag.png")
+        })
+
+    counts = await country_postgres.bulk_upsert_countries(db, parsed_countries)
+    added_count = counts["inserted"] + counts["updated"]
+    # Failures here only depend on the payload itself, retrying the same one won't help
+    await response_cache.mark_ingested(respuesta)
+
+    logger.info(
+        f"Countries process completed: inserted={counts['inserted']}, updated={counts['updated']}, "
+        f"unchanged={counts['unchanged']}, failed={failed_count}"
+    )
 
-    logger.info(f"Countries process completed: added={added_count}, failed={failed_count}")
+    if added_count:
+        reference_cache.invalidate("countries")
+        await bump_data_version("countries")
 
     if failed_countries:
         logger.warning(f"Failed countries: {failed_countries}")
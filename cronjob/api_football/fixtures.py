@@ -1,13 +1,65 @@
+import asyncio
 import logging
-import requests
+import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.api_connection import apiFutbolServicio
+from settings import API_FOOTBALL_MAX_CONCURRENCY
+from core.api_cache import response_cache
 from services.fixture_postgres import FixturePostgres
 from services.leagues_postgres import LeaguePostgres
 from models.fixtures.fixture_status import string_to_enum
 from datetime import datetime, timezone, timedelta
 
-async def get_fixtures(api_endpoint: str, db: AsyncSession, arg_timezone, load_last_run_datetime, save_last_run_datetime):
+def parse_fixture(item: dict, logger: logging.Logger) -> dict | None:
+    """Convierte un item de /fixtures en las columnas de Fixture (None si es inválido)."""
+    fixture_data = item.get("fixture", {})
+    league_data = item.get("league", {})
+    teams_data = item.get("teams", {})
+    goals_data = item.get("goals", {})
+    score_data = item.get("score", {})
+
+    fixture_id = fixture_data.get("id")
+    round = league_data.get("round")
+
+    date_str = fixture_data.get("date")
+    date = None
+    if date_str:
+        try:
+            local_dt = datetime.fromisoformat(date_str)
+            date = local_dt.astimezone(timezone.utc)
+        except Exception as e:
+            logger.warning(f"Invalid date format: {date_str} - {e}")
+
+    status_enum = string_to_enum(fixture_data.get("status", {}).get("short"))
+    home_team = teams_data.get("home", {})
+    away_team = teams_data.get("away", {})
+    home_id = home_team.get("id")
+    away_id = away_team.get("id")
+    home_score = goals_data.get("home")
+    away_score = goals_data.get("away")
+    home_pen_score = score_data.get("penalty", {}).get("home") if score_data.get("penalty") else None
+    away_pen_score = score_data.get("penalty", {}).get("away") if score_data.get("penalty") else None
+
+    if not all([fixture_id, league_data.get("id"), home_id, away_id, round]):
+        logger.warning(f"Invalid fixture data: {item}")
+        return None
+
+    return {
+        "id": fixture_id,
+        "league_id": league_data.get("id"),
+        "home_id": home_id,
+        "away_id": away_id,
+        "date": date,
+        "home_team_score": home_score,
+        "away_team_score": away_score,
+        "home_pens_score": home_pen_score,
+        "away_pens_score": away_pen_score,
+        "status": status_enum,
+        "round": round
+    }
+
+async def get_fixtures(api_endpoint: str, db: AsyncSession, arg_timezone, since: datetime | None = None):
+    """Trae los fixtures desde la fecha de `since` (el último run exitoso, u hoy) hasta dentro de 30 días."""
     logger = logging.getLogger("fixtures_AF_logger")
     logger.setLevel(logging.INFO)
     handler = logging.StreamHandler()
@@ -22,10 +74,9 @@ async def get_fixtures(api_endpoint: str, db: AsyncSession, arg_timezone, load_l
     league_postgres = LeaguePostgres()
     fixture_postgres = FixturePostgres()
 
-    last_run = load_last_run_datetime()
     now = datetime.now(arg_timezone)
 
-    start_date = last_run.date().isoformat()
+    start_date = (since.astimezone(arg_timezone) if since else now).date().isoformat()
 
     end_date = (now + timedelta(days=30)).date().isoformat()
 
@@ -37,102 +88,100 @@ async def get_fixtures(api_endpoint: str, db: AsyncSession, arg_timezone, load_l
             raise Exception("No leagues found in database")
         logger.info(f"Retrieved {len(leagues)} leagues from the database.")
 
-        added_count = 0
         failed_count = 0
         failed_fixtures = []
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
 
-        for league in leagues:
-            try:
-                logger.info(f"Fetching fixtures for league: {league.name}")
-                season = league.season
+        logger.info(f"Fetching fixtures for {len(leagues)} leagues...")
 
-                try:
-                    respuesta = apiFutbol.fixtures_from_api(
-                        liga=league.id,
-                        season=season,
-                        from_d=start_date,
-                        to=end_date
-                    )
-                    if respuesta:
-                        logger.info(f"Received {len(respuesta)} fixtures for {league.name} season {season}.")
-                except requests.RequestException as e:
-                    logger.warning(f"Error fetching fixtures for {league.name}: {e}")
-                    continue
-
-                if not respuesta:
-                    logger.warning(f"No fixtures found for {league.name}, skipping.")
-                    continue
+        # Leagues are fetched concurrently (bounded by the API client) and
+        # their pages handed over through a small queue, so only a few pages
+        # are held in memory while the single DB session writes them in order.
+        pages: asyncio.Queue = asyncio.Queue(maxsize=API_FOOTBALL_MAX_CONCURRENCY)
+        done = object()
 
-                for item in respuesta:
-                    try:
-                        fixture_data = item.get("fixture", {})
-                        league_data = item.get("league", {})
-                        teams_data = item.get("teams", {})
-                        goals_data = item.get("goals", {})
-                        score_data = item.get("score", {})
-
-                        fixture_id = fixture_data.get("id")
-                        round = league_data.get("round")
-
-                        date_str = fixture_data.get("date")
-                        date = None
-                        if date_str:
-                            try:
-                                local_dt = datetime.fromisoformat(date_str)
-                                date = local_dt.astimezone(timezone.utc)
-                            except Exception as e:
-                                logger.warning(f"Invalid date format: {date_str} - {e}")
-
-                        status_enum = string_to_enum(fixture_data.get("status", {}).get("short"))
-                        home_team = teams_data.get("home", {})
-                        away_team = teams_data.get("away", {})
-                        home_id = home_team.get("id")
-                        away_id = away_team.get("id")
-                        home_score = goals_data.get("home")
-                        away_score = goals_data.get("away")
-                        home_pen_score = score_data.get("penalty", {}).get("home") if score_data.get("penalty") else None
-                        away_pen_score = score_data.get("penalty", {}).get("away") if score_data.get("penalty") else None
-
-                        if not all([fixture_id, league_data.get("id"), home_id, away_id]):
-                            logger.warning(f"Invalid fixture data: {item}")
+        async def fetch_league(league):
+            try:
+                async for page in apiFutbol.fixture_pages_from_api(
+                    liga=league.id, season=league.season, from_d=start_date, to=end_date
+                ):
+                    await pages.put((league, page))
+            except Exception as e:
+                await pages.put((league, e))
+
+        async def fetch_all():
+            try:
+                await asyncio.gather(*(fetch_league(league) for league in leagues))
+            finally:
+                await pages.put(done)
+
+        producer = asyncio.create_task(fetch_all())
+        try:
+            while (entry := await pages.get()) is not done:
+                league, respuesta = entry
+                try:
+                    if isinstance(respuesta, httpx.HTTPError):
+                        logger.warning(f"Error fetching fixtures for {league.name}: {respuesta!r}")
+                        continue
+                    if isinstance(respuesta, Exception):
+                        raise respuesta
+
+                    if not respuesta:
+                        logger.warning(f"No fixtures found for {league.name}, skipping.")
+                        continue
+                    logger.info(f"Received {len(respuesta)} fixtures for {league.name} season {league.season}.")
+
+                    if await response_cache.is_ingested(respuesta):
+                        logger.info(f"Fixtures page for {league.name} unchanged since last ingest, skipping.")
+                        continue
+
+                    parsed_fixtures = []
+                    for item in respuesta:
+                        try:
+                            fixture = parse_fixture(item, logger)
+                        except Exception as ex:
+                            logger.exception(f"Error parsing fixture {item.get('fixture', {}).get('id')}: {ex}")
+                            fixture = None
+                        if fixture is None:
                             failed_count += 1
                             failed_fixtures.append(item)
                             continue
+                        parsed_fixtures.append(fixture)
+
+                    # One batched INSERT ... ON CONFLICT transaction per page
+                    page_counts = await fixture_postgres.bulk_upsert_fixtures(db, parsed_fixtures)
+                    for key in counts:
+                        counts[key] += page_counts[key]
+                    for fixture in page_counts["skipped"]:
+                        logger.warning(f"Skipping fixture {fixture['id']}: unknown team or league")
+                    failed_count += len(page_counts["skipped"])
+                    failed_fixtures.extend(page_counts["skipped"])
+
+                    # a skipped fixture may succeed once its teams are ingested, keep retrying this page
+                    if not page_counts["skipped"]:
+                        await response_cache.mark_ingested(respuesta)
+
+                except Exception as league_error:
+                    logger.exception(f"Unexpected error processing league {league.name}: {league_error}")
+                    continue
+        finally:
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+        added_count = counts["inserted"] + counts["updated"]
 
-                        await fixture_postgres.add_or_update_fixture(
-                            db=db,
-                            id=fixture_id,
-                            league_id=league_data.get("id"),
-                            home_id=home_id,
-                            away_id=away_id,
-                            date=date,
-                            home_team_score=home_score,
-                            away_team_score=away_score,
-                            home_pens_score=home_pen_score,
-                            away_pens_score=away_pen_score,
-                            status=status_enum,
-                            round=round
-                        )
-
-                        added_count += 1
-                        logger.info(f"Added/updated fixture {fixture_id} ({league_data.get('name')})")
-
-                    except Exception as ex:
-                        failed_count += 1
-                        failed_fixtures.append(item)
-                        logger.exception(f"Error adding fixture {fixture_data.get('id')}: {ex}")
-
-            except Exception as league_error:
-                logger.exception(f"Unexpected error processing league {league.name}: {league_error}")
-                continue
-
-        logger.info(f"Fixtures process completed: added={added_count}, failed={failed_count}")
-
-        save_last_run_datetime(datetime.now(arg_timezone))
+        logger.info(
+            f"Fixtures process completed: inserted={counts['inserted']}, updated={counts['updated']}, "
+            f"unchanged={counts['unchanged']}, failed={failed_count}"
+        )
 
         return {
             "status": "success",
             "fixtures_added": added_count,
+            "fixtures_inserted": counts["inserted"],
+            "fixtures_updated": counts["updated"],
+            "fixtures_unchanged": counts["unchanged"],
             "fixtures_failed": failed_count,
             "failed_fixtures": failed_fixtures,
         }
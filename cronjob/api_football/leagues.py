@@ -1,7 +1,11 @@
+import asyncio
 import logging
 from core.api_connection import apiFutbolServicio
+from core.api_cache import response_cache
 from services.leagues_postgres import LeaguePostgres
 from services.country_postgres import CountryPostgres
+from services.reference_cache import reference_cache
+from services.data_version_valkey import bump_data_version
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from database import get_db
@@ -28,90 +32,108 @@ async def get_leagues(api_endpoint: str, db: AsyncSession = Depends(get_db)):
         country_names = ["Argentina", "Brasil", "World", "Spain", "England", "Italy"]
         logger.info(f"Fetching countries by names: {country_names}")
 
+        known_countries = await country_postgres.get_country_names(db)
         countries = []
         for name in country_names:
-            result = await country_postgres.get_country_by_name(db, name)
-            if result:
-                countries.append(result)
+            if name in known_countries:
+                countries.append(name)
             else:
                 logger.warning(f"Country not found in the database: {name}")
 
         logger.info(f"Retrieved {len(countries)} countries from the database.")
 
-        added_count = 0
         failed_count = 0
         failed_leagues = []
+        parsed_leagues = {}
+        # Responses fully written to the database, marked as ingested at the end
+        ingested_responses = []
 
         leagues_ids = [2, 3, 11, 13, 15, 34, 39, 128, 129, 130, 135, 140, 848]
 
-        for country in countries:
-            country_name = country.name
-            logger.info(f"Fetching leagues for country: {country_name}")
+        logger.info(f"Fetching leagues for countries: {countries}")
 
-            try:
-                respuesta = apiFutbol.leagues_from_api(pais=country_name)
-                logger.info(f"Received {len(respuesta)} leagues for country: {country_name}.")
-            except Exception as e:
-                logger.exception(f"Unexpected error fetching leagues for {country_name}: {e}")
+        # Requests run concurrently (bounded by the API client), writes stay sequential
+        responses = await asyncio.gather(
+            *(apiFutbol.leagues_from_api(pais=country_name) for country_name in countries),
+            return_exceptions=True
+        )
+
+        for country_name, respuesta in zip(countries, responses):
+            if isinstance(respuesta, Exception):
+                logger.error(f"Unexpected error fetching leagues for {country_name}: {respuesta!r}")
+                continue
+            logger.info(f"Received {len(respuesta)} leagues for country: {country_name}.")
+
+            if await response_cache.is_ingested(respuesta):
+                logger.info(f"Leagues payload for {country_name} unchanged since last ingest, skipping.")
                 continue
+            response_complete = True
 
             for item in respuesta:
-                try:
-                    league_info = item.get("league", {})
-                    country_info = item.get("country", {})
-                    seasons = item.get("seasons", [])
-
-                    league_id = league_info.get("id")
-                    league_name = league_info.get("name", "Unknown League")
-                    league_logo = league_info.get("logo", "https://example.com/default-league-logo.png")
-                    country_name = country_info.get("name", "Unknown Country")
-
-                    if not league_id or not league_name or not country_name:
-                        logger.warning(f"Skipping league with invalid data: {item}")
-                        failed_count += 1
-                        failed_leagues.append(item)
-                        continue
-
-                    if league_id not in leagues_ids:
-                        logger.info(
-                            f"Skipping league ID {league_id} ({league_name}) — not in allowed list."
-                        )
-                        continue
-
-                    valid_seasons = [
-                        s for s in seasons if s.get("year") in {2025, 2026}
-                    ]
-
-                    if not valid_seasons:
-                        logger.info(
-                            f"Skipping league {league_name} (ID: {league_id}) — no valid seasons (2025 or 2026)."
-                        )
-                        continue
-
-                    for season in valid_seasons:
-                        season_year = season.get("year")
-
-                        logger.info(
-                            f"Adding or updating league: {league_name} (ID: {league_id}) for season {season_year}"
-                        )
-
-                        await league_postgres.add_or_update_league(
-                            db,
-                            league_id,
-                            league_name,
-                            country_name,
-                            season_year,
-                            league_logo
-                        )
-
-                        added_count += 1
-
-                except Exception as ex:
+                league_info = item.get("league", {})
+                country_info = item.get("country", {})
+                seasons = item.get("seasons", [])
+
+                league_id = league_info.get("id")
+                league_name = league_info.get("name", "Unknown League")
+                league_logo = league_info.get("logo", "https://example.com/default-league-logo.png")
+                league_country = country_info.get("name", "Unknown Country")
+
+                if not league_id or not league_name or not league_country:
+                    logger.warning(f"Skipping league with invalid data: {item}")
                     failed_count += 1
                     failed_leagues.append(item)
-                    logger.exception(f"Error adding league {league_name}: {ex}")
+                    continue
+
+                if league_id not in leagues_ids:
+                    logger.info(
+                        f"Skipping league ID {league_id} ({league_name}) — not in allowed list."
+                    )
+                    continue
 
-        logger.info(f"Leagues process completed: added={added_count}, failed={failed_count}")
+                if league_country not in known_countries:
+                    logger.warning(f"Skipping league {league_name}: country '{league_country}' not found.")
+                    failed_count += 1
+                    failed_leagues.append(item)
+                    # may succeed once the country is ingested, keep retrying this payload
+                    response_complete = False
+                    continue
+
+                valid_seasons = [
+                    s.get("year") for s in seasons if s.get("year") in {2025, 2026}
+                ]
+
+                if not valid_seasons:
+                    logger.info(
+                        f"Skipping league {league_name} (ID: {league_id}) — no valid seasons (2025 or 2026)."
+                    )
+                    continue
+
+                # One row per league id: keep the latest valid season
+                parsed_leagues[league_id] = {
+                    "id": league_id,
+                    "name": league_name,
+                    "country_name": league_country,
+                    "season": max(valid_seasons),
+                    "logo": league_logo
+                }
+
+            if response_complete:
+                ingested_responses.append(respuesta)
+
+        counts = await league_postgres.bulk_upsert_leagues(db, list(parsed_leagues.values()))
+        added_count = counts["inserted"] + counts["updated"]
+        for respuesta in ingested_responses:
+            await response_cache.mark_ingested(respuesta)
+
+        logger.info(
+            f"Leagues process completed: inserted={counts['inserted']}, updated={counts['updated']}, "
+            f"unchanged={counts['unchanged']}, failed={failed_count}"
+        )
+
+        if added_count:
+            reference_cache.invalidate("leagues")
+            await bump_data_version("leagues")
 
         if failed_leagues:
             logger.warning(f"Failed leagues: {failed_leagues}")
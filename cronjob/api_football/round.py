@@ -1,10 +1,13 @@
+import asyncio
 import logging
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from core.api_connection import apiFutbolServicio
+from core.api_cache import response_cache
 from services.round_postgres import RoundPostgres
 from services.leagues_postgres import LeaguePostgres
+from services.data_version_valkey import bump_data_version
 
 async def get_rounds(api_endpoint: str, db: AsyncSession = Depends(get_db)):
     logger = logging.getLogger("rounds_AF_logger")
@@ -28,50 +31,58 @@ async def get_rounds(api_endpoint: str, db: AsyncSession = Depends(get_db)):
 
         logger.info(f"Found {len(leagues)} leagues in database.")
 
-        added_count = 0
         failed_count = 0
-        failed_rounds = []
+        parsed_rounds = []
+        ingested_responses = []
 
-        for league in leagues:
-            if league.id in [131, 132, 134, 906, 1067]:
-                continue
+        leagues = [league for league in leagues if league.id not in [131, 132, 134, 906, 1067]]
+
+        logger.info(f"Fetching rounds for {len(leagues)} leagues...")
 
+        # Requests run concurrently (bounded by the API client), writes stay sequential
+        responses = await asyncio.gather(
+            *(apiFutbol.rounds_from_api(liga=league.id, season=league.season) for league in leagues),
+            return_exceptions=True
+        )
+
+        for league, respuesta in zip(leagues, responses):
             league_id = league.id
             season_year = league.season
 
-            logger.info(f"Fetching rounds for league {league.name} (ID: {league_id}, season: {season_year})")
-
             try:
-                respuesta = apiFutbol.rounds_from_api(liga=league_id, season=season_year)
+                if isinstance(respuesta, Exception):
+                    raise respuesta
 
                 if not respuesta:
                     logger.warning(f"No rounds found for league {league.name} ({league_id}) season {season_year}")
                     continue
 
-                for round_name in respuesta:
-                    try:
-                        await round_postgres.add_or_skip_round(
-                            db=db,
-                            name=round_name,
-                            league_id=league_id,
-                            season=season_year
-                        )
-                        added_count += 1
-                    except Exception as ex:
-                        failed_count += 1
-                        failed_rounds.append({
-                            "league_id": league_id,
-                            "season": season_year,
-                            "round_name": round_name,
-                            "error": str(ex)
-                        })
-                        logger.exception(f"Error adding round {round_name} for league {league.name}: {ex}")
+                if await response_cache.is_ingested(respuesta):
+                    logger.info(f"Rounds payload for league {league.name} unchanged since last ingest, skipping.")
+                    continue
+
+                ingested_responses.append(respuesta)
+                parsed_rounds.extend(
+                    {"name": round_name, "league_id": league_id, "season": season_year}
+                    for round_name in respuesta
+                )
 
             except Exception as e:
+                failed_count += 1
                 logger.exception(f"Unexpected error fetching rounds for league {league_id}: {e}")
                 continue
 
-        logger.info(f"Rounds process completed: added={added_count}, failed={failed_count}")
+        counts = await round_postgres.bulk_add_missing_rounds(db, parsed_rounds)
+        added_count = counts["inserted"]
+        for respuesta in ingested_responses:
+            await response_cache.mark_ingested(respuesta)
+
+        logger.info(
+            f"Rounds process completed: added={added_count}, unchanged={counts['unchanged']}, failed={failed_count}"
+        )
+
+        if added_count:
+            await bump_data_version("rounds")
         
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
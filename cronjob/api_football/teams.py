@@ -1,13 +1,17 @@
+import asyncio
 import logging
-import requests
+import httpx
 from fastapi import Depends
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from core.api_connection import apiFutbolServicio
+from core.api_cache import response_cache
 from services.teams_postgres import TeamPostgres
 from services.country_postgres import CountryPostgres
 from services.leagues_postgres import LeaguePostgres
+from services.reference_cache import reference_cache
+from services.data_version_valkey import bump_data_version
 
 async def get_teams(api_endpoint: str, db: AsyncSession = Depends(get_db)):
     logger = logging.getLogger("teams_AF_logger")
@@ -34,71 +38,96 @@ async def get_teams(api_endpoint: str, db: AsyncSession = Depends(get_db)):
 
         logger.info(f"Retrieved {len(leagues)} leagues from the database.")
 
-        added_count = 0
         failed_count = 0
         failed_teams = []
+        parsed_teams = []
+        ingested_responses = []
+        known_countries = await country_postgres.get_country_names(db)
 
-        for league in leagues:
-            try:
-                logger.info(f"Fetching teams for league: {league.name}")
+        logger.info(f"Fetching teams for {len(leagues)} leagues...")
+
+        # Requests run concurrently (bounded by the API client), writes stay sequential
+        responses = await asyncio.gather(
+            *(apiFutbol.teams_from_api(liga=league.id, season=league.season) for league in leagues),
+            return_exceptions=True
+        )
 
-                respuesta = None
+        for league, respuesta in zip(leagues, responses):
+            try:
                 season = league.season
-                try:
-                    respuesta = apiFutbol.teams_from_api(liga=league.id, season=season)
-                    if respuesta:
-                        logger.info(
-                            f"Received {len(respuesta)} teams for {league.name} season {season}."
-                        )
-                except requests.exceptions.Timeout:
-                    logger.warning(f"Timeout fetching teams for {league.name} season {season}. Retrying next season...")
-                except requests.exceptions.ConnectionError:
-                    logger.warning(f"Connection error fetching {league.name} season {season}. Skipping league.")
-                    break
-                except requests.HTTPError as e:
-                    logger.warning(f"HTTP error fetching {league.name} season {season}: {e}")
-                except Exception as e:
-                    logger.warning(f"Unexpected error fetching {league.name} season {season}: {e}")
+                if isinstance(respuesta, httpx.TimeoutException):
+                    logger.warning(f"Timeout fetching teams for {league.name} season {season}.")
+                    respuesta = None
+                elif isinstance(respuesta, httpx.HTTPStatusError):
+                    logger.warning(f"HTTP error fetching {league.name} season {season}: {respuesta}")
+                    respuesta = None
+                elif isinstance(respuesta, Exception):
+                    logger.warning(f"Unexpected error fetching {league.name} season {season}: {respuesta!r}")
+                    respuesta = None
+                elif respuesta:
+                    logger.info(
+                        f"Received {len(respuesta)} teams for {league.name} season {season}."
+                    )
 
                 if not respuesta:
                     logger.warning(f"No teams found for {league.name} (seasons 2025/2026). Skipping.")
                     continue
 
+                if await response_cache.is_ingested(respuesta):
+                    logger.info(f"Teams payload for {league.name} unchanged since last ingest, skipping.")
+                    continue
+                response_complete = True
+
                 for item in respuesta:
-                    try:
-                        team_data = item.get("team", {})
-
-                        team_id = team_data.get("id")
-                        team_name = team_data.get("name", "Unknown")
-                        team_logo = team_data.get("logo", "https://example.com/default-team-logo.png")
-                        country_name = team_data.get("country", "Uknown")
-
-                        if not team_id or not team_name:
-                            logger.warning(f"Invalid team data: {item}")
-                            failed_count += 1
-                            failed_teams.append(item)
-                            continue
-
-                        if country_name:
-                            country_result = await country_postgres.get_country_by_name(db, country_name)
-                            if not country_result:
-                                logger.warning(f"Country '{country_name}' not found. Setting to None.")
-                                country_name = None
-
-                        await team_postgres.add_or_update_team(db, team_id, team_name, country_name, team_logo)
-                        logger.info(f"Added or updated team: {team_name} (ID: {team_id})")
-                        added_count += 1
-
-                    except Exception as ex:
+                    team_data = item.get("team", {})
+
+                    team_id = team_data.get("id")
+                    team_name = team_data.get("name", "Unknown")
+                    team_logo = team_data.get("logo", "https://example.com/default-team-logo.png")
+                    country_name = team_data.get("country", "Uknown")
+
+                    if not team_id or not team_name:
+                        logger.warning(f"Invalid team data: {item}")
                         failed_count += 1
                         failed_teams.append(item)
-                        logger.exception(f"Error adding team {team_name}: {ex}")
+                        continue
+
+                    # teams.country_name is NOT NULL, teams with an unknown country can't be stored
+                    if country_name not in known_countries:
+                        logger.warning(f"Country '{country_name}' not found. Skipping team {team_name} (ID: {team_id}).")
+                        failed_count += 1
+                        failed_teams.append(item)
+                        # may succeed once the country is ingested, keep retrying this payload
+                        response_complete = False
+                        continue
+
+                    parsed_teams.append({
+                        "id": team_id,
+                        "name": team_name,
+                        "country_name": country_name,
+                        "logo": team_logo
+                    })
+
+                if response_complete:
+                    ingested_responses.append(respuesta)
 
             except Exception as league_error:
                 logger.exception(f"Unexpected error processing league {league.name}: {league_error}")
                 continue
 
-        logger.info(f"Teams process completed: added={added_count}, failed={failed_count}")
+        counts = await team_postgres.bulk_upsert_teams(db, parsed_teams)
+        added_count = counts["inserted"] + counts["updated"]
+        for respuesta in ingested_responses:
+            await response_cache.mark_ingested(respuesta)
+
+        logger.info(
+            f"Teams process completed: inserted={counts['inserted']}, updated={counts['updated']}, "
+            f"unchanged={counts['unchanged']}, failed={failed_count}"
+        )
+
+        if added_count:
+            reference_cache.invalidate("teams")
+            await bump_data_version("teams")
 
     except Exception as e:
         logger.exception(f"Unexpected server error: {e}")
@@ -0,0 +1,124 @@
+import os
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+from database import AsyncSessionLocal
+from cronjob.api_football.countries import get_countries
+from cronjob.api_football.fixtures import get_fixtures
+from cronjob.api_football.leagues import get_leagues
+from cronjob.api_football.round import get_rounds
+from cronjob.api_football.teams import get_teams
+from core.api_cache import response_cache
+from cronjob.live_task import refresh_live_fixtures, LIVE_WINDOW_BEFORE
+from cronjob.scheduler import Job, JobScheduler
+from services.fixture_postgres import FixturePostgres
+from services.fixture_valkey import FixtureValkey
+from services.prediction_postgres import PredictionPostgres
+from services.token_postgres import TokenPostgres
+from services.leaderboard_valkey import LeaderboardValkey
+from settings import API_FOOTBALL_OFFLINE, LIVE_POLL_INTERVAL_SECONDS, SCHEDULER_DISABLED_JOBS
+
+load_dotenv()
+
+ARG_TIMEZONE = ZoneInfo("America/Argentina/Buenos_Aires")
+
+# Longest sleep while no fixture is in its live window, so fixtures added by
+# the fixtures job are picked up without waiting for the old next kick-off
+LIVE_IDLE_MAX_SECONDS = 30 * 60
+
+# Jobs that only make sense against the real API: `live` never reads the
+# disk cache, so in offline replay it would fail on every poll
+ONLINE_ONLY_JOBS = ("live",)
+
+
+def build_scheduler(valkey_client) -> JobScheduler:
+    """
+    Registro de jobs. Los de ingesta comparten el lane "ingest": corren de
+    a uno y en este orden cuando vencen a la vez, así las ligas ven los
+    países nuevos y los equipos/rondas las ligas nuevas. El resto (en
+    particular `live`) corre en paralelo y no espera a la ingesta.
+    """
+    api = os.getenv("API_ENDPOINT")
+
+    async def countries(state: dict):
+        async with AsyncSessionLocal() as db:
+            await get_countries(api, db)
+
+    async def leagues(state: dict):
+        async with AsyncSessionLocal() as db:
+            await get_leagues(api, db)
+
+    async def teams(state: dict):
+        async with AsyncSessionLocal() as db:
+            await get_teams(api, db)
+
+    async def rounds(state: dict):
+        async with AsyncSessionLocal() as db:
+            await get_rounds(api, db)
+
+    async def fixtures(state: dict):
+        async with AsyncSessionLocal() as db:
+            result = await get_fixtures(api, db, ARG_TIMEZONE, since=state.get("last_success"))
+        return {"changed": result["fixtures_added"] > 0}
+
+    async def score(state: dict):
+        # Fixtures to Valkey (incremental), then score what finished or changed
+        await FixtureValkey(valkey_client).add_or_update_fixture()
+
+        async with AsyncSessionLocal() as db:
+            scores = await PredictionPostgres().score_finished_fixtures(db)
+            print(f"Scored {scores['fixtures_scored']} fixtures, {scores['predictions_updated']} predictions updated")
+
+            leaderboard = LeaderboardValkey(valkey_client)
+            for league_id, user_ids in scores["updated_users_by_league"].items():
+                try:
+                    await leaderboard.apply_score_changes(db, league_id, list(user_ids))
+                except Exception as e:
+                    # Log and continue with next league
+                    print(f"Error updating leaderboards for league {league_id}: {e}")
+                    continue
+
+    async def prune_tokens(state: dict):
+        async with AsyncSessionLocal() as db:
+            deleted = await TokenPostgres().prune_tokens(db)
+        print(f"Pruned {deleted} expired or revoked refresh tokens")
+
+    async def prune_api_cache(state: dict):
+        removed = await response_cache.prune()
+        print(f"Pruned {removed} expired API-Football cache files")
+
+    async def live(state: dict):
+        async with AsyncSessionLocal() as db:
+            result = await refresh_live_fixtures(api, db, valkey_client)
+            if result["live"]:
+                return None
+
+            # Nothing in play, sleep until the next window opens
+            next_kickoff = await FixturePostgres().get_next_kickoff(db)
+            if next_kickoff is None:
+                return {"next_run_in": LIVE_IDLE_MAX_SECONDS}
+            if next_kickoff.tzinfo is None:
+                next_kickoff = next_kickoff.replace(tzinfo=timezone.utc)
+            until_window = (next_kickoff - LIVE_WINDOW_BEFORE - datetime.now(timezone.utc)).total_seconds()
+            return {"next_run_in": min(max(until_window, LIVE_POLL_INTERVAL_SECONDS), LIVE_IDLE_MAX_SECONDS)}
+
+    scheduler = JobScheduler(valkey_client)
+    for job in (
+        Job("countries", countries, interval=timedelta(days=7), lane="ingest"),
+        Job("leagues", leagues, interval=timedelta(days=1), lane="ingest"),
+        Job("teams", teams, interval=timedelta(days=1), lane="ingest"),
+        Job("rounds", rounds, interval=timedelta(days=1), lane="ingest"),
+        Job("fixtures", fixtures, interval=timedelta(hours=1), triggers=("score",), lane="ingest"),
+        # Requested by the fixtures job on change; the daily run is a safety net
+        Job("score", score, interval=timedelta(days=1), lane="ingest"),
+        Job("prune_tokens", prune_tokens, interval=timedelta(days=1)),
+        Job("prune_api_cache", prune_api_cache, interval=timedelta(days=1)),
+        Job("live", live, interval=timedelta(seconds=LIVE_POLL_INTERVAL_SECONDS), timeout=timedelta(minutes=5)),
+    ):
+        if job.name in SCHEDULER_DISABLED_JOBS:
+            continue
+        if API_FOOTBALL_OFFLINE and job.name in ONLINE_ONLY_JOBS:
+            print(f"Job {job.name} disabled: API_FOOTBALL_OFFLINE is on")
+            continue
+        scheduler.register(job)
+    return scheduler
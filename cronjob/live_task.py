@@ -0,0 +1,67 @@
+import logging
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.api_connection import apiFutbolServicio
+from cronjob.api_football.fixtures import parse_fixture
+from services.fixture_postgres import FixturePostgres
+from services.fixture_valkey import FixtureValkey
+from services.prediction_postgres import PredictionPostgres
+from services.leaderboard_valkey import LeaderboardValkey
+from settings import LIVE_WINDOW_BEFORE_MINUTES, LIVE_WINDOW_AFTER_MINUTES
+
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter(
+    '{"time": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s"}'
+))
+logger = logging.getLogger("live_fixtures_logger")
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+LIVE_WINDOW_BEFORE = timedelta(minutes=LIVE_WINDOW_BEFORE_MINUTES)
+LIVE_WINDOW_AFTER = timedelta(minutes=LIVE_WINDOW_AFTER_MINUTES)
+
+
+async def refresh_live_fixtures(api_endpoint: str, db: AsyncSession, valkey_client) -> dict:
+    """
+    Un pase del seguimiento en vivo: pide a API-Football solo los fixtures
+    dentro de su ventana de kick-off, los escribe en Postgres, sincroniza
+    Valkey y puntúa los que terminaron.
+
+    Devuelve {"live", "updated", "fixtures_scored", "predictions_updated"}.
+    """
+    fixture_postgres = FixturePostgres()
+    result = {"live": 0, "updated": 0, "fixtures_scored": 0, "predictions_updated": 0}
+
+    fixture_ids = await fixture_postgres.get_live_window_fixture_ids(db, LIVE_WINDOW_BEFORE, LIVE_WINDOW_AFTER)
+    result["live"] = len(fixture_ids)
+    if not fixture_ids:
+        return result
+
+    items = await apiFutbolServicio(endpoint=api_endpoint).fixtures_by_ids_from_api(fixture_ids)
+    fixtures = [fixture for fixture in (parse_fixture(item, logger) for item in items) if fixture]
+
+    counts = await fixture_postgres.bulk_upsert_fixtures(db, fixtures)
+    result["updated"] = counts["inserted"] + counts["updated"]
+    if not result["updated"]:
+        return result
+
+    # Incremental: only fixtures whose updated_at moved past the watermark
+    await FixtureValkey(valkey_client).add_or_update_fixture()
+
+    scores = await PredictionPostgres().score_finished_fixtures(db, fixture_ids=fixture_ids)
+    result["fixtures_scored"] = scores["fixtures_scored"]
+    result["predictions_updated"] = scores["predictions_updated"]
+
+    leaderboard = LeaderboardValkey(valkey_client)
+    for league_id, user_ids in scores["updated_users_by_league"].items():
+        try:
+            await leaderboard.apply_score_changes(db, league_id, list(user_ids))
+        except Exception as e:
+            logger.exception(f"Error updating leaderboards for league {league_id}: {e}")
+
+    logger.info(
+        f"Live refresh: {result['live']} fixtures in window, {result['updated']} changed, "
+        f"{result['fixtures_scored']} scored, {result['predictions_updated']} predictions updated"
+    )
+    return result
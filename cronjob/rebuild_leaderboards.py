@@ -0,0 +1,40 @@
+"""
+Reconstruye los leaderboards materializados en Valkey desde Postgres.
+
+Uso:
+    python -m cronjob.rebuild_leaderboards            # todos los torneos
+    python -m cronjob.rebuild_leaderboards 12 15      # torneos específicos
+"""
+import asyncio
+import sys
+from database import AsyncSessionLocal
+from core.valkey_connection import init_valkey_pool, close_valkey_pool
+from services.leaderboard_valkey import LeaderboardValkey
+from services.tournament_postgres import TournamentPostgres
+
+async def rebuild_leaderboards(tournament_ids: list[int] | None = None):
+    client = await init_valkey_pool()
+    try:
+        leaderboard = LeaderboardValkey(client)
+        tournament_service = TournamentPostgres()
+
+        async with AsyncSessionLocal() as db:
+            if tournament_ids:
+                tournaments = []
+                for tournament_id in tournament_ids:
+                    tournament = await tournament_service.get_tournament_by_id(db, tournament_id)
+                    if tournament:
+                        tournaments.append(tournament)
+                    else:
+                        print(f"Torneo {tournament_id} no encontrado")
+            else:
+                tournaments = await tournament_service.get_all_tournaments(db)
+
+            for tournament in tournaments:
+                entries = await leaderboard.rebuild(db, tournament)
+                print(f"Leaderboard del torneo {tournament.id} reconstruido ({entries} participantes)")
+    finally:
+        await close_valkey_pool()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_leaderboards([int(arg) for arg in sys.argv[1:]]))
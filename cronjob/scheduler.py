@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from services.job_valkey import JobValkey
+
+handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter(
+    '{"time": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s"}'
+))
+logger = logging.getLogger("scheduler_logger")
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+# A crashed worker holds a lock at most this long; running jobs renew it
+JOB_LOCK_TTL_SECONDS = 60
+# Longest sleep between checks, so run requests from other workers are seen
+SCHEDULER_TICK_SECONDS = 30
+# Retry delay after a failed run (capped by the job interval)
+JOB_RETRY_SECONDS = 10 * 60
+
+
+class Job:
+    """
+    Un job programado.
+
+    `func(state)` recibe el estado guardado del job (last_success, etc.) y
+    devuelve un dict opcional: con `changed` verdadero se piden los jobs de
+    `triggers`, y `next_run_in` (segundos) reemplaza el intervalo para la
+    próxima ejecución.
+
+    Los jobs del mismo `lane` corren de a uno, en orden de registro; cada
+    lane corre en paralelo con los demás. Sin lane el job tiene el suyo
+    propio, así un job largo no demora a otro frecuente (el de partidos en
+    vivo).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[dict], Awaitable[Optional[dict]]],
+        interval: timedelta,
+        timeout: timedelta = timedelta(minutes=30),
+        triggers: tuple[str, ...] = (),
+        lane: Optional[str] = None
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.triggers = triggers
+        self.lane = lane or name
+
+
+class JobScheduler:
+    """
+    Corre los jobs registrados cuando les toca. El estado y los locks viven
+    en Valkey (JobValkey), así que con varios workers o nodos cada ejecución
+    ocurre una sola vez: el worker que toma el lock vuelve a leer next_run y
+    solo corre el job si sigue vencido.
+    """
+
+    def __init__(self, valkey_client):
+        self.jobs: dict[str, Job] = {}
+        self.job_valkey = JobValkey(valkey_client)
+
+    def register(self, job: Job):
+        self.jobs[job.name] = job
+
+    def _is_due(self, state: dict, now: datetime) -> bool:
+        next_run = state.get("next_run")
+        return next_run is None or next_run <= now
+
+    def _lanes(self) -> dict[str, list[Job]]:
+        lanes: dict[str, list[Job]] = {}
+        for job in self.jobs.values():
+            lanes.setdefault(job.lane, []).append(job)
+        return lanes
+
+    async def _run_due_in_lane(self, jobs: list[Job]) -> list[str]:
+        ran = []
+        for job in jobs:
+            state = await self.job_valkey.get_state(job.name)
+            if self._is_due(state, datetime.now(timezone.utc)) and await self._run_job(job):
+                ran.append(job.name)
+        return ran
+
+    async def run_due_jobs(self) -> list[str]:
+        """Corre los jobs vencidos, los lanes en paralelo. Devuelve los que corrió este worker."""
+        results = await asyncio.gather(*(self._run_due_in_lane(jobs) for jobs in self._lanes().values()))
+        return [name for ran in results for name in ran]
+
+    async def run_jobs(self, names: list[str]) -> list[str]:
+        """Corre ya los jobs pedidos aunque no estén vencidos (respetando el lock)."""
+        unknown = [name for name in names if name not in self.jobs]
+        if unknown:
+            raise KeyError(f"Unknown jobs: {', '.join(unknown)}")
+        return [name for name in names if await self._run_job(self.jobs[name], force=True)]
+
+    async def _keep_lock(self, job: Job, token: str):
+        while True:
+            await asyncio.sleep(JOB_LOCK_TTL_SECONDS / 3)
+            if not await self.job_valkey.extend_lock(job.name, token, JOB_LOCK_TTL_SECONDS):
+                logger.warning(f"Lost the lock of job {job.name} while running it")
+                return
+
+    async def _run_job(self, job: Job, force: bool = False) -> bool:
+        token = await self.job_valkey.acquire_lock(job.name, JOB_LOCK_TTL_SECONDS)
+        if token is None:
+            return False
+
+        heartbeat = None
+        try:
+            # Another worker may have finished it between our read and the lock
+            state = await self.job_valkey.get_state(job.name)
+            started = datetime.now(timezone.utc)
+            if not force and not self._is_due(state, started):
+                return False
+
+            heartbeat = asyncio.create_task(self._keep_lock(job, token))
+            await self.job_valkey.set_state(job.name, last_started=started)
+            logger.info(f"Running job {job.name}")
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(job.func(state), job.timeout.total_seconds()) or {}
+            except Exception as e:
+                logger.exception(f"Job {job.name} failed: {e!r}")
+                retry = min(job.interval, timedelta(seconds=JOB_RETRY_SECONDS))
+                finished = datetime.now(timezone.utc)
+                await self.job_valkey.record_run(
+                    job.name,
+                    last_finished=finished,
+                    last_error=repr(e),
+                    last_duration=f"{time.perf_counter() - start:.3f}",
+                    next_run=finished + retry
+                )
+                return True
+
+            finished = datetime.now(timezone.utc)
+            next_run_in = result.get("next_run_in")
+            next_run = finished + (timedelta(seconds=next_run_in) if next_run_in is not None else job.interval)
+            await self.job_valkey.record_run(
+                job.name,
+                last_finished=finished,
+                last_success=started,
+                last_error="",
+                last_duration=f"{time.perf_counter() - start:.3f}",
+                next_run=next_run
+            )
+            logger.info(f"Job {job.name} finished in {time.perf_counter() - start:.1f}s")
+
+            if result.get("changed"):
+                for name in job.triggers:
+                    await self.job_valkey.request_run(name)
+            return True
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            await self.job_valkey.release_lock(job.name, token)
+
+    async def _run_lane(self, lane: str, jobs: list[Job]):
+        try:
+            await self._run_due_in_lane(jobs)
+        except Exception as e:
+            # Valkey down or similar, the lane is retried on a later tick
+            logger.exception(f"Scheduler lane {lane} failed: {e!r}")
+
+    async def run_forever(self):
+        """
+        Cada lane con jobs vencidos corre en su propia tarea; el loop solo
+        las lanza y duerme hasta el próximo vencimiento de un lane libre (o
+        hasta que termine uno de los que están corriendo).
+        """
+        running: dict[str, asyncio.Task] = {}
+        wakeup = asyncio.Event()
+
+        def lane_done(lane: str):
+            running.pop(lane, None)
+            wakeup.set()
+
+        try:
+            while True:
+                wakeup.clear()
+                try:
+                    now = datetime.now(timezone.utc)
+                    states = await self.job_valkey.get_states(list(self.jobs))
+                    next_runs = []
+                    for lane, jobs in self._lanes().items():
+                        if lane in running:
+                            continue
+                        if any(self._is_due(states[job.name], now) for job in jobs):
+                            task = asyncio.create_task(self._run_lane(lane, jobs))
+                            running[lane] = task
+                            task.add_done_callback(lambda _task, lane=lane: lane_done(lane))
+                        else:
+                            next_runs.extend(states[job.name]["next_run"] for job in jobs)
+                    sleep_seconds = (min(next_runs) - now).total_seconds() if next_runs else SCHEDULER_TICK_SECONDS
+                except Exception as e:
+                    # Valkey down or similar, try again on the next tick
+                    logger.exception(f"Scheduler tick failed: {e!r}")
+                    sleep_seconds = SCHEDULER_TICK_SECONDS
+
+                try:
+                    await asyncio.wait_for(wakeup.wait(), min(max(sleep_seconds, 1), SCHEDULER_TICK_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            tasks = list(running.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_status(self) -> dict[str, dict]:
+        states = await self.job_valkey.get_states(list(self.jobs))
+        return {
+            name: {field: value.isoformat() if isinstance(value, datetime) else value for field, value in state.items()}
+            for name, state in states.items()
+        }
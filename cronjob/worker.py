@@ -0,0 +1,53 @@
+"""
+Worker de jobs programados, separado del proceso de la API.
+
+Uso:
+    python -m cronjob.worker                    # loop de jobs (ver cronjob/jobs.py)
+    python -m cronjob.worker fixtures score     # corre esos jobs una vez y sale
+
+Usa su propio pool de Postgres (WORKER_DB_POOL_SIZE / WORKER_DB_MAX_OVERFLOW)
+y de Valkey (WORKER_VALKEY_MAX_CONNECTIONS), así la ingesta y la puntuación
+no compiten con el tráfico de la API. Se pueden levantar varios workers: los
+locks en Valkey evitan que un job corra dos veces.
+"""
+import asyncio
+import signal
+import sys
+import database
+from core.api_connection import close_http_client
+from core.valkey_connection import init_valkey_pool, close_valkey_pool
+from cronjob.jobs import build_scheduler
+from settings import WORKER_DB_POOL_SIZE, WORKER_DB_MAX_OVERFLOW, WORKER_VALKEY_MAX_CONNECTIONS
+
+async def run_worker(job_names: list[str] | None = None):
+    await database.configure_engine(pool_size=WORKER_DB_POOL_SIZE, max_overflow=WORKER_DB_MAX_OVERFLOW)
+    client = await init_valkey_pool(max_connections=WORKER_VALKEY_MAX_CONNECTIONS)
+    try:
+        scheduler = build_scheduler(client)
+        if job_names:
+            ran = await scheduler.run_jobs(job_names)
+            skipped = [name for name in job_names if name not in ran]
+            if skipped:
+                print(f"Jobs en curso en otro worker, no se corrieron: {', '.join(skipped)}")
+            return
+
+        print(f"Worker iniciado con los jobs: {', '.join(scheduler.jobs)}")
+        await scheduler.run_forever()
+    finally:
+        await close_http_client()
+        await close_valkey_pool()
+        await database.engine.dispose()
+        print("Worker detenido.")
+
+async def main(job_names: list[str]):
+    task = asyncio.create_task(run_worker(job_names))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
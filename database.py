@@ -3,35 +3,180 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import asyncio
+import itertools
+import logging
+import time
+from sqlalchemy import text
+from settings import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DATABASE_REPLICA_URLS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_LAG_CHECK_SECONDS,
+)
 
 load_dotenv()
 
+logger = logging.getLogger("database")
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_async_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,  
-    connect_args={
-        "ssl": True,
-        "server_settings": {
-            "idle_in_transaction_session_timeout": "30000"
+def _create_engine(url: str = None, **pool_options):
+    """
+    Engine con el pool configurable por entorno. Sin pre-ping por defecto
+    (es un round trip extra en cada checkout): las conexiones viejas se
+    reciclan con DB_POOL_RECYCLE_SECONDS y una conexión caída invalida el pool.
+    """
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        # most recently used first, so spare connections go idle and get recycled
+        "pool_use_lifo": True,
+    }
+    options.update(pool_options)
+    return create_async_engine(
+        url or DATABASE_URL,
+        connect_args={
+            "ssl": True,
+            "server_settings": {
+                "idle_in_transaction_session_timeout": "30000"
+            },
         },
-    },
-)
+        **options
+    )
+
+engine = _create_engine()
 
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+async def configure_engine(**pool_options):
+    """
+    Recrea el engine con otras opciones de pool (pool_size, max_overflow,
+    ...). Lo usa el worker de jobs, que no comparte el tamaño de pool de la
+    API. AsyncSessionLocal se reconfigura en el lugar, así que get_db y los
+    que ya lo importaron usan el engine nuevo.
+    """
+    global engine
+    old_engine = engine
+    engine = _create_engine(**pool_options)
+    AsyncSessionLocal.configure(bind=engine)
+    await old_engine.dispose()
+    return engine
+
 Base = declarative_base()
 
+# 0 when the replica is not replaying or has replayed everything it received.
+# Received == replayed says nothing while the WAL receiver is disconnected (the
+# primary may be far ahead), so without a receiver process the replica counts
+# as infinitely behind. The pg_stat_wal_receiver row exists for any role.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver) THEN 'Infinity'::float8
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 0)
+    END
+""")
+
+class Replica:
+    """
+    Réplica de lectura con su propio engine. El lag se consulta como mucho
+    cada DB_REPLICA_LAG_CHECK_SECONDS; si la consulta falla la réplica queda
+    fuera de servicio hasta el próximo chequeo.
+    """
+
+    def __init__(self, url: str):
+        self.engine = _create_engine(url)
+        self.sessionmaker = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: float | None = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def current_lag(self) -> float:
+        if time.monotonic() - self.checked_at < DB_REPLICA_LAG_CHECK_SECONDS and self.lag is not None:
+            return self.lag
+        async with self._lock:
+            # another request may have refreshed it while we waited
+            if time.monotonic() - self.checked_at >= DB_REPLICA_LAG_CHECK_SECONDS or self.lag is None:
+                try:
+                    async with self.engine.connect() as conn:
+                        self.lag = float(await conn.scalar(REPLICA_LAG_QUERY))
+                except Exception as e:
+                    logger.warning(f"Replica {self.engine.url.host} unavailable: {e}")
+                    self.lag = float("inf")
+                self.checked_at = time.monotonic()
+        return self.lag
+
+replicas = [Replica(url) for url in DATABASE_REPLICA_URLS]
+_next_replica = itertools.count()
+
+async def _pick_replica() -> Replica | None:
+    """Siguiente réplica (round robin) con lag aceptable, o None para usar el primario."""
+    if not replicas:
+        return None
+    start = next(_next_replica)
+    for i in range(len(replicas)):
+        replica = replicas[(start + i) % len(replicas)]
+        if await replica.current_lag() <= DB_REPLICA_MAX_LAG_SECONDS:
+            return replica
+    return None
+
+def _pool_stats(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+def pool_stats() -> dict:
+    """Estado de los pools de conexiones (primario y réplicas), para monitoreo."""
+    stats = _pool_stats(engine.pool)
+    if replicas:
+        stats["replicas"] = [
+            {
+                "host": replica.engine.url.host,
+                "healthy": replica.lag is not None and replica.lag <= DB_REPLICA_MAX_LAG_SECONDS,
+                # inf (unreachable) is not valid JSON
+                "lag_seconds": replica.lag if replica.lag is not None and replica.lag != float("inf") else None,
+                **_pool_stats(replica.engine.pool)
+            }
+            for replica in replicas
+        ]
+    return stats
+
 async def get_db():
-    db = AsyncSessionLocal()
-    try:
-        yield db
-    except Exception:
-        await db.rollback()
-        raise
-    finally:
-        await db.close()
\ No newline at end of file
+    """
+    Sesión de la request. FastAPI cachea la dependencia, así que la ruta y
+    sus dependencias (get_current_user, ...) comparten esta misma sesión, y
+    la conexión solo se toma del pool en la primera query.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+async def get_read_db():
+    """
+    Sesión de solo lectura: va a una réplica con lag menor a
+    DB_REPLICA_MAX_LAG_SECONDS, o al primario si no hay ninguna disponible.
+    Solo para endpoints que no escriben.
+    """
+    replica = await _pick_replica()
+    session_factory = replica.sessionmaker if replica else AsyncSessionLocal
+    async with session_factory() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
@@ -3,10 +3,17 @@ import sys
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from database import engine, AsyncSessionLocal, pool_stats
 from contextlib import asynccontextmanager
 import asyncio
-from cronjob.cron import daily_scheduler
+from cronjob.cron import run_scheduler
+from migrations.runner import migrate, pending_migrations
+from settings import RUN_MIGRATIONS_ON_STARTUP, RUN_SCHEDULER_IN_API
+from core.valkey_connection import init_valkey_pool, close_valkey_pool
+from core.api_connection import close_http_client
+from core.http_cache import HTTPCacheMiddleware
+from services.reference_cache import reference_cache
+from services.events_valkey import event_broker
 
 # API
 from blueprints.api.countries import countries_router
@@ -15,6 +22,7 @@ from blueprints.api.fixtures import fixtures_router
 from blueprints.api.rounds import rounds_router
 from blueprints.api.tournaments import tournaments_router
 from blueprints.api.predictions import predictions_router
+from blueprints.api.events import events_router
 
 # Auth
 from blueprints.auth.auth_routes import auth_router
@@ -32,16 +40,42 @@ origins = [
 
 api_endpoint = os.getenv("API_ENDPOINT")
 
+background_task: asyncio.Task | None = None
+reference_sync_task: asyncio.Task | None = None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize database (this should be fast)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        print("Tablas creadas exitosamente.")
+    # Schema changes go through migrations/ (make migrate); at startup only
+    # a single SELECT on schema_migrations unless explicitly enabled
+    if RUN_MIGRATIONS_ON_STARTUP:
+        applied = await migrate(engine)
+        print(f"Migraciones aplicadas: {applied}" if applied else "Esquema al día.")
+    else:
+        pending = await pending_migrations(engine)
+        if pending:
+            print(f"Hay migraciones pendientes: {[m.version for m in pending]}. Correr `make migrate`.")
+
+    valkey_client = await init_valkey_pool()
+    print("Pool de Valkey iniciado.")
+
+    try:
+        # Record the current data versions first, so the first sync doesn't
+        # throw away what warm loads
+        await reference_cache.sync(valkey_client)
+        async with AsyncSessionLocal() as db:
+            await reference_cache.warm(db)
+        print("Caché de referencia precargada.")
+    except Exception as e:
+        print(f"No se pudo precargar la caché de referencia: {e}")
+
+    # The ingestion jobs run in the worker, their changes arrive through Valkey
+    global reference_sync_task
+    reference_sync_task = asyncio.create_task(reference_cache.run_sync_loop(valkey_client))
 
     global background_task
-    background_task = asyncio.create_task(daily_scheduler())
-    print("Tarea programada iniciada en segundo plano")
+    if RUN_SCHEDULER_IN_API:
+        background_task = asyncio.create_task(run_scheduler())
+        print("Tarea programada iniciada en segundo plano")
     
     yield
 
@@ -51,10 +85,23 @@ async def lifespan(app: FastAPI):
             await background_task
         except asyncio.CancelledError:
             print("Tarea programada cancelada exitosamente")
+
+    reference_sync_task.cancel()
+    try:
+        await reference_sync_task
+    except asyncio.CancelledError:
+        pass
+
+    await event_broker.close()
+    await close_http_client()
+    await close_valkey_pool()
     print("Aplicación cerrada.")
 
 app = FastAPI(lifespan=lifespan)
 
+# Added before CORS so it runs inside it: 304 responses also get CORS headers
+app.add_middleware(HTTPCacheMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,      
@@ -70,4 +117,10 @@ app.include_router(fixtures_router)
 app.include_router(rounds_router)
 app.include_router(tournaments_router)
 app.include_router(predictions_router)
-app.include_router(auth_router)
\ No newline at end of file
+app.include_router(events_router)
+app.include_router(auth_router)
+
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """Conexiones del pool de Postgres en uso, libres y en overflow."""
+    return pool_stats()
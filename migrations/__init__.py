@@ -0,0 +1,6 @@
+"""
+Migraciones de esquema versionadas (ver migrations/runner.py).
+
+    python -m migrations            # aplica las pendientes
+    python -m migrations status     # lista aplicadas y pendientes
+"""
@@ -0,0 +1,23 @@
+import asyncio
+import sys
+from database import engine
+from migrations.runner import migrate, pending_migrations
+
+async def main(command: str):
+    try:
+        if command == "status":
+            pending = await pending_migrations(engine)
+            if not pending:
+                print("Esquema al día.")
+            for migration in pending:
+                print(f"Pendiente: {migration.version} {migration.name}")
+        elif command == "upgrade":
+            applied = await migrate(engine)
+            print(f"Migraciones aplicadas: {applied}" if applied else "Esquema al día.")
+        else:
+            raise SystemExit(f"Comando desconocido: {command} (upgrade | status)")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "upgrade"))
@@ -0,0 +1,149 @@
+import importlib
+import logging
+import pkgutil
+from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger("migrations")
+
+MIGRATIONS_PACKAGE = "migrations.versions"
+
+# Held while migrating so several workers booting at once don't race
+ADVISORY_LOCK_ID = 8_204_117
+
+CREATE_SCHEMA_MIGRATIONS = text("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        applied_at TIMESTAMP NOT NULL
+    )
+""")
+
+
+class Migration:
+    """
+    Un módulo de `migrations/versions` llamado `mNNNN_descripcion.py` con una
+    función `async def upgrade(conn)`. Si el módulo define
+    `TRANSACTIONAL = False` corre en autocommit (por ejemplo para
+    CREATE INDEX CONCURRENTLY), si no dentro de una transacción.
+    """
+
+    def __init__(self, version: int, name: str, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "TRANSACTIONAL", True)
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.name!r})"
+
+
+def load_migrations(package: str = MIGRATIONS_PACKAGE) -> list[Migration]:
+    migrations = []
+    package_module = importlib.import_module(package)
+    for info in pkgutil.iter_modules(package_module.__path__):
+        if not info.name.startswith("m") or "_" not in info.name:
+            continue
+        number, name = info.name[1:].split("_", 1)
+        if not number.isdigit():
+            continue
+        module = importlib.import_module(f"{package}.{info.name}")
+        migrations.append(Migration(int(number), name, module))
+
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {package}: {versions}")
+    return migrations
+
+
+async def applied_versions(conn: AsyncConnection) -> set[int]:
+    has_table = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("schema_migrations"))
+    if not has_table:
+        return set()
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    return set(result.scalars().all())
+
+
+async def pending_migrations(engine: AsyncEngine, package: str = MIGRATIONS_PACKAGE) -> list[Migration]:
+    """Migraciones sin aplicar. Es solo un SELECT, sirve para chequear al arrancar."""
+    async with engine.connect() as conn:
+        applied = await applied_versions(conn)
+    return [migration for migration in load_migrations(package) if migration.version not in applied]
+
+
+async def _record(conn: AsyncConnection, migration: Migration):
+    await conn.execute(
+        text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+        {"version": migration.version, "name": migration.name, "applied_at": datetime.utcnow()}
+    )
+
+
+async def migrate(engine: AsyncEngine, package: str = MIGRATIONS_PACKAGE) -> list[int]:
+    """Aplica en orden las migraciones pendientes. Devuelve las versiones aplicadas."""
+    is_postgres = engine.dialect.name == "postgresql"
+    applied_now = []
+
+    async with engine.connect() as lock_conn:
+        if is_postgres:
+            await lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            await lock_conn.commit()
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(CREATE_SCHEMA_MIGRATIONS)
+                applied = await applied_versions(conn)
+
+            for migration in load_migrations(package):
+                if migration.version in applied:
+                    continue
+                logger.info(f"Applying migration {migration.version} {migration.name}")
+
+                if migration.transactional:
+                    async with engine.begin() as conn:
+                        await migration.module.upgrade(conn)
+                        await _record(conn, migration)
+                else:
+                    async with engine.connect() as conn:
+                        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                        await migration.module.upgrade(conn)
+                        await _record(conn, migration)
+                applied_now.append(migration.version)
+        finally:
+            if is_postgres:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+                await lock_conn.commit()
+
+    return applied_now
+
+
+# Helpers for migration modules. They check the live schema first, so a
+# migration also works on a database created by an older create_all.
+
+async def add_column_if_missing(conn: AsyncConnection, table: str, column: str, ddl: str):
+    """`ddl` es la definición de la columna, p. ej. "scored_at TIMESTAMP NULL"."""
+    columns = await conn.run_sync(lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns(table)})
+    if column not in columns:
+        await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+
+
+async def create_index_if_missing(
+    conn: AsyncConnection,
+    name: str,
+    table: str,
+    columns: list[str],
+    unique: bool = False,
+    concurrently: bool = False
+):
+    """
+    CREATE INDEX IF NOT EXISTS. Con `concurrently` (migración con
+    TRANSACTIONAL = False) Postgres lo crea sin bloquear escrituras.
+    """
+    concurrently = concurrently and conn.dialect.name == "postgresql"
+    await conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+        f"IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    ))
@@ -0,0 +1,13 @@
+"""
+Tablas base. En una base existente no hace nada (create_all saltea las
+tablas que ya existen); en una base nueva crea el esquema actual completo,
+por eso las migraciones siguientes son idempotentes.
+"""
+
+async def upgrade(conn):
+    # Registers every model on Base.metadata
+    import models.auth.auth_models, models.countries, models.fixtures.fixture, models.leagues  # noqa: F401
+    import models.predictions, models.rounds, models.teams, models.tournament_participants, models.tournaments  # noqa: F401
+    from database import Base
+
+    await conn.run_sync(Base.metadata.create_all)
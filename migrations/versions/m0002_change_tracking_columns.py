@@ -0,0 +1,20 @@
+"""
+Columnas agregadas después de la primera versión del esquema, que
+create_all nunca agregó a las tablas existentes:
+
+- fixtures.updated_at: marca de cambios para el sync incremental a Valkey.
+- fixtures.scored_at: hasta qué cambio se puntuó el fixture.
+- tokens.token_hash: hash del refresh token (el token ya no se guarda en claro).
+"""
+from sqlalchemy import text
+from migrations.runner import add_column_if_missing, create_index_if_missing
+
+async def upgrade(conn):
+    await add_column_if_missing(conn, "fixtures", "updated_at", "updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP")
+    await add_column_if_missing(conn, "fixtures", "scored_at", "scored_at TIMESTAMP NULL")
+    await create_index_if_missing(conn, "ix_fixtures_updated_at", "fixtures", ["updated_at"])
+
+    await add_column_if_missing(conn, "tokens", "token_hash", "token_hash VARCHAR(64) NULL")
+    await create_index_if_missing(conn, "ix_tokens_token_hash", "tokens", ["token_hash"], unique=True)
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("ALTER TABLE tokens ALTER COLUMN refresh_token DROP NOT NULL"))
@@ -0,0 +1,24 @@
+"""
+Índices para los filtros más usados. Se crean CONCURRENTLY en Postgres
+para no bloquear escrituras en tablas grandes, así que esta migración no
+corre dentro de una transacción.
+
+tokens.refresh_token ya tiene el índice de su constraint UNIQUE.
+"""
+from migrations.runner import create_index_if_missing
+
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("ix_fixtures_league_id_round", "fixtures", ["league_id", "round"]),
+    ("ix_fixtures_status", "fixtures", ["status"]),
+    ("ix_fixtures_date", "fixtures", ["date"]),
+    ("ix_predictions_match_id", "predictions", ["match_id"]),
+    ("ix_tournament_participants_user_id", "tournament_participants", ["user_id"]),
+    ("ix_rounds_league_id_season", "rounds", ["league_id", "season"]),
+    ("ix_tokens_user_id", "tokens", ["user_id"]),
+]
+
+async def upgrade(conn):
+    for name, table, columns in INDEXES:
+        await create_index_if_missing(conn, name, table, columns, concurrently=True)
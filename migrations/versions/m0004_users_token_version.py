@@ -0,0 +1,9 @@
+"""
+users.token_version: versión vigente de los tokens del usuario. Antes vivía
+solo en Valkey, y un flush o una key desalojada volvía válidos los tokens
+revocados con logout-all.
+"""
+from migrations.runner import add_column_if_missing
+
+async def upgrade(conn):
+    await add_column_if_missing(conn, "users", "token_version", "token_version INTEGER NOT NULL DEFAULT 0")
@@ -9,6 +9,8 @@ class User(Base):
     email = Column(String, unique=True, nullable=False)
     username = Column(String, unique=True, nullable=False)  # nuevo campo
     hashed_password = Column(String, nullable=False)
+    # Versión vigente de sus tokens (claim `ver`); Valkey solo la cachea
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     created_tournaments = relationship("Tournament", back_populates="creator")
@@ -18,8 +20,9 @@ class User(Base):
 class Token(Base):
     __tablename__ = "tokens"
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
-    refresh_token = Column(String, unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    refresh_token = Column(String, unique=True, nullable=True)  # legacy: raw token, new rows only store token_hash
+    token_hash = Column(String(64), unique=True, index=True, nullable=True)  # sha256 hex of the refresh token
     revoked = Column(Boolean, default=False)
     expires_at = Column(DateTime, nullable=False)
     user_agent = Column(String, nullable=True)  # nuevo campo para UserAgent
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, ForeignKey, Integer, DateTime, Enum
+from sqlalchemy import Column, String, ForeignKey, Integer, DateTime, Enum, Index
+from datetime import datetime
 from database import Base
 from models.fixtures.fixture_status import FixtureStatus
 
@@ -16,6 +17,8 @@ class Fixture(Base):
         home_pens_score (int): The number of penalties scored by the home team.
         away_pens_score (int): The number of penalties scored by the away team.
         status (FixtureStatus): The status of the fixture.
+        updated_at (datetime): Last time any of the fixture's data changed (UTC).
+        scored_at (datetime): `updated_at` value of the fixture when its predictions were last scored.
     """
 
     __tablename__ = "fixtures"
@@ -39,6 +42,21 @@ class Fixture(Base):
 
     round = Column(String(100), nullable=False)
 
+    # Change watermark used by the incremental Valkey sync. Only bumped when
+    # the ORM flushes an actual change, so untouched rows keep their value.
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
+
+    # Copy of updated_at taken by the scoring pass. A finished fixture needs
+    # (re)scoring while scored_at is NULL or older than updated_at.
+    scored_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_fixtures_league_id_round", "league_id", "round"),
+        Index("ix_fixtures_status", "status"),
+        # live window and next kick-off lookups
+        Index("ix_fixtures_date", "date"),
+    )
+
     def __init__(self,id: int, league_id: int, home_id: int, away_id: int, date: String, home_team_score: int, away_team_score: int, home_pens_score: int,away_pens_score: int, status: FixtureStatus, round: str):
         self.id = id
         self.league_id = league_id
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -26,6 +26,8 @@ class Prediction(Base):
     # Ensure unique prediction per user per match
     __table_args__ = (
         UniqueConstraint('user_id', 'match_id', name='unique_user_match_prediction'),
+        # scoring and per-match listings filter by match only
+        Index('ix_predictions_match_id', 'match_id'),
     )
 
     def to_json(self):
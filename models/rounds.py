@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Integer
+from sqlalchemy import Column, String, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
 from database import Base
 class Round(Base):
@@ -22,6 +22,10 @@ class Round(Base):
     # Relationships
     league = relationship("League")
 
+    __table_args__ = (
+        Index("ix_rounds_league_id_season", "league_id", "season"),
+    )
+
     def __init__(self, id: int, name: str, league_id: int, season: int):
         self.id = id
         self.name = name
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -18,6 +18,8 @@ class TournamentParticipant(Base):
     # Ensure unique participation per tournament
     __table_args__ = (
         UniqueConstraint('tournament_id', 'user_id', name='unique_tournament_participant'),
+        # "my tournaments" looks participations up by user
+        Index('ix_tournament_participants_user_id', 'user_id'),
     )
 
     def to_json(self):
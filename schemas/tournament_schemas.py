@@ -48,6 +48,7 @@ class TournamentVisibilityResponse(BaseModel):
 
 class TournamentLeaderboardEntry(BaseModel):
     rank: int
+    user_id: int
     username: str
     points: int
     correct_predictions: int
@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger("auth_service")
+
+# Cache de users.token_version. El TTL acota cuánto dura una versión vieja
+# si la revocación no pudo escribir en Valkey
+TOKEN_VERSION_TTL_SECONDS = 3600
+
+# Las versiones solo crecen: quien cachea lo que leyó de Postgres no pisa
+# una versión más nueva escrita por una revocación en el medio
+CACHE_VERSION_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and tonumber(current) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+def hash_token(token: str) -> str:
+    """sha256 hex del refresh token: nunca se guarda el token en claro."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthValkey:
+    """
+    Estado de autenticación guardado en Valkey.
+
+    - Versión de tokens por usuario: cada token lleva la versión vigente al
+      emitirlo (claim `ver`). La versión durable es users.token_version
+      (TokenPostgres.bump_token_version la sube al revocar); acá se cachea
+      para no tocar Postgres en cada request. Sin la key, se lee de Postgres.
+    - Refresh tokens activos, por hash, con el TTL del token: vencen solos.
+      Un sorted set por usuario (score: vencimiento) permite revocar todas
+      sus sesiones en una operación.
+    """
+
+    def __init__(self, valkey_client):
+        self.valkey_client = valkey_client
+
+    def _version_key(self, user_id: int):
+        return f"auth:token_version:{user_id}"
+
+    def _refresh_key(self, token_hash: str):
+        return f"auth:refresh:{token_hash}"
+
+    def _user_sessions_key(self, user_id: int):
+        return f"auth:sessions:{user_id}"
+
+    async def get_token_version(self, user_id: int) -> Optional[int]:
+        """Versión cacheada, None si no está (hay que leerla de Postgres)."""
+        value = await self.valkey_client.get(self._version_key(user_id))
+        return int(value) if value is not None else None
+
+    async def cache_token_version(self, user_id: int, version: int) -> bool:
+        """Cachea la versión salvo que Valkey ya tenga una igual o más nueva."""
+        result = await self.valkey_client.eval(
+            CACHE_VERSION_SCRIPT, 1, self._version_key(user_id), version, TOKEN_VERSION_TTL_SECONDS
+        )
+        return bool(result)
+
+    async def store_refresh_token(self, token_hash: str, user_id: int, ttl_seconds: int):
+        expires_at = time.time() + ttl_seconds
+        sessions_key = self._user_sessions_key(user_id)
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        pipeline.set(self._refresh_key(token_hash), user_id, ex=ttl_seconds)
+        pipeline.zadd(sessions_key, {token_hash: expires_at})
+        # drop sessions that already expired on their own
+        pipeline.zremrangebyscore(sessions_key, "-inf", time.time())
+        # every refresh token has the same TTL, so the newest one expires last
+        pipeline.expire(sessions_key, ttl_seconds)
+        await pipeline.execute()
+
+    async def get_refresh_token_user(self, token_hash: str) -> Optional[int]:
+        """user_id del refresh token si sigue activo, None si no está (vencido, revocado o no cargado)."""
+        value = await self.valkey_client.get(self._refresh_key(token_hash))
+        return int(value) if value is not None else None
+
+    async def revoke_refresh_token(self, token_hash: str, user_id: int) -> bool:
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        pipeline.delete(self._refresh_key(token_hash))
+        pipeline.zrem(self._user_sessions_key(user_id), token_hash)
+        deleted, _ = await pipeline.execute()
+        return bool(deleted)
+
+    async def revoke_all_refresh_tokens(self, user_id: int) -> int:
+        """Revoca todas las sesiones del usuario. Devuelve cuántas estaban activas."""
+        sessions_key = self._user_sessions_key(user_id)
+        token_hashes = await self.valkey_client.zrange(sessions_key, 0, -1)
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        for token_hash in token_hashes:
+            if isinstance(token_hash, bytes):
+                token_hash = token_hash.decode()
+            pipeline.delete(self._refresh_key(token_hash))
+        pipeline.delete(sessions_key)
+        results = await pipeline.execute()
+        return sum(results[:-1])
@@ -0,0 +1,72 @@
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Rows per INSERT statement. Keeps the bind parameter count far below the
+# Postgres limit (32767) for the widest table.
+UPSERT_BATCH_SIZE = 500
+
+def dialect_insert(db: AsyncSession, model):
+    """
+    INSERT con soporte de ON CONFLICT para el motor de la sesión
+    (Postgres en producción, SQLite en los tests).
+    """
+    if db.bind.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+def dedupe_by_key(rows: list[dict], key: list[str]) -> list[dict]:
+    """Una fila por clave (gana la última), ON CONFLICT no admite duplicados en un mismo INSERT."""
+    return list({tuple(row[column] for column in key): row for row in rows}.values())
+
+async def bulk_upsert(
+    db: AsyncSession,
+    model,
+    rows: list[dict],
+    key: list[str],
+    update_columns: list[str],
+    extra_set: dict | None = None,
+    batch_size: int = UPSERT_BATCH_SIZE
+) -> dict:
+    """
+    INSERT ... ON CONFLICT (key) DO UPDATE por lotes, sin commit.
+
+    Solo se actualizan las filas en las que alguna de `update_columns`
+    cambió (IS DISTINCT FROM), así que las filas idénticas no se reescriben.
+    `extra_set` agrega valores fijos al UPDATE (por ejemplo updated_at, que
+    no recibe su onupdate dentro de un ON CONFLICT).
+
+    Devuelve {"inserted", "updated", "unchanged"}.
+    """
+    rows = dedupe_by_key(rows, key)
+    key_columns = [getattr(model, column) for column in key]
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+
+        # Which keys already exist, to tell inserts from updates
+        batch_keys = [tuple(row[column] for column in key) for row in batch]
+        existing_query = select(*key_columns).where(tuple_(*key_columns).in_(batch_keys))
+        existing = {tuple(row) for row in (await db.execute(existing_query)).all()}
+
+        stmt = dialect_insert(db, model).values(batch)
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        set_.update(extra_set or {})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_=set_,
+            where=or_(*(
+                getattr(model, column).is_distinct_from(stmt.excluded[column])
+                for column in update_columns
+            ))
+        ).returning(*key_columns)
+
+        written = {tuple(row) for row in (await db.execute(stmt)).all()}
+        inserted = len(written - existing)
+        updated = len(written & existing)
+        counts["inserted"] += inserted
+        counts["updated"] += updated
+        counts["unchanged"] += len(batch) - inserted - updated
+
+    return counts
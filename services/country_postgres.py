@@ -1,6 +1,13 @@
+import logging
+import uuid
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models.countries import Country
+from services.bulk_upsert import bulk_upsert
+from services.reference_cache import NEGATIVE_TTL_SECONDS, reference_cache
+
+logger = logging.getLogger("country_service")
 
 class CountryPostgres():
     
@@ -31,6 +38,54 @@ class CountryPostgres():
         else:
             return await self.add_country(db, name, code, flag)
 
+    async def bulk_upsert_countries(self, db: AsyncSession, countries: list[dict]) -> dict:
+        """
+        Inserta o actualiza muchos países en una transacción (ON CONFLICT sobre
+        `name`, que es la clave que referencian teams y leagues).
+        Cada dict trae name, code y flag. Devuelve {"inserted", "updated", "unchanged"}.
+
+        `code` también es único: si un código pasa a otro nombre (un país
+        renombrado) se le quita a la fila vieja, que queda porque teams y
+        leagues la referencian por nombre.
+        """
+        rows = [
+            {"id": uuid.uuid4(), "name": country["name"], "code": country.get("code"), "flag": country.get("flag")}
+            for country in countries
+        ]
+        names_by_code = {}
+        for row in rows:
+            if row["code"] is None:
+                continue
+            if names_by_code.setdefault(row["code"], row["name"]) != row["name"]:
+                logger.warning(f"Country code {row['code']} repeated for {row['name']}, stored without code")
+                row["code"] = None
+        try:
+            await self._release_reassigned_codes(db, names_by_code)
+            counts = await bulk_upsert(db, Country, rows, key=["name"], update_columns=["code", "flag"])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return counts
+
+    async def _release_reassigned_codes(self, db: AsyncSession, names_by_code: dict[str, str]):
+        if not names_by_code:
+            return
+        result = await db.execute(
+            select(Country.id, Country.name, Country.code).where(Country.code.in_(list(names_by_code)))
+        )
+        stale = [(id, name, code) for id, name, code in result.all() if names_by_code[code] != name]
+        if not stale:
+            return
+        for _id, name, code in stale:
+            logger.info(f"Country code {code} moved from {name} to {names_by_code[code]}")
+        await db.execute(update(Country).where(Country.id.in_([id for id, _name, _code in stale])).values(code=None))
+
+    async def get_country_names(self, db: AsyncSession) -> set[str]:
+        """Nombres de todos los países, para resolver foreign keys en memoria."""
+        result = await db.execute(select(Country.name))
+        return set(result.scalars().all())
+
     async def get_all_countries(self, db: AsyncSession):
         result = await db.execute(select(Country))
         return result.scalars().all()
@@ -39,6 +94,29 @@ class CountryPostgres():
         result = await db.execute(select(Country).where(Country.name == name))
         return result.scalars().first()
 
+    async def get_all_countries_json(self, db: AsyncSession) -> list[dict]:
+        """Lista de países en JSON, servida desde la caché de referencia."""
+        cache = reference_cache.region("countries")
+        countries = cache.get("all")
+        if countries is None:
+            countries = self.countries_to_json(await self.get_all_countries(db))
+            cache.set("all", countries)
+            for country in countries:
+                cache.set(("name", country["name"]), country)
+        return countries
+
+    async def get_country_json_by_name(self, db: AsyncSession, name: str) -> dict | None:
+        """País en JSON por nombre, servido desde la caché de referencia."""
+        cache = reference_cache.region("countries")
+        key = ("name", name)
+        if key in cache:
+            return cache.get(key)
+
+        country = await self.get_country_by_name(db, name)
+        country_json = country.to_json() if country else None
+        cache.set(key, country_json, ttl=NEGATIVE_TTL_SECONDS if country_json is None else None)
+        return country_json
+
     def countries_to_json(self, countries: list[Country]):
         return [
             country.to_json()
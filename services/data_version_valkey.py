@@ -0,0 +1,73 @@
+import logging
+import time
+from typing import Iterable
+from core.valkey_connection import get_valkey_client
+from settings import DATABASE_REPLICA_URLS, DB_REPLICA_MAX_LAG_SECONDS, DB_REPLICA_LAG_CHECK_SECONDS
+
+logger = logging.getLogger("data_version_service")
+
+# A change is visible on every read path once the replicas caught up: a
+# replica in use can be DB_REPLICA_MAX_LAG_SECONDS behind, as measured up to
+# DB_REPLICA_LAG_CHECK_SECONDS ago. Without replicas it is visible at once.
+SETTLE_SECONDS = DB_REPLICA_MAX_LAG_SECONDS + DB_REPLICA_LAG_CHECK_SECONDS if DATABASE_REPLICA_URLS else 0
+
+
+def is_settled(version: int) -> bool:
+    """Whether reads through get_read_db already see the change of this version."""
+    return version <= (time.time() - SETTLE_SECONDS) * 1000
+
+
+class DataVersionValkey:
+    """
+    Versión de cada conjunto de datos de referencia, compartida por la API
+    y el worker. La base de los ETag de core/http_cache.py.
+
+    La versión es el instante del último cambio en milisegundos: sirve
+    también de Last-Modified, y no se repite si Valkey se vacía (un
+    contador reiniciado volvería a dar ETags ya vistos por los clientes).
+    """
+
+    def __init__(self, valkey_client):
+        self.valkey_client = valkey_client
+
+    def _version_key(self, dataset: str):
+        return f"data_version:{dataset}"
+
+    async def bump(self, *datasets: str):
+        now = int(time.time() * 1000)
+        pipeline = self.valkey_client.pipeline(transaction=False)
+        for dataset in datasets:
+            pipeline.set(self._version_key(dataset), now)
+        await pipeline.execute()
+        logger.info(f"Data version bumped: {sorted(datasets)}")
+
+    async def get_versions(self, datasets: Iterable[str]) -> list[int]:
+        """Versiones en el orden pedido. Las que no existen se crean con el instante actual."""
+        datasets = list(datasets)
+        keys = [self._version_key(dataset) for dataset in datasets]
+        values = await self.valkey_client.mget(keys)
+
+        missing = [key for key, value in zip(keys, values) if value is None]
+        if missing:
+            now = int(time.time() * 1000)
+            pipeline = self.valkey_client.pipeline(transaction=False)
+            for key in missing:
+                pipeline.set(key, now, nx=True)
+                pipeline.get(key)
+            results = await pipeline.execute()
+            created = dict(zip(missing, results[1::2]))
+            values = [created.get(key, value) if value is None else value for key, value in zip(keys, values)]
+
+        return [int(value) for value in values]
+
+
+async def bump_data_version(*datasets: str):
+    """
+    Para los jobs de ingesta, con el cliente compartido. Un fallo solo se
+    loguea: el job no se corta, pero los clientes seguirán recibiendo 304
+    hasta el próximo cambio.
+    """
+    try:
+        await DataVersionValkey(get_valkey_client()).bump(*datasets)
+    except Exception as e:
+        logger.error(f"Could not bump data version of {sorted(datasets)}: {e}")
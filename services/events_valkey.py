@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from core.valkey_connection import get_valkey_client
+from settings import EVENTS_QUEUE_SIZE
+
+logger = logging.getLogger("events_service")
+
+CHANNEL_PREFIX = "events:"
+# Seconds before re-subscribing after the pub/sub connection drops
+RECONNECT_SECONDS = 2
+
+# Sent instead of the buffered events when a client falls behind: it should
+# refetch GET /fixtures or the leaderboard and keep listening
+RESYNC_EVENT = json.dumps({"type": "resync"})
+
+
+def league_channel(league_id: int) -> str:
+    return f"{CHANNEL_PREFIX}league:{league_id}"
+
+
+def tournament_channel(tournament_id: int) -> str:
+    return f"{CHANNEL_PREFIX}tournament:{tournament_id}"
+
+
+def fixture_event(fixture: dict) -> str:
+    return json.dumps({"type": "fixture", "fixture": fixture})
+
+
+def leaderboard_event(tournament_id: int, changes: list[dict]) -> str:
+    return json.dumps({"type": "leaderboard", "tournament_id": tournament_id, "changes": changes})
+
+
+class EventBroker:
+    """
+    Reparte los eventos publicados en Valkey (`events:*`) a los clientes
+    conectados a este proceso.
+
+    Cualquier proceso publica (el worker al sincronizar fixtures o
+    actualizar leaderboards) y cada proceso de la API mantiene una sola
+    conexión de pub/sub con PSUBSCRIBE, sin importar cuántos clientes
+    tenga: cada cliente recibe los mensajes de su canal en una cola propia.
+    """
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[channel].add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(channel)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[channel]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def dispatch(self, channel: str, data: str):
+        for queue in self._subscribers.get(channel, ()):
+            if queue.full():
+                # Slow client: a gap in the deltas would leave it with a wrong
+                # state, drop the backlog and ask it to refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+                continue
+            queue.put_nowait(data)
+
+    async def _listen(self):
+        while True:
+            pubsub = get_valkey_client().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel, data = message["channel"], message["data"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    self.dispatch(channel, data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event subscription lost, retrying in {RECONNECT_SECONDS}s: {e}")
+                # Events published meanwhile are lost, clients must refetch
+                for channel in list(self._subscribers):
+                    self.dispatch(channel, RESYNC_EVENT)
+                await asyncio.sleep(RECONNECT_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+
+event_broker = EventBroker()
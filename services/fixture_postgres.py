@@ -1,11 +1,20 @@
 from models.fixtures.fixture import Fixture
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 from models.fixtures.fixture_status import FixtureStatus
 from services.teams_postgres import TeamPostgres
-from datetime import datetime
+from services.bulk_upsert import bulk_upsert
+from models.teams import Team
+from models.leagues import League
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Any, cast
 
+# Statuses after which a fixture won't change anymore (for the live poller)
+TERMINAL_STATUSES = (
+    FixtureStatus.FT, FixtureStatus.AET, FixtureStatus.PEN, FixtureStatus.PST,
+    FixtureStatus.CANC, FixtureStatus.ABD, FixtureStatus.AWD, FixtureStatus.WO
+)
+
 class FixturePostgres:
     async def add_or_update_fixture(
         self,
@@ -59,11 +68,113 @@ class FixturePostgres:
             await db.close()
             raise Exception(e)
 
+    FIXTURE_COLUMNS = [
+        "league_id", "home_id", "away_id", "date",
+        "home_team_score", "away_team_score", "home_pens_score", "away_pens_score",
+        "status", "round"
+    ]
+
+    async def bulk_upsert_fixtures(self, db: AsyncSession, fixtures: list[dict]) -> dict:
+        """
+        Inserta o actualiza muchos fixtures en una sola transacción con
+        INSERT ... ON CONFLICT (id) DO UPDATE por lotes.
+
+        Cada dict trae `id` y las columnas de FIXTURE_COLUMNS. Solo se
+        reescriben (y se les mueve `updated_at`) los fixtures que cambiaron.
+        Los fixtures cuyo equipo o liga no existe se descartan antes del
+        INSERT para no abortar el lote entero por una foreign key.
+        Devuelve {"inserted", "updated", "unchanged", "skipped"}.
+        """
+        if not fixtures:
+            return {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": []}
+
+        # Start of this transaction by the database clock, the one the Valkey
+        # sync measures its watermark with (FixtureValkey.add_or_update_fixture)
+        now = await self.get_db_utcnow(db)
+        team_ids = {fixture["home_id"] for fixture in fixtures} | {fixture["away_id"] for fixture in fixtures}
+        league_ids = {fixture["league_id"] for fixture in fixtures}
+        known_teams = set((await db.execute(select(Team.id).where(Team.id.in_(team_ids)))).scalars().all())
+        known_leagues = set((await db.execute(select(League.id).where(League.id.in_(league_ids)))).scalars().all())
+
+        rows = []
+        skipped = []
+        for fixture in fixtures:
+            if (fixture["home_id"] not in known_teams or fixture["away_id"] not in known_teams
+                    or fixture["league_id"] not in known_leagues):
+                skipped.append(fixture)
+                continue
+            rows.append({"id": fixture["id"], **{column: fixture.get(column) for column in self.FIXTURE_COLUMNS}})
+        for row in rows:
+            row["updated_at"] = now
+
+        try:
+            counts = await bulk_upsert(
+                db,
+                Fixture,
+                rows,
+                key=["id"],
+                update_columns=self.FIXTURE_COLUMNS,
+                extra_set={"updated_at": now}
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return {**counts, "skipped": skipped}
+
+    async def get_db_utcnow(self, db: AsyncSession) -> datetime:
+        """Hora UTC (sin zona) de la base; en Postgres, la del inicio de la transacción."""
+        if db.bind.dialect.name == "sqlite":
+            return datetime.fromisoformat(await db.scalar(select(func.strftime("%Y-%m-%d %H:%M:%f", "now"))))
+        return await db.scalar(select(func.timezone("UTC", func.now())))
+
     async def get_all_data(self, db: AsyncSession):
         """Devuelve todos los fixtures disponibles en la base de datos."""
         result = await db.execute(select(Fixture))
         return result.scalars().all()
 
+    async def get_fixtures_updated_since(self, db: AsyncSession, since: datetime):
+        """Devuelve los fixtures cuyo `updated_at` es igual o posterior a `since`."""
+        result = await db.execute(
+            select(Fixture)
+            .where(cast(Any, Fixture.updated_at >= since))
+            .order_by(Fixture.updated_at)
+        )
+        return result.scalars().all()
+
+    async def get_live_window_fixture_ids(
+        self,
+        db: AsyncSession,
+        before_kickoff: timedelta,
+        after_kickoff: timedelta
+    ) -> list[int]:
+        """
+        Ids de los fixtures que todavía no terminaron y cuyo kick-off está entre
+        `now - after_kickoff` y `now + before_kickoff`: los que pueden estar
+        jugándose ahora.
+        """
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(Fixture.id)
+            .where(
+                Fixture.date.between(now - after_kickoff, now + before_kickoff),
+                (Fixture.status.is_(None)) | (Fixture.status.notin_(TERMINAL_STATUSES))
+            )
+            .order_by(Fixture.date)
+        )
+        return list(result.scalars().all())
+
+    async def get_next_kickoff(self, db: AsyncSession) -> Optional[datetime]:
+        """Fecha del próximo fixture no terminado que todavía no empezó."""
+        result = await db.execute(
+            select(func.min(Fixture.date))
+            .where(
+                Fixture.date > datetime.now(timezone.utc),
+                (Fixture.status.is_(None)) | (Fixture.status.notin_(TERMINAL_STATUSES))
+            )
+        )
+        return result.scalar_one_or_none()
+
     async def get_fixture_by_id(self, db: AsyncSession, fixture_id: int) -> Optional[Fixture]:
         """Retrieve a single fixture by its id."""
         result = await db.execute(select(Fixture).where(cast(Any, Fixture.id == fixture_id)))
@@ -75,29 +186,37 @@ class FixturePostgres:
         if not fixture:
             return None
 
+        enriched = await self._enrich_with_teams(db, [fixture])
+        return enriched[0]
+
+    async def _enrich_with_teams(self, db: AsyncSession, fixtures) -> list[dict]:
+        """Embed home/away team info in each fixture, loading all teams in one query."""
         team_service = TeamPostgres()
-        home_id = getattr(fixture, 'home_id')
-        away_id = getattr(fixture, 'away_id')
-        home_team = await team_service.get_team_with_country_info(db, home_id)
-        away_team = await team_service.get_team_with_country_info(db, away_id)
+        team_ids = set()
+        for fixture in fixtures:
+            team_ids.add(getattr(fixture, 'home_id'))
+            team_ids.add(getattr(fixture, 'away_id'))
+        teams = await team_service.get_teams_with_country_info(db, team_ids)
 
-        date = getattr(fixture, 'date')
-        status = getattr(fixture, 'status')
+        enriched_fixtures = []
+        for fixture in fixtures:
+            date = getattr(fixture, 'date')
+            status = getattr(fixture, 'status')
 
-        enriched = {
-            "id": getattr(fixture, 'id'),
-            "league": getattr(fixture, 'league_id'),
-            "home": home_team,
-            "away": away_team,
-            "date": date.isoformat() if date else None,
-            "home_team_score": getattr(fixture, 'home_team_score'),
-            "away_team_score": getattr(fixture, 'away_team_score'),
-            "home_pens_score": getattr(fixture, 'home_pens_score'),
-            "away_pens_score": getattr(fixture, 'away_pens_score'),
-            "status": status.value if status else None,
-            "round": getattr(fixture, 'round')
-        }
-        return enriched
+            enriched_fixtures.append({
+                "id": getattr(fixture, 'id'),
+                "league": getattr(fixture, 'league_id'),
+                "home": teams.get(getattr(fixture, 'home_id')),
+                "away": teams.get(getattr(fixture, 'away_id')),
+                "date": date.isoformat() if date else None,
+                "home_team_score": getattr(fixture, 'home_team_score'),
+                "away_team_score": getattr(fixture, 'away_team_score'),
+                "home_pens_score": getattr(fixture, 'home_pens_score'),
+                "away_pens_score": getattr(fixture, 'away_pens_score'),
+                "status": status.value if status else None,
+                "round": getattr(fixture, 'round')
+            })
+        return enriched_fixtures
 
     def _is_fixture_locked(self, fixture: Fixture) -> bool:
         """Determine whether predictions for this fixture should be locked.
@@ -162,31 +281,4 @@ class FixturePostgres:
         )
 
         fixtures = result.scalars().all()
-
-        team_service = TeamPostgres()
-        enriched_fixtures = []
-
-        for fixture in fixtures:
-            home_id = getattr(fixture, 'home_id')
-            away_id = getattr(fixture, 'away_id')
-            home_team = await team_service.get_team_with_country_info(db, home_id)
-            away_team = await team_service.get_team_with_country_info(db, away_id)
-
-            date = getattr(fixture, 'date')
-            status = getattr(fixture, 'status')
-
-            enriched_fixtures.append({
-                "id": getattr(fixture, 'id'),
-                "league": getattr(fixture, 'league_id'),
-                "home": home_team,
-                "away": away_team,
-                "date": date.isoformat() if date else None,
-                "home_team_score": getattr(fixture, 'home_team_score'),
-                "away_team_score": getattr(fixture, 'away_team_score'),
-                "home_pens_score": getattr(fixture, 'home_pens_score'),
-                "away_pens_score": getattr(fixture, 'away_pens_score'),
-                "status": status.value if status else None,
-                "round": getattr(fixture, 'round')
-            })
-
-        return enriched_fixtures
\ No newline at end of file
+        return await self._enrich_with_teams(db, fixtures)
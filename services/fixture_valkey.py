@@ -4,13 +4,26 @@ from database import get_db  # your async session provider
 from services.fixture_postgres import FixturePostgres
 from services.fixture_service import FixtureService
 from services.teams_postgres import TeamPostgres
+from services.events_valkey import fixture_event, league_channel
+from services.data_version_valkey import DataVersionValkey
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+SYNC_WATERMARK_KEY = "fixtures:sync:watermark"
+SYNC_BATCH_SIZE = 500
+# Longest a fixture write transaction stays open. Rows are stamped with the
+# start of their transaction but only become visible when it commits, so each
+# sync re-reads this far back from the start of the previous one
+SYNC_MAX_TRANSACTION = timedelta(minutes=5)
+# A change in any of these is pushed to the league's live event stream
+LIVE_EVENT_FIELDS = ("home_team_score", "away_team_score", "home_pens_score", "away_pens_score", "status", "date")
+
 class FixtureValkey(FixtureService):
     def __init__(self, valkey_client):
-        self.valkey_client = valkey_client  # sync valkey client or async if available
+        self.valkey_client = valkey_client  # valkey.asyncio client
 
     def _fixture_key(self, fixture_id: int):
         return f"fixture:{fixture_id}"
@@ -38,7 +51,7 @@ class FixtureValkey(FixtureService):
             cursor = 0
             
             while True:
-                cursor, keys = self.valkey_client.scan(cursor, match="fixture:*", count=100)
+                cursor, keys = await self.valkey_client.scan(cursor, match="fixture:*", count=100)
                 fixture_keys.extend(keys)
                 #print(f"📋 Found {len(keys)} keys in this scan, total: {len(fixture_keys)}")
                 if cursor == 0:
@@ -63,7 +76,7 @@ class FixtureValkey(FixtureService):
                 pipeline = self.valkey_client.pipeline()
                 for key in batch_keys:
                     pipeline.get(key)
-                batch_results = pipeline.execute()
+                batch_results = await pipeline.execute()
                 
                 for key, fixture_json in zip(batch_keys, batch_results):
                     if fixture_json:
@@ -93,62 +106,127 @@ class FixtureValkey(FixtureService):
             traceback.print_exc()
             raise
 
-    async def add_or_update_fixture(self):
-        print("add_or_update_fixture")
+    async def add_or_update_fixture(self, full_sync: bool = False):
+        """
+        Sync fixtures from PostgreSQL to Valkey.
+
+        By default only fixtures whose `updated_at` is newer than the watermark
+        stored in Valkey (minus SYNC_MAX_TRANSACTION) are pushed. When there is
+        no watermark (first run or a flushed Valkey) or `full_sync` is True,
+        every fixture is pushed. Writes are batched through pipelines.
+
+        The watermark is the database time when this sync started, not the
+        newest `updated_at` seen: the live and ingest jobs write concurrently,
+        and a transaction that commits late carries an older `updated_at`.
+        """
         print("🚀 Starting fixture data sync from PostgreSQL to Valkey")
         
         fixture_postgres = FixturePostgres()
         try:
-            print("📡 Connecting to database...")
             async for db in get_db():
-                print("✅ Database connection established")
-                
-                print("📥 Fetching all fixtures from PostgreSQL...")
-                fixtures = await fixture_postgres.get_all_data(db)
+                watermark = None if full_sync else await self._get_sync_watermark()
+                # Taken before reading, so whatever commits after the read is
+                # stamped no earlier than this minus SYNC_MAX_TRANSACTION
+                sync_started = await fixture_postgres.get_db_utcnow(db)
+
+                if watermark:
+                    since = watermark - SYNC_MAX_TRANSACTION
+                    print(f"📥 Fetching fixtures updated since {since.isoformat()}...")
+                    fixtures = await fixture_postgres.get_fixtures_updated_since(db, since)
+                else:
+                    print("📥 Fetching all fixtures from PostgreSQL (full sync)...")
+                    fixtures = await fixture_postgres.get_all_data(db)
                 print(f"📊 Retrieved {len(fixtures)} fixtures from database")
                 
                 if not fixtures:
-                    print("⚠️ No fixtures found in database")
+                    print("⚠️ No changed fixtures found in database")
+                    await self._set_sync_watermark(sync_started)
                     return "0 fixtures synced to Valkey"
                 
-                # Save each fixture to Valkey
-                processed_count = 0
-                for i, f in enumerate(fixtures, 1):
-                    if i % 100 == 0 or i == len(fixtures):
-                        print(f"🔄 Processing fixture {i}/{len(fixtures)} ({(i/len(fixtures))*100:.1f}%)")
-                    
-                    fixture_data = {
-                        "id": f.id,
-                        "league_id": f.league_id,
-                        "home_id": f.home_id,
-                        "away_id": f.away_id,
-                        "date": f.date.isoformat() if f.date else None,
-                        "home_team_score": f.home_team_score,
-                        "away_team_score": f.away_team_score,
-                        "home_pens_score": f.home_pens_score,
-                        "away_pens_score": f.away_pens_score,
-                        "status": f.status.value if f.status else None,
-                        "round": f.round
-                    }
-
-                    key = self._fixture_key(f.id)
-                    self.valkey_client.set(key, json.dumps(fixture_data))
-
-                    league_round_key = self._league_round_key(f.league_id, f.round)
-                    self.valkey_client.sadd(league_round_key, f.id)
-                    
-                    processed_count += 1
-                
-                print(f"✅ Successfully processed {processed_count} fixtures")
-                print(f"📝 Created/updated {processed_count} fixture keys in Valkey")
-                print("🏁 Fixture sync completed successfully")
-                
+                changed = 0
+                for i in range(0, len(fixtures), SYNC_BATCH_SIZE):
+                    changed += await self._write_fixture_batch(fixtures[i:i + SYNC_BATCH_SIZE])
+                if changed:
+                    # New ETag for GET /fixtures (core/http_cache.py)
+                    await DataVersionValkey(self.valkey_client).bump("fixtures")
+
+                await self._set_sync_watermark(sync_started)
+
+                print(f"✅ Created/updated {len(fixtures)} fixture keys in Valkey")
                 return f"{len(fixtures)} fixtures synced to Valkey"
                 
         except Exception as e:
             print(f"💥 Error during fixture sync: {str(e)}")
-            print("Full traceback:")
             raise
+
+    async def _get_sync_watermark(self) -> Optional[datetime]:
+        value = await self.valkey_client.get(SYNC_WATERMARK_KEY)
+        if not value:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode()
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            logger.warning(f"Invalid fixture sync watermark {value!r}, falling back to full sync")
+            return None
+
+    async def _set_sync_watermark(self, watermark: datetime):
+        await self.valkey_client.set(SYNC_WATERMARK_KEY, watermark.isoformat())
+
+    def _fixture_to_dict(self, f) -> dict:
+        return {
+            "id": f.id,
+            "league_id": f.league_id,
+            "home_id": f.home_id,
+            "away_id": f.away_id,
+            "date": f.date.isoformat() if f.date else None,
+            "home_team_score": f.home_team_score,
+            "away_team_score": f.away_team_score,
+            "home_pens_score": f.home_pens_score,
+            "away_pens_score": f.away_pens_score,
+            "status": f.status.value if f.status else None,
+            "round": f.round
+        }
+
+    async def _write_fixture_batch(self, fixtures: list) -> int:
+        """Write a batch of fixtures in two round trips.
+
+        The previous values are read first so a fixture that moved to another
+        league/round is removed from its old set, and so score or status
+        changes are published to the league's event channel.
+        Returns how many fixtures are new or differ from the stored value.
+        """
+        keys = [self._fixture_key(f.id) for f in fixtures]
+
+        pipeline = self.valkey_client.pipeline()
+        for key in keys:
+            pipeline.get(key)
+        previous_values = await pipeline.execute()
+
+        changed = 0
+        pipeline = self.valkey_client.pipeline(transaction=False)
+        for f, key, previous_json in zip(fixtures, keys, previous_values):
+            fixture = self._fixture_to_dict(f)
+            fixture_json = json.dumps(fixture)
+            if isinstance(previous_json, bytes):
+                previous_json = previous_json.decode()
+            if previous_json != fixture_json:
+                changed += 1
+            if previous_json:
+                try:
+                    previous = json.loads(previous_json)
+                    if (previous.get("league_id"), previous.get("round")) != (f.league_id, f.round):
+                        pipeline.srem(self._league_round_key(previous.get("league_id"), previous.get("round")), f.id)
+                    if any(previous.get(field) != fixture[field] for field in LIVE_EVENT_FIELDS):
+                        pipeline.publish(league_channel(f.league_id), fixture_event(fixture))
+                except json.JSONDecodeError:
+                    pass
+
+            pipeline.set(key, fixture_json)
+            pipeline.sadd(self._league_round_key(f.league_id, f.round), f.id)
+        await pipeline.execute()
+        return changed
     
     async def get_fixtures_by_league_and_round_and_teams(self, league_id: int, round_name: str, db: AsyncSession):
         """Devuelve todos los fixtures de una liga y ronda específica desde Valkey con información de equipos."""
@@ -160,7 +238,7 @@ class FixtureValkey(FixtureService):
             
             # Get the set of fixture IDs for this league and round
             league_round_key = self._league_round_key(league_id, round_name)
-            fixture_ids = self.valkey_client.smembers(league_round_key)
+            fixture_ids = await self.valkey_client.smembers(league_round_key)
             
             if not fixture_ids:
                 print(f"⚠️ No fixtures found for league {league_id}, round {round_name}")
@@ -175,7 +253,7 @@ class FixtureValkey(FixtureService):
             for fixture_id in fixture_ids:
                 pipeline.get(self._fixture_key(int(fixture_id)))
             
-            fixture_jsons = pipeline.execute()
+            fixture_jsons = await pipeline.execute()
             
             # Parse JSON data for each fixture
             for fixture_json in fixture_jsons:
@@ -197,30 +275,28 @@ class FixtureValkey(FixtureService):
             raise e
 
     async def _enrich_fixtures_with_teams(self, db: AsyncSession, fixtures: list) -> list:
-        """Enrich fixtures with home and away team information."""
-        enriched_fixtures = []
+        """Enrich fixtures with home and away team information.
+
+        All referenced teams are loaded with a single query.
+        """
         team_service = TeamPostgres()
-        
+        team_ids = set()
         for fixture in fixtures:
-            try:
-                # Get home team information
-                home_team = await team_service.get_team_with_country_info(db, fixture.get('home_id'))
-                
-                # Get away team information  
-                away_team = await team_service.get_team_with_country_info(db, fixture.get('away_id'))
-                
-                # Create enriched fixture with team information
-                enriched_fixture = {
-                    **fixture,
-                    "home_team": home_team,
-                    "away_team": away_team
-                }
-                
-                enriched_fixtures.append(enriched_fixture)
-                
-            except Exception as e:
-                print(f"❌ Error enriching fixture {fixture.get('id')}: {e}")
-                # Still include the fixture without team info
-                enriched_fixtures.append(fixture)
-        
-        return enriched_fixtures
\ No newline at end of file
+            team_ids.add(fixture.get('home_id'))
+            team_ids.add(fixture.get('away_id'))
+
+        try:
+            teams = await team_service.get_teams_with_country_info(db, team_ids)
+        except Exception as e:
+            print(f"❌ Error loading teams for fixtures: {e}")
+            # Still return the fixtures without team info
+            return fixtures
+
+        return [
+            {
+                **fixture,
+                "home_team": teams.get(fixture.get('home_id')),
+                "away_team": teams.get(fixture.get('away_id'))
+            }
+            for fixture in fixtures
+        ]
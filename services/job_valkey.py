@@ -0,0 +1,94 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger("job_registry")
+
+# Only the owner of a lock (same token) may extend or release it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+DATETIME_FIELDS = ("next_run", "last_started", "last_finished", "last_success")
+
+
+class JobValkey:
+    """
+    Estado y locks de los jobs programados, compartidos por todos los workers.
+
+    Cada job tiene un hash `jobs:<name>:state` (next_run, last_started,
+    last_finished, last_success, last_error, last_duration, runs) y un lock
+    `jobs:<name>:lock` tomado con SET NX PX; el valor es un token propio de
+    quien lo tomó, así un lock vencido no lo puede liberar otro worker.
+    """
+
+    def __init__(self, valkey_client):
+        self.valkey_client = valkey_client
+
+    def _state_key(self, name: str):
+        return f"jobs:{name}:state"
+
+    def _lock_key(self, name: str):
+        return f"jobs:{name}:lock"
+
+    async def acquire_lock(self, name: str, ttl_seconds: float) -> Optional[str]:
+        """Devuelve el token del lock, o None si otro worker lo tiene."""
+        token = uuid.uuid4().hex
+        acquired = await self.valkey_client.set(self._lock_key(name), token, nx=True, px=int(ttl_seconds * 1000))
+        return token if acquired else None
+
+    async def extend_lock(self, name: str, token: str, ttl_seconds: float) -> bool:
+        result = await self.valkey_client.eval(EXTEND_LOCK_SCRIPT, 1, self._lock_key(name), token, int(ttl_seconds * 1000))
+        return bool(result)
+
+    async def release_lock(self, name: str, token: str) -> bool:
+        result = await self.valkey_client.eval(RELEASE_LOCK_SCRIPT, 1, self._lock_key(name), token)
+        return bool(result)
+
+    async def get_state(self, name: str) -> dict:
+        raw = await self.valkey_client.hgetall(self._state_key(name))
+        state = {}
+        for field, value in raw.items():
+            if isinstance(field, bytes):
+                field = field.decode()
+            if isinstance(value, bytes):
+                value = value.decode()
+            if field in DATETIME_FIELDS:
+                try:
+                    value = datetime.fromisoformat(value)
+                except ValueError:
+                    logger.warning(f"Invalid {field} {value!r} for job {name}, ignoring it")
+                    continue
+            state[field] = value
+        return state
+
+    async def get_states(self, names: list[str]) -> dict[str, dict]:
+        return {name: await self.get_state(name) for name in names}
+
+    async def set_state(self, name: str, **fields):
+        mapping = {
+            field: value.isoformat() if isinstance(value, datetime) else str(value)
+            for field, value in fields.items()
+        }
+        if mapping:
+            await self.valkey_client.hset(self._state_key(name), mapping=mapping)
+
+    async def record_run(self, name: str, **fields):
+        """Guarda el resultado de una ejecución y suma uno al contador de runs."""
+        await self.set_state(name, **fields)
+        await self.valkey_client.hincrby(self._state_key(name), "runs", 1)
+
+    async def request_run(self, name: str):
+        """Marca el job para que corra en el próximo tick de cualquier worker."""
+        await self.set_state(name, next_run=datetime.now(timezone.utc))
@@ -0,0 +1,269 @@
+import json
+import logging
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.tournaments import Tournament
+from services.events_valkey import RESYNC_EVENT, leaderboard_event, tournament_channel
+from services.tournament_postgres import TournamentPostgres
+
+logger = logging.getLogger("leaderboard_service")
+
+# points and exact hits are packed in one sorted-set score:
+# points * SCORE_FACTOR + correct_predictions
+SCORE_FACTOR = 1_000_000
+
+# Participants whose rank moves because others scored are published with the
+# change, up to this many; past that subscribers get a resync instead
+MAX_SHIFTED_IN_EVENT = 50
+
+class LeaderboardValkey:
+    """
+    Materialized tournament standings kept in Valkey.
+
+    Each tournament has a sorted set (member: user_id, score: packed points and
+    exact hits) plus a hash with the full entry of every participant. The
+    store is filled from Postgres with `rebuild` and kept up to date with
+    `update_participants` whenever points change.
+    """
+
+    def __init__(self, valkey_client):
+        self.valkey_client = valkey_client
+
+    def _ranking_key(self, tournament_id: int):
+        return f"leaderboard:{tournament_id}"
+
+    def _entries_key(self, tournament_id: int):
+        return f"leaderboard:{tournament_id}:entries"
+
+    def _built_key(self, tournament_id: int):
+        return f"leaderboard:{tournament_id}:built"
+
+    def _score(self, entry: dict) -> int:
+        return int(entry["points"]) * SCORE_FACTOR + int(entry["correct_predictions"])
+
+    def _entry_json(self, entry: dict) -> str:
+        return json.dumps({
+            "user_id": entry["user_id"],
+            "username": entry["username"],
+            "points": int(entry["points"]),
+            "correct_predictions": int(entry["correct_predictions"]),
+            "total_predictions": int(entry["total_predictions"])
+        })
+
+    async def is_built(self, tournament_id: int) -> bool:
+        return bool(await self.valkey_client.exists(self._built_key(tournament_id)))
+
+    async def rebuild(self, db: AsyncSession, tournament: Tournament) -> int:
+        """Recompute a tournament's standings from Postgres and replace the stored ones."""
+        standings = await TournamentPostgres().get_leaderboard(db, tournament.id, tournament.league_id)
+
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        pipeline.delete(self._ranking_key(tournament.id), self._entries_key(tournament.id))
+        if standings:
+            pipeline.zadd(
+                self._ranking_key(tournament.id),
+                {str(entry["user_id"]): self._score(entry) for entry in standings}
+            )
+            pipeline.hset(
+                self._entries_key(tournament.id),
+                mapping={str(entry["user_id"]): self._entry_json(entry) for entry in standings}
+            )
+        pipeline.set(self._built_key(tournament.id), 1)
+        await pipeline.execute()
+
+        logger.info(f"Leaderboard rebuilt for tournament {tournament.id}: {len(standings)} entries")
+        return len(standings)
+
+    async def update_participants(
+        self,
+        db: AsyncSession,
+        tournament_id: int,
+        league_id: int,
+        user_ids: List[int]
+    ):
+        """Refresh the stored entries of some participants from Postgres.
+
+        Participants whose score changed are published to the tournament's
+        event channel with their new and previous rank, together with the
+        ones whose rank moved because of it (or a resync when too many did).
+        """
+        if not user_ids or not await self.is_built(tournament_id):
+            # Not materialized yet, the first read will rebuild it
+            return
+
+        standings = await TournamentPostgres().get_participant_standings(db, tournament_id, league_id, user_ids)
+        if not standings:
+            return
+
+        ranking_key = self._ranking_key(tournament_id)
+        previous_scores = await self.valkey_client.zmscore(ranking_key, [str(entry["user_id"]) for entry in standings])
+        changed = [
+            (entry, previous_score)
+            for entry, previous_score in zip(standings, previous_scores)
+            if previous_score is None or int(previous_score) != self._score(entry)
+        ]
+
+        # Ranks before and after the write are counted inside the same
+        # transaction, so the published deltas match what readers see
+        ranked_before = [(entry, previous_score) for entry, previous_score in changed if previous_score is not None]
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        for _entry, previous_score in ranked_before:
+            pipeline.zcount(ranking_key, f"({previous_score}", "+inf")
+        pipeline.zadd(ranking_key, {str(entry["user_id"]): self._score(entry) for entry in standings})
+        pipeline.hset(
+            self._entries_key(tournament_id),
+            mapping={str(entry["user_id"]): self._entry_json(entry) for entry in standings}
+        )
+        for entry, _previous_score in changed:
+            pipeline.zcount(ranking_key, f"({self._score(entry)}", "+inf")
+        # Others only move if their score lies between a changed participant's
+        # old and new score (below the new one for newcomers)
+        shift_ranges = [
+            (min(self._score(entry), previous_score) if previous_score is not None else float("-inf"),
+             max(self._score(entry), previous_score) if previous_score is not None else self._score(entry))
+            for entry, previous_score in changed
+        ]
+        if changed:
+            low = min(low for low, _high in shift_ranges)
+            high = max(high for _low, high in shift_ranges)
+            pipeline.zcount(ranking_key, high, "+inf")
+            pipeline.zrevrangebyscore(
+                ranking_key, f"({high}", low, start=0, num=MAX_SHIFTED_IN_EVENT + len(changed) + 1, withscores=True
+            )
+        results = await pipeline.execute()
+
+        if not changed:
+            return
+        above_range, in_range = results[-2:]
+        if len(in_range) > MAX_SHIFTED_IN_EVENT + len(changed):
+            await self.valkey_client.publish(tournament_channel(tournament_id), RESYNC_EVENT)
+            return
+        previous_ranks = {
+            entry["user_id"]: better + 1
+            for (entry, _previous_score), better in zip(ranked_before, results[:len(ranked_before)])
+        }
+        changes = [
+            {
+                **json.loads(self._entry_json(entry)),
+                "rank": better + 1,
+                "previous_rank": previous_ranks.get(entry["user_id"])
+            }
+            for (entry, _previous_score), better in zip(changed, results[len(ranked_before) + 2:-2])
+        ]
+        changes.extend(await self._shifted_entries(tournament_id, changed, shift_ranges, above_range, in_range))
+        await self.valkey_client.publish(tournament_channel(tournament_id), leaderboard_event(tournament_id, changes))
+
+    async def _shifted_entries(self, tournament_id: int, changed, shift_ranges, above_range: int, in_range) -> List[dict]:
+        """Entries (with rank and previous_rank) of the others whose rank moved."""
+        changed_ids = {str(entry["user_id"]) for entry, _previous_score in changed}
+        shifted = []
+        better = above_range
+        previous_score = None
+        for position, (member, score) in enumerate(in_range):
+            # in_range is sorted by score, descending
+            if score != previous_score:
+                better = above_range + position
+                previous_score = score
+            user_id = member.decode() if isinstance(member, bytes) else str(member)
+            if user_id in changed_ids or not any(low <= score < high for low, high in shift_ranges):
+                continue
+            previous_better = (
+                better
+                - sum(1 for entry, _old in changed if self._score(entry) > score)
+                + sum(1 for _entry, old in changed if old is not None and old > score)
+            )
+            shifted.append((member, better + 1, previous_better + 1))
+        if not shifted:
+            return []
+
+        entries_json = await self.valkey_client.hmget(self._entries_key(tournament_id), [member for member, _r, _p in shifted])
+        return [
+            {**json.loads(entry_json), "rank": rank, "previous_rank": previous_rank}
+            for (_member, rank, previous_rank), entry_json in zip(shifted, entries_json)
+            if entry_json and rank != previous_rank
+        ]
+
+    async def apply_score_changes(self, db: AsyncSession, league_id: int, user_ids: List[int]):
+        """Propagate changed Prediction.points of a league to every affected tournament."""
+        tournaments = await TournamentPostgres().get_tournaments_for_participants(db, league_id, list(user_ids))
+        for tournament_id, tournament_user_ids in tournaments.items():
+            await self.update_participants(db, tournament_id, league_id, tournament_user_ids)
+
+    async def remove_participant(self, tournament_id: int, user_id: int):
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        pipeline.zrem(self._ranking_key(tournament_id), str(user_id))
+        pipeline.hdel(self._entries_key(tournament_id), str(user_id))
+        await pipeline.execute()
+
+    async def delete(self, tournament_id: int):
+        await self.valkey_client.delete(
+            self._ranking_key(tournament_id),
+            self._entries_key(tournament_id),
+            self._built_key(tournament_id)
+        )
+
+    async def _ranked_window(self, tournament_id: int, high, low) -> tuple[int, List[Optional[dict]]]:
+        """
+        Ranked entries with a score in [low, high], in standings order, and
+        how many participants rank above them. Equal scores share a rank and
+        are listed by username, like the Postgres standings (the sorted set
+        itself orders them by member), so callers read whole tie groups and
+        cut pages from them. Members without an entry are kept as None so
+        positions still match the sorted set.
+        """
+        ranking_key = self._ranking_key(tournament_id)
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        pipeline.zcount(ranking_key, f"({high}", "+inf")
+        pipeline.zrevrangebyscore(ranking_key, high, low, withscores=True)
+        above, members_with_scores = await pipeline.execute()
+        if not members_with_scores:
+            return above, []
+
+        entries_json = await self.valkey_client.hmget(
+            self._entries_key(tournament_id), [member for member, _score in members_with_scores]
+        )
+        rows = sorted(
+            ((score, json.loads(entry_json) if entry_json else None)
+             for (_member, score), entry_json in zip(members_with_scores, entries_json)),
+            key=lambda row: (-row[0], row[1] is None, row[1]["username"] if row[1] else "")
+        )
+
+        window = []
+        previous_score = None
+        for position, (score, entry) in enumerate(rows):
+            if score != previous_score:
+                rank = above + position + 1
+                previous_score = score
+            window.append({**entry, "rank": rank} if entry else None)
+        return above, window
+
+    async def get_page(self, tournament_id: int, offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """Ranked entries from `offset`, `limit` entries (all when None)."""
+        ranking_key = self._ranking_key(tournament_id)
+        pipeline = self.valkey_client.pipeline(transaction=True)
+        pipeline.zrevrange(ranking_key, offset, offset, withscores=True)
+        if limit is not None:
+            pipeline.zrevrange(ranking_key, offset + limit - 1, offset + limit - 1, withscores=True)
+        bounds = await pipeline.execute()
+        if not bounds[0]:
+            return []
+
+        # Extend the page to the whole tie groups at both ends
+        high = bounds[0][0][1]
+        low = bounds[1][0][1] if limit is not None and bounds[1] else "-inf"
+        above, window = await self._ranked_window(tournament_id, high, low)
+        page = window[offset - above:None if limit is None else offset - above + limit]
+        return [entry for entry in page if entry is not None]
+
+    async def get_around_user(self, tournament_id: int, user_id: int, radius: int = 5) -> List[dict]:
+        """Ranked entries around a participant (`radius` above and below)."""
+        score = await self.valkey_client.zscore(self._ranking_key(tournament_id), str(user_id))
+        if score is None:
+            return []
+        above, tie_group = await self._ranked_window(tournament_id, score, score)
+        position = above + next(
+            (i for i, entry in enumerate(tie_group) if entry is not None and entry["user_id"] == user_id), 0
+        )
+        start = max(position - radius, 0)
+        # Near the top there are fewer than `radius` entries above, not more below
+        return await self.get_page(tournament_id, start, position + radius + 1 - start)
@@ -1,7 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models.leagues import League
+from models.countries import Country
 from services.country_postgres import CountryPostgres
+from services.bulk_upsert import bulk_upsert
+from services.reference_cache import NEGATIVE_TTL_SECONDS, reference_cache
 
 class LeaguePostgres:
     async def add_league(
@@ -69,6 +72,33 @@ class LeaguePostgres:
         else:
             return await self.add_league(db, id, name, country_name, season, logo)
 
+    async def bulk_upsert_leagues(self, db: AsyncSession, leagues: list[dict]) -> dict:
+        """
+        Inserts or updates many leagues in one transaction with
+        INSERT ... ON CONFLICT (id). The table keeps one row per league id,
+        so callers pass a single season per league (the latest one).
+        Returns {"inserted", "updated", "unchanged"}.
+        """
+        rows = [
+            {
+                "id": league["id"],
+                "name": league["name"],
+                "country_name": league["country_name"],
+                "season": league["season"],
+                "logo": league.get("logo")
+            }
+            for league in leagues
+        ]
+        try:
+            counts = await bulk_upsert(
+                db, League, rows, key=["id"], update_columns=["name", "country_name", "season", "logo"]
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return counts
+
     async def get_all_leagues(self, db: AsyncSession):
         result = await db.execute(select(League))
         return result.scalars().all()
@@ -134,4 +164,48 @@ class LeaguePostgres:
             country = await country_service.get_country_by_name(db, league.country_name)
             if country and country not in countries:
                 countries.append(country)
-        return countries
\ No newline at end of file
+        return countries
+
+    async def get_all_countries_with_league_json(self, db: AsyncSession) -> list[dict]:
+        """
+        Países que tienen al menos una liga, en JSON. Una sola consulta y
+        servido desde la caché de referencia.
+        """
+        cache = reference_cache.region("leagues")
+        countries = cache.get("countries_with_league")
+        if countries is None:
+            result = await db.execute(
+                select(Country)
+                .where(Country.name.in_(select(League.country_name)))
+                .order_by(Country.name)
+            )
+            countries = [country.to_json() for country in result.scalars().all()]
+            cache.set("countries_with_league", countries)
+        return countries
+
+    async def get_all_leagues_json(self, db: AsyncSession) -> list[dict]:
+        """Todas las ligas en JSON, servidas desde la caché de referencia."""
+        cache = reference_cache.region("leagues")
+        leagues = cache.get("all")
+        if leagues is None:
+            leagues = self.leagues_to_json(await self.get_all_leagues(db))
+            cache.set("all", leagues)
+            for league in leagues:
+                cache.set(("id", league["id"]), league)
+        return leagues
+
+    async def get_leagues_json_by_country(self, db: AsyncSession, country_name: str) -> list[dict]:
+        leagues = await self.get_all_leagues_json(db)
+        return [league for league in leagues if league["country"] == country_name]
+
+    async def get_league_json_by_id(self, db: AsyncSession, id: int) -> dict | None:
+        """Liga en JSON por id, servida desde la caché de referencia."""
+        cache = reference_cache.region("leagues")
+        key = ("id", id)
+        if key in cache:
+            return cache.get(key)
+
+        league = await self.get_league_by_id(db, id)
+        league_json = league.to_json() if league else None
+        cache.set(key, league_json, ttl=NEGATIVE_TTL_SECONDS if league_json is None else None)
+        return league_json
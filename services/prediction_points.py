@@ -1,4 +1,12 @@
-from typing import Tuple
+from typing import Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import and_, case, func
+
+# Reason codes returned by score_predictions_batch, index into REASON_LABELS
+REASON_WRONG = 0
+REASON_WINNER = 1
+REASON_EXACT = 2
+REASON_LABELS = ("wrong", "winner", "exact")
 
 
 class PredictionPointsService:
@@ -56,3 +64,99 @@ class PredictionPointsService:
             return self.correct_winner_points, "winner"
 
         return 0, "wrong"
+
+    def _goals_array(self, values: Sequence) -> np.ndarray:
+        # None/NaN -> 0, same normalization as score_prediction
+        return np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0).astype(np.int64)
+
+    def score_predictions_batch(
+        self,
+        pred_goals_home: Sequence,
+        pred_goals_away: Sequence,
+        fixture_goals_home: Sequence,
+        fixture_goals_away: Sequence,
+        pred_pens_home: Optional[Sequence] = None,
+        pred_pens_away: Optional[Sequence] = None,
+        fixture_pens_home: Optional[Sequence] = None,
+        fixture_pens_away: Optional[Sequence] = None,
+        penalty_bonus_points: int = 0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized score_prediction over columnar inputs.
+
+        Every argument is an array-like of the same length (lists, `array`
+        or NumPy arrays; None/NaN count as 0 goals). Returns (points, reasons)
+        as NumPy arrays, reasons holding REASON_* codes. When the four penalty
+        columns are given, `penalty_bonus_points` is added where the predicted
+        shootout is exact (None/NaN penalties never match).
+        """
+        pg_h = self._goals_array(pred_goals_home)
+        pg_a = self._goals_array(pred_goals_away)
+        fg_h = self._goals_array(fixture_goals_home)
+        fg_a = self._goals_array(fixture_goals_away)
+
+        exact = (pg_h == fg_h) & (pg_a == fg_a)
+        winner = ~exact & (np.sign(pg_h - pg_a) == np.sign(fg_h - fg_a))
+
+        reasons = np.full(pg_h.shape, REASON_WRONG, dtype=np.int8)
+        reasons[winner] = REASON_WINNER
+        reasons[exact] = REASON_EXACT
+
+        points = np.zeros(pg_h.shape, dtype=np.int64)
+        points[winner] = self.correct_winner_points
+        points[exact] = self.exact_points
+
+        penalty_columns = (pred_pens_home, pred_pens_away, fixture_pens_home, fixture_pens_away)
+        if penalty_bonus_points and all(column is not None for column in penalty_columns):
+            pp_h, pp_a, fp_h, fp_a = (np.asarray(column, dtype=np.float64) for column in penalty_columns)
+            # NaN never compares equal, so missing penalties get no bonus
+            points += np.where((pp_h == fp_h) & (pp_a == fp_a), penalty_bonus_points, 0)
+
+        return points, reasons
+
+    def _sql_sign(self, value):
+        return case((value > 0, 1), (value < 0, -1), else_=0)
+
+    def points_expression(
+        self,
+        pred_goals_home,
+        pred_goals_away,
+        fixture_goals_home,
+        fixture_goals_away,
+        pred_pens_home=None,
+        pred_pens_away=None,
+        fixture_pens_home=None,
+        fixture_pens_away=None,
+        penalty_bonus_points: int = 0,
+    ):
+        """Return a SQL expression computing the same points as score_prediction.
+
+        Arguments are column expressions. NULL goals count as 0, like in
+        score_prediction. The penalty bonus is added when the four penalty
+        columns are given, not NULL and the predicted shootout is exact.
+        """
+        pg_h = func.coalesce(pred_goals_home, 0)
+        pg_a = func.coalesce(pred_goals_away, 0)
+        fg_h = func.coalesce(fixture_goals_home, 0)
+        fg_a = func.coalesce(fixture_goals_away, 0)
+
+        points = case(
+            (and_(pg_h == fg_h, pg_a == fg_a), self.exact_points),
+            (self._sql_sign(pg_h - pg_a) == self._sql_sign(fg_h - fg_a), self.correct_winner_points),
+            else_=0,
+        )
+
+        penalty_columns = (pred_pens_home, pred_pens_away, fixture_pens_home, fixture_pens_away)
+        if penalty_bonus_points and all(column is not None for column in penalty_columns):
+            points = points + case(
+                (
+                    and_(
+                        *(column.isnot(None) for column in penalty_columns),
+                        pred_pens_home == fixture_pens_home,
+                        pred_pens_away == fixture_pens_away,
+                    ),
+                    penalty_bonus_points,
+                ),
+                else_=0,
+            )
+
+        return points
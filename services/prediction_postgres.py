@@ -1,7 +1,7 @@
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete, and_, or_, func
+from sqlalchemy import delete, update, and_, or_, func
 from sqlalchemy.exc import IntegrityError
 from models.predictions import Prediction
 from models.fixtures.fixture import Fixture
@@ -14,7 +14,8 @@ from models.fixtures.fixture_status import FixtureStatus
 from datetime import datetime
 from typing import List, Optional, Tuple, Any, cast
 from sqlalchemy.orm import aliased
-from services.prediction_points import PredictionPointsService
+import numpy as np
+from services.prediction_points import PredictionPointsService, REASON_EXACT, REASON_WINNER
 
 logger = logging.getLogger("prediction_service")
 logger.setLevel(logging.INFO)
@@ -25,6 +26,11 @@ formatter = logging.Formatter(
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+# Fixture statuses whose result is final and can be scored. AWD (technical
+# loss) carries the awarded score as the official result; ABD (abandoned)
+# has no final result and is not scored
+FINISHED_STATUSES = (FixtureStatus.FT, FixtureStatus.AET, FixtureStatus.PEN, FixtureStatus.AWD)
+
 class PredictionPostgres:
     async def create_prediction(
         self,
@@ -323,6 +329,27 @@ class PredictionPostgres:
             "average_goals_predicted": round(average_goals, 2)
         }
 
+    def _score_match_predictions(
+        self,
+        scoring_service: PredictionPointsService,
+        fixture: Fixture,
+        predictions: List[Prediction],
+        penalty_bonus_points: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score all predictions of one fixture in a single vectorized pass."""
+        count = len(predictions)
+        return scoring_service.score_predictions_batch(
+            [prediction.goals_home for prediction in predictions],
+            [prediction.goals_away for prediction in predictions],
+            [fixture.home_team_score] * count,
+            [fixture.away_team_score] * count,
+            [prediction.penalties_home for prediction in predictions],
+            [prediction.penalties_away for prediction in predictions],
+            [fixture.home_pens_score] * count,
+            [fixture.away_pens_score] * count,
+            penalty_bonus_points=penalty_bonus_points
+        )
+
     async def calculate_match_scores(
         self,
         db: AsyncSession,
@@ -344,48 +371,22 @@ class PredictionPostgres:
         # requested scoring: exact=3, correct winner=1, wrong=0.
         scoring_service = PredictionPointsService(exact_points=3, correct_winner_points=1)
 
-        scores_calculated = 0
-        exact_scores = 0
-        correct_winners = 0
-        penalty_bonuses = 0
-
-        for prediction in predictions:
-            # Extract runtime values to avoid static typing confusion
-            pred_goals_home = getattr(prediction, 'goals_home')
-            pred_goals_away = getattr(prediction, 'goals_away')
-            pred_pens_home = getattr(prediction, 'penalties_home')
-            pred_pens_away = getattr(prediction, 'penalties_away')
-
-            fixture_goals_home = getattr(fixture, 'home_team_score')
-            fixture_goals_away = getattr(fixture, 'away_team_score')
-            fixture_pens_home = getattr(fixture, 'home_pens_score')
-            fixture_pens_away = getattr(fixture, 'away_pens_score')
-
-            # Score using the new service
-            pts, reason = scoring_service.score_prediction(
-                pred_goals_home, pred_goals_away, fixture_goals_home, fixture_goals_away
-            )
-
-            if reason == 'exact':
-                exact_scores += 1
-            elif reason == 'winner':
-                correct_winners += 1
+        points, reasons = self._score_match_predictions(
+            scoring_service, fixture, predictions, penalty_bonus_points
+        )
 
-            score = pts
+        for prediction, score in zip(predictions, points.tolist()):
+            logger.info(f"User {prediction.user_id} scored {score} points for match {match_id}")
 
-            # Penalty bonus remains: add on top of regular points
-            if (pred_pens_home is not None and 
-                pred_pens_away is not None and
-                fixture_pens_home is not None and
-                fixture_pens_away is not None):
-                if (pred_pens_home == fixture_pens_home and
-                    pred_pens_away == fixture_pens_away):
-                    score += penalty_bonus_points
-                    penalty_bonuses += 1
+        regular_points = np.where(
+            reasons == REASON_EXACT, scoring_service.exact_points,
+            np.where(reasons == REASON_WINNER, scoring_service.correct_winner_points, 0)
+        )
+        scores_calculated = len(predictions)
+        exact_scores = int(np.count_nonzero(reasons == REASON_EXACT))
+        correct_winners = int(np.count_nonzero(reasons == REASON_WINNER))
+        penalty_bonuses = int(np.count_nonzero(points > regular_points))
 
-            scores_calculated += 1
-            logger.info(f"User {prediction.user_id} scored {score} points for match {match_id}")
-        
         return {
             "match_id": match_id,
             "total_predictions": len(predictions),
@@ -406,6 +407,7 @@ class PredictionPostgres:
         This method sets Prediction.points for each prediction and commits the
         updates. It uses the same scoring rules as PredictionPointsService
         (exact=3, winner=1, wrong=0) and adds penalty bonus on top.
+        `updated_user_ids` lists the users whose points actually changed.
         """
         # Get match with results
         fixture = await self.get_match_by_id(db, match_id)
@@ -417,29 +419,16 @@ class PredictionPostgres:
 
         scoring_service = PredictionPointsService(exact_points=3, correct_winner_points=1)
 
-        updated = 0
-        for prediction in predictions:
-            pred_goals_home = getattr(prediction, 'goals_home')
-            pred_goals_away = getattr(prediction, 'goals_away')
-            pred_pens_home = getattr(prediction, 'penalties_home')
-            pred_pens_away = getattr(prediction, 'penalties_away')
-
-            fixture_goals_home = getattr(fixture, 'home_team_score')
-            fixture_goals_away = getattr(fixture, 'away_team_score')
-            fixture_pens_home = getattr(fixture, 'home_pens_score')
-            fixture_pens_away = getattr(fixture, 'away_pens_score')
-
-            pts, _reason = scoring_service.score_prediction(
-                pred_goals_home, pred_goals_away, fixture_goals_home, fixture_goals_away
-            )
-
-            # Penalty bonus
-            if (pred_pens_home is not None and pred_pens_away is not None and
-                fixture_pens_home is not None and fixture_pens_away is not None):
-                if (pred_pens_home == fixture_pens_home and pred_pens_away == fixture_pens_away):
-                    pts += penalty_bonus_points
+        points, _reasons = self._score_match_predictions(
+            scoring_service, fixture, predictions, penalty_bonus_points
+        )
 
+        updated = 0
+        updated_user_ids = []
+        for prediction, pts in zip(predictions, points.tolist()):
             # Persist
+            if prediction.points != pts:
+                updated_user_ids.append(prediction.user_id)
             prediction.points = pts
             prediction.updated_at = datetime.utcnow()
             updated += 1
@@ -452,8 +441,117 @@ class PredictionPostgres:
 
         return {
             "match_id": match_id,
+            "league_id": getattr(fixture, 'league_id'),
             "total_predictions": len(predictions),
-            "scores_calculated": updated
+            "scores_calculated": updated,
+            "updated_user_ids": updated_user_ids
+        }
+
+    async def score_finished_fixtures(
+        self,
+        db: AsyncSession,
+        fixture_ids: Optional[List[int]] = None,
+        penalty_bonus_points: int = 3,
+        only_pending: bool = True
+    ) -> dict:
+        """Score every prediction of finished fixtures with one UPDATE ... FROM fixtures.
+
+        Implements the same rules as calculate_and_persist_match_scores
+        (exact=3, winner=1, wrong=0, plus penalty bonus) in SQL. Only
+        predictions whose points are NULL or differ from the computed value
+        are written. `fixture_ids` limits the pass to some fixtures.
+
+        With `only_pending` (default) only fixtures never scored, or whose
+        data changed after they were scored (`scored_at < updated_at`), are
+        processed, and they are marked as scored in the same transaction.
+
+        Returns the number of scored fixtures (every finished fixture in
+        scope without `only_pending`), the number of updated
+        predictions and, per league, the users whose points changed.
+        """
+        empty = {"fixtures_scored": 0, "predictions_updated": 0, "updated_users_by_league": {}}
+        if fixture_ids is not None and not fixture_ids:
+            return empty
+
+        scoring_service = PredictionPointsService(exact_points=3, correct_winner_points=1)
+        new_points = scoring_service.points_expression(
+            Prediction.goals_home,
+            Prediction.goals_away,
+            Fixture.home_team_score,
+            Fixture.away_team_score,
+            Prediction.penalties_home,
+            Prediction.penalties_away,
+            Fixture.home_pens_score,
+            Fixture.away_pens_score,
+            penalty_bonus_points=penalty_bonus_points
+        )
+
+        try:
+            if only_pending:
+                # Claim the pending fixtures first: the row locks keep a
+                # concurrent result update from slipping in unscored
+                claim = (
+                    update(Fixture)
+                    .where(
+                        Fixture.status.in_(FINISHED_STATUSES),
+                        or_(Fixture.scored_at.is_(None), Fixture.scored_at < Fixture.updated_at)
+                    )
+                    # updated_at is passed explicitly so its onupdate does not fire
+                    .values(scored_at=Fixture.updated_at, updated_at=Fixture.updated_at)
+                    .returning(Fixture.id)
+                    .execution_options(synchronize_session=False)
+                )
+                if fixture_ids is not None:
+                    claim = claim.where(Fixture.id.in_(fixture_ids))
+                fixture_ids = list((await db.execute(claim)).scalars().all())
+                fixtures_scored = len(fixture_ids)
+                if not fixture_ids:
+                    await db.commit()
+                    return empty
+            else:
+                finished = select(func.count()).select_from(Fixture).where(Fixture.status.in_(FINISHED_STATUSES))
+                if fixture_ids is not None:
+                    finished = finished.where(Fixture.id.in_(fixture_ids))
+                fixtures_scored = await db.scalar(finished)
+
+            stmt = (
+                update(Prediction)
+                .where(
+                    Prediction.match_id == Fixture.id,
+                    Fixture.status.in_(FINISHED_STATUSES),
+                    Prediction.points.is_distinct_from(new_points)
+                )
+                .values(points=new_points, updated_at=datetime.utcnow())
+                .returning(Prediction.user_id, Prediction.match_id)
+                .execution_options(synchronize_session=False)
+            )
+            if fixture_ids is not None:
+                stmt = stmt.where(Fixture.id.in_(fixture_ids))
+
+            result = await db.execute(stmt)
+            rows = result.all()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        updated_users_by_league: dict[int, set] = {}
+        if rows:
+            # RETURNING only sees predictions columns on some backends,
+            # map the touched fixtures to their league in a second query
+            match_ids = {match_id for _user_id, match_id in rows}
+            league_result = await db.execute(
+                select(Fixture.id, Fixture.league_id).where(Fixture.id.in_(match_ids))
+            )
+            league_by_match = dict(league_result.all())
+            for user_id, match_id in rows:
+                updated_users_by_league.setdefault(league_by_match[match_id], set()).add(user_id)
+
+        logger.info(f"Bulk scoring: {fixtures_scored} fixtures, {len(rows)} predictions updated")
+        return {
+            "fixtures_scored": fixtures_scored,
+            "predictions_updated": len(rows),
+            "updated_users_by_league": updated_users_by_league
         }
 
     def _get_winner(self, goals_home: int, goals_away: int) -> str:
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.data_version_valkey import DataVersionValkey, is_settled
+from settings import REFERENCE_CACHE_MAXSIZE, REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_SYNC_SECONDS
+
+logger = logging.getLogger("reference_cache")
+
+_MISSING = object()
+
+# Lookups that found nothing are remembered this long (seconds), enough to
+# absorb repeated 404s without hiding a row created meanwhile for an hour
+NEGATIVE_TTL_SECONDS = 30
+
+class LRUCache:
+    """Size-bounded LRU cache with a per-entry TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Off while reads may still come from a replica behind the last change
+        self.writable = True
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def get_many(self, keys) -> tuple[dict, list]:
+        """Return ({key: value} for hits, [keys] that missed)."""
+        hits = {}
+        misses = []
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                misses.append(key)
+            else:
+                hits[key] = value
+        return hits, misses
+
+    def set(self, key, value, ttl: float | None = None):
+        if not self.writable:
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ReferenceCache:
+    """
+    Read-through cache for the reference tables (teams, countries, leagues).
+
+    Each table has its own region and a version counter that is bumped on
+    invalidation. Cached values are shared, callers must treat them as
+    read-only.
+
+    The tables are written by the ingestion jobs in the worker process, so
+    `invalidate` there never reaches the API. Every process follows the
+    shared data versions in Valkey instead (`sync`, DataVersionValkey) and
+    clears a region when its version moves.
+    """
+
+    REGIONS = ("teams", "countries", "leagues")
+
+    # Teams and leagues embed country info, so they go stale with countries
+    DEPENDENTS = {"countries": ("teams", "leagues")}
+
+    def __init__(self, maxsize: int = REFERENCE_CACHE_MAXSIZE, ttl: float = REFERENCE_CACHE_TTL_SECONDS):
+        self._regions = {name: LRUCache(maxsize, ttl) for name in self.REGIONS}
+        self.versions = {name: 0 for name in self.REGIONS}
+        # Shared data version each region was last cleared at
+        self.data_versions = {name: None for name in self.REGIONS}
+
+    def region(self, name: str) -> LRUCache:
+        return self._regions[name]
+
+    def invalidate(self, *names: str):
+        to_clear = set()
+        for name in names:
+            to_clear.add(name)
+            to_clear.update(self.DEPENDENTS.get(name, ()))
+
+        for name in to_clear:
+            self._regions[name].clear()
+            self.versions[name] += 1
+        logger.info(f"Reference cache invalidated: {sorted(to_clear)}")
+
+    def apply_data_versions(self, data_versions: dict):
+        """
+        Clear the regions whose shared data version changed since the last
+        call. Until the change is settled (replicas caught up, see
+        data_version_valkey.is_settled) the region is not filled, and it is
+        cleared once more when it settles, so nothing read from a lagging
+        replica outlives the change.
+        """
+        states = {
+            name: (version, is_settled(version))
+            for name, version in data_versions.items() if name in self.data_versions
+        }
+        stale = [name for name, state in states.items() if self.data_versions[name] != state]
+        if stale:
+            self.invalidate(*stale)
+        for name in stale:
+            self.data_versions[name] = states[name]
+
+        for name in self.REGIONS:
+            sources = [name] + [source for source, dependents in self.DEPENDENTS.items() if name in dependents]
+            self._regions[name].writable = all(
+                self.data_versions[source] is None or self.data_versions[source][1] for source in sources
+            )
+
+    async def sync(self, valkey_client):
+        versions = await DataVersionValkey(valkey_client).get_versions(self.REGIONS)
+        self.apply_data_versions(dict(zip(self.REGIONS, versions)))
+
+    async def run_sync_loop(self, valkey_client, interval: float = REFERENCE_CACHE_SYNC_SECONDS):
+        while True:
+            try:
+                await self.sync(valkey_client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries still expire by TTL meanwhile
+                logger.warning(f"Reference cache sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def warm(self, db: AsyncSession):
+        """Load the reference tables so the first requests don't hit Postgres."""
+        from services.country_postgres import CountryPostgres
+        from services.leagues_postgres import LeaguePostgres
+        from services.teams_postgres import TeamPostgres
+
+        countries = await CountryPostgres().get_all_countries_json(db)
+        leagues = await LeaguePostgres().get_all_leagues_json(db)
+        await LeaguePostgres().get_all_countries_with_league_json(db)
+        teams = await TeamPostgres().warm_teams_cache(db)
+        logger.info(
+            f"Reference cache warmed: countries={len(countries)}, leagues={len(leagues)}, teams={teams}"
+        )
+
+
+reference_cache = ReferenceCache()
@@ -1,3 +1,4 @@
+from sqlalchemy import insert, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models.rounds import Round
@@ -59,6 +60,37 @@ class RoundPostgres:
         else:
             return await self.add_round(db, name, league_id, season)
 
+    async def bulk_add_missing_rounds(self, db: AsyncSession, rounds: list[dict]) -> dict:
+        """
+        Versión por lotes de add_or_skip_round. Cada dict trae name, league_id
+        y season. La tabla no tiene una restricción única sobre esas columnas,
+        así que las existentes se buscan en una sola consulta y las faltantes
+        se insertan juntas. Devuelve {"inserted", "unchanged"}.
+        """
+        wanted = {(r["league_id"], r["season"], r["name"]) for r in rounds}
+        if not wanted:
+            return {"inserted": 0, "unchanged": 0}
+
+        league_seasons = {(league_id, season) for league_id, season, _name in wanted}
+        result = await db.execute(
+            select(Round.league_id, Round.season, Round.name)
+            .where(tuple_(Round.league_id, Round.season).in_(league_seasons))
+        )
+        existing = {tuple(row) for row in result.all()}
+
+        missing = sorted(wanted - existing, key=lambda r: (r[0], r[1], r[2] or ""))
+        try:
+            if missing:
+                await db.execute(
+                    insert(Round),
+                    [{"name": name, "league_id": league_id, "season": season} for league_id, season, name in missing]
+                )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return {"inserted": len(missing), "unchanged": len(wanted) - len(missing)}
+
     async def get_all_rounds(self, db: AsyncSession):
         """
         Devuelve todas las rondas almacenadas.
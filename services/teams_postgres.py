@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models.teams import Team
-from services.country_postgres import CountryPostgres
+from models.countries import Country
+from services.bulk_upsert import bulk_upsert
+from services.reference_cache import reference_cache
 
 class TeamPostgres:
     async def add_team(self, db: AsyncSession, id: int, name: str, country_name: str, logo: str = None):
@@ -32,6 +34,25 @@ class TeamPostgres:
         else:
             return await self.add_team(db, id, name, country_name, logo)
     
+    async def bulk_upsert_teams(self, db: AsyncSession, teams: list[dict]) -> dict:
+        """
+        Inserta o actualiza muchos equipos en una transacción con
+        INSERT ... ON CONFLICT (id). Cada dict trae id, name, country_name y logo;
+        country_name ya tiene que estar resuelto contra countries.
+        Devuelve {"inserted", "updated", "unchanged"}.
+        """
+        rows = [
+            {"id": team["id"], "name": team["name"], "country_name": team["country_name"], "logo": team.get("logo")}
+            for team in teams
+        ]
+        try:
+            counts = await bulk_upsert(db, Team, rows, key=["id"], update_columns=["name", "country_name", "logo"])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return counts
+
     def teams_to_json(self, teams: list[Team]):
         return [
             team.to_json()
@@ -42,67 +63,66 @@ class TeamPostgres:
         result = await db.execute(select(Team).where(Team.id == id))
         return result.scalar_one_or_none()
 
+    def _team_with_country_to_json(self, team: Team, country: Country | None) -> dict:
+        return {
+            "id": team.id,
+            "name": team.name,
+            "logo": team.logo,
+            "country": country.to_json() if country else {
+                "name": team.country_name,
+                "code": None,
+                "flag": None
+            }
+        }
+
+    async def get_teams_with_country_info(self, db: AsyncSession, ids) -> dict[int, dict]:
+        """
+        Devuelve {team_id: equipo con país embebido} para todos los ids pedidos
+        usando una única consulta con join a countries.
+        """
+        team_ids = {team_id for team_id in ids if team_id is not None}
+        if not team_ids:
+            return {}
+
+        cache = reference_cache.region("teams")
+        teams, misses = cache.get_many(team_ids)
+        if not misses:
+            return teams
+
+        result = await db.execute(
+            select(Team, Country)
+            .outerjoin(Country, Team.country_name == Country.name)
+            .where(Team.id.in_(misses))
+        )
+        for team, country in result.all():
+            team_json = self._team_with_country_to_json(team, country)
+            cache.set(team.id, team_json)
+            teams[team.id] = team_json
+        return teams
+
+    async def warm_teams_cache(self, db: AsyncSession) -> int:
+        """Carga todos los equipos en la caché de referencia. Devuelve cuántos."""
+        teams = await self.get_all_teams_with_country_info(db)
+        cache = reference_cache.region("teams")
+        for team_json in teams:
+            cache.set(team_json["id"], team_json)
+        return len(teams)
+
     async def get_team_with_country_info(self, db: AsyncSession, id: int):
         """
         Devuelve un equipo con la información del país embebida.
         """
-        result = await db.execute(select(Team).where(Team.id == id))
-        team = result.scalar_one_or_none()
-
-        country_service = CountryPostgres()
-        if team:
-            country = await country_service.get_country_by_name(db, team.country_name)
-            if country:
-                return {
-                    "id": team.id,
-                    "name": team.name,
-                    "logo": team.logo,
-                    "country": country.to_json()
-                }
-            else:
-                return {
-                    "id": team.id,
-                    "name": team.name,
-                    "logo": team.logo,
-                    "country": {
-                        "name": team.country_name,
-                        "code": None,
-                        "flag": None
-                    }
-                }
-        else:
-            return None
+        teams = await self.get_teams_with_country_info(db, [id])
+        return teams.get(id)
 
     async def get_all_teams_with_country_info(self, db: AsyncSession):
         """
         Devuelve todos los equipos con la información del país embebida.
         """
-        result = await db.execute(select(Team))
-        teams = result.scalars().all()
-
-        country_service = CountryPostgres()
-        enriched_teams = []
-
-        for team in teams:
-            country = await country_service.get_country_by_name(db, team.country_name)
-
-            if country:
-                enriched_teams.append({
-                    "id": team.id,
-                    "name": team.name,
-                    "logo": team.logo,
-                    "country": country.to_json()
-                })
-            else:
-                enriched_teams.append({
-                    "id": team.id,
-                    "name": team.name,
-                    "logo": team.logo,
-                    "country": {
-                        "name": team.country_name,
-                        "code": None,
-                        "flag": None
-                    }
-                })
-
-        return enriched_teams
\ No newline at end of file
+        result = await db.execute(
+            select(Team, Country).outerjoin(Country, Team.country_name == Country.name)
+        )
+        return [
+            self._team_with_country_to_json(team, country)
+            for team, country in result.all()
+        ]
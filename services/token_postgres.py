@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, case, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.auth.auth_models import Token, User
+
+class TokenPostgres:
+    """
+    Refresh tokens persistidos en Postgres. Es el respaldo del store en
+    Valkey (AuthValkey): se busca por `token_hash` (indexado) y solo se usa
+    cuando Valkey no tiene el token o no responde.
+    """
+
+    def _active(self, token_hash: str, raw_token: Optional[str] = None):
+        match = Token.token_hash == token_hash
+        if raw_token is not None:
+            # Rows written before token_hash existed keep the raw token until they expire
+            match = or_(match, and_(Token.token_hash.is_(None), Token.refresh_token == raw_token))
+        return and_(match, Token.revoked == False, Token.expires_at > datetime.utcnow())
+
+    def add_token(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        token_hash: str,
+        expires_at: datetime,
+        user_agent: Optional[str] = None
+    ) -> Token:
+        """Agrega el token a la sesión, sin commit (el login lo confirma junto al rehash)."""
+        token = Token(
+            user_id=user_id,
+            token_hash=token_hash,
+            expires_at=expires_at,
+            revoked=False,
+            user_agent=user_agent
+        )
+        db.add(token)
+        return token
+
+    async def get_active_token(self, db: AsyncSession, token_hash: str, raw_token: Optional[str] = None) -> Optional[Token]:
+        return await db.scalar(select(Token).where(self._active(token_hash, raw_token)))
+
+    async def revoke_token(self, db: AsyncSession, token_hash: str, raw_token: Optional[str] = None) -> Optional[int]:
+        """Revoca el token y devuelve su user_id (None si no estaba activo)."""
+        result = await db.execute(
+            update(Token)
+            .where(self._active(token_hash, raw_token))
+            .values(revoked=True)
+            .returning(Token.user_id)
+        )
+        user_id = result.scalar_one_or_none()
+        await db.commit()
+        return user_id
+
+    async def revoke_all_tokens(self, db: AsyncSession, user_id: int) -> int:
+        result = await db.execute(
+            update(Token)
+            .where(Token.user_id == user_id, Token.revoked == False)
+            .values(revoked=True)
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def get_token_version(self, db: AsyncSession, user_id: int) -> int:
+        """Versión vigente de los tokens del usuario (0 si no existe)."""
+        version = await db.scalar(select(User.token_version).where(User.id == user_id))
+        return version or 0
+
+    async def bump_token_version(self, db: AsyncSession, user_id: int, floor: int = 0) -> int:
+        """
+        Invalida todos los tokens emitidos del usuario. Devuelve la versión
+        nueva, mayor que `floor` (la que tenía Valkey antes de que la versión
+        se guardara en Postgres).
+        """
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=case((User.token_version < floor, floor), else_=User.token_version) + 1)
+            .returning(User.token_version)
+        )
+        version = result.scalar_one()
+        await db.commit()
+        return version
+
+    async def prune_tokens(self, db: AsyncSession) -> int:
+        """Borra los tokens vencidos o revocados (la tabla no crece sin límite)."""
+        result = await db.execute(
+            delete(Token).where(or_(Token.revoked == True, Token.expires_at <= datetime.utcnow()))
+        )
+        await db.commit()
+        return result.rowcount
@@ -1,6 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import select, insert, update, delete, func, case, and_
 from models.tournaments import Tournament
+from models.tournament_participants import TournamentParticipant
+from models.predictions import Prediction
+from models.fixtures.fixture import Fixture
 from models.leagues import League
 from models.auth.auth_models import User
 from typing import List, Optional
@@ -71,6 +74,11 @@ class TournamentPostgres:
             logger.error(f"Error fetching public tournaments: {e}")
             raise e
 
+    async def get_all_tournaments(self, db: AsyncSession) -> List[Tournament]:
+        """Get every tournament, public and private"""
+        result = await db.execute(select(Tournament).order_by(Tournament.id))
+        return list(result.scalars().all())
+
     async def get_tournament_by_id(self, db: AsyncSession, tournament_id: int) -> Optional[Tournament]:
         """Get a tournament by its ID"""
         try:
@@ -190,3 +198,125 @@ class TournamentPostgres:
     def tournaments_to_json(self, tournaments: List[Tournament]) -> List[dict]:
         """Convert a list of tournaments to JSON format"""
         return [tournament.to_json() for tournament in tournaments]
+
+    def _standings_query(self, tournament_id: int, league_id: int):
+        """
+        Build the grouped per-participant standings query.
+
+        Returns (query, points, correct_predictions) so callers can order or
+        rank on the aggregate expressions.
+        """
+        league_predictions = (
+            select(
+                Prediction.user_id.label("user_id"),
+                Prediction.id.label("prediction_id"),
+                Prediction.points.label("points"),
+                case(
+                    (
+                        and_(
+                            Fixture.home_team_score.isnot(None),
+                            Fixture.away_team_score.isnot(None),
+                            Prediction.goals_home == Fixture.home_team_score,
+                            Prediction.goals_away == Fixture.away_team_score
+                        ),
+                        1
+                    ),
+                    else_=0
+                ).label("exact")
+            )
+            .join(Fixture, Prediction.match_id == Fixture.id)
+            .where(Fixture.league_id == league_id)
+            .subquery()
+        )
+
+        points = func.coalesce(func.sum(league_predictions.c.points), 0)
+        correct_predictions = func.coalesce(func.sum(league_predictions.c.exact), 0)
+        total_predictions = func.count(league_predictions.c.prediction_id)
+
+        query = (
+            select(
+                User.id.label("user_id"),
+                User.username.label("username"),
+                points.label("points"),
+                correct_predictions.label("correct_predictions"),
+                total_predictions.label("total_predictions")
+            )
+            .select_from(TournamentParticipant)
+            .join(User, TournamentParticipant.user_id == User.id)
+            .outerjoin(league_predictions, league_predictions.c.user_id == User.id)
+            .where(TournamentParticipant.tournament_id == tournament_id)
+            .group_by(User.id, User.username)
+        )
+        return query, points, correct_predictions
+
+    async def get_leaderboard(
+        self,
+        db: AsyncSession,
+        tournament_id: int,
+        league_id: int,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Compute the tournament leaderboard in a single grouped query.
+
+        Points are the sum of the persisted Prediction.points for fixtures of the
+        tournament's league, correct_predictions counts exact scores. Users tied
+        on points and exact hits share the same rank (1, 1, 3...), ties are
+        listed by username. Ranks are computed over the whole tournament, then
+        `offset`/`limit` cut the page.
+        """
+        query, points, correct_predictions = self._standings_query(tournament_id, league_id)
+        # Byte order, as the Valkey leaderboard sorts ties (LeaderboardValkey._ranked_window).
+        # SQLite (tests) already compares text that way and has no "C" collation
+        username = User.username.collate("C") if db.bind.dialect.name == "postgresql" else User.username
+        query = (
+            query
+            .add_columns(
+                func.rank().over(
+                    order_by=(points.desc(), correct_predictions.desc())
+                ).label("rank")
+            )
+            .order_by(points.desc(), correct_predictions.desc(), username)
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [dict(row._mapping) for row in result.all()]
+
+    async def get_participant_standings(
+        self,
+        db: AsyncSession,
+        tournament_id: int,
+        league_id: int,
+        user_ids: List[int]
+    ) -> List[dict]:
+        """Same aggregates as get_leaderboard for some participants only (no rank)."""
+        if not user_ids:
+            return []
+        query, _points, _correct = self._standings_query(tournament_id, league_id)
+        query = query.where(TournamentParticipant.user_id.in_(user_ids))
+        result = await db.execute(query)
+        return [dict(row._mapping) for row in result.all()]
+
+    async def get_tournaments_for_participants(
+        self,
+        db: AsyncSession,
+        league_id: int,
+        user_ids: List[int]
+    ) -> dict[int, List[int]]:
+        """Return {tournament_id: [user_ids]} for tournaments of a league those users are in."""
+        if not user_ids:
+            return {}
+        result = await db.execute(
+            select(TournamentParticipant.tournament_id, TournamentParticipant.user_id)
+            .join(Tournament, TournamentParticipant.tournament_id == Tournament.id)
+            .where(
+                Tournament.league_id == league_id,
+                TournamentParticipant.user_id.in_(user_ids)
+            )
+        )
+        tournaments: dict[int, List[int]] = {}
+        for tournament_id, user_id in result.all():
+            tournaments.setdefault(tournament_id, []).append(user_id)
+        return tournaments
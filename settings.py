@@ -16,4 +16,166 @@ try:
 except Exception as ex:
     REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-    
+try:
+    VALKEY_MAX_CONNECTIONS = int(os.getenv("VALKEY_MAX_CONNECTIONS"))
+except Exception as ex:
+    VALKEY_MAX_CONNECTIONS = 50
+
+try:
+    REFERENCE_CACHE_MAXSIZE = int(os.getenv("REFERENCE_CACHE_MAXSIZE"))
+except Exception as ex:
+    REFERENCE_CACHE_MAXSIZE = 5000
+
+try:
+    REFERENCE_CACHE_TTL_SECONDS = int(os.getenv("REFERENCE_CACHE_TTL_SECONDS"))
+except Exception as ex:
+    REFERENCE_CACHE_TTL_SECONDS = 3600
+
+# How often each API process checks the shared data versions in Valkey to
+# drop reference data the worker changed
+try:
+    REFERENCE_CACHE_SYNC_SECONDS = int(os.getenv("REFERENCE_CACHE_SYNC_SECONDS"))
+except Exception as ex:
+    REFERENCE_CACHE_SYNC_SECONDS = 5
+
+try:
+    API_FOOTBALL_RATE_PER_MINUTE = int(os.getenv("API_FOOTBALL_RATE_PER_MINUTE"))
+except Exception as ex:
+    API_FOOTBALL_RATE_PER_MINUTE = 30
+
+try:
+    API_FOOTBALL_MAX_CONCURRENCY = int(os.getenv("API_FOOTBALL_MAX_CONCURRENCY"))
+except Exception as ex:
+    API_FOOTBALL_MAX_CONCURRENCY = 4
+
+try:
+    API_FOOTBALL_MAX_RETRIES = int(os.getenv("API_FOOTBALL_MAX_RETRIES"))
+except Exception as ex:
+    API_FOOTBALL_MAX_RETRIES = 3
+
+try:
+    API_FOOTBALL_TIMEOUT_SECONDS = int(os.getenv("API_FOOTBALL_TIMEOUT_SECONDS"))
+except Exception as ex:
+    API_FOOTBALL_TIMEOUT_SECONDS = 30
+
+API_CACHE_DIR = os.getenv("API_CACHE_DIR", ".cache/api_football")
+API_FOOTBALL_OFFLINE = os.getenv("API_FOOTBALL_OFFLINE", "false").lower() in ("1", "true", "yes")
+# Keep expired API responses on disk (recordings for API_FOOTBALL_OFFLINE replay)
+API_CACHE_KEEP_RECORDINGS = os.getenv("API_CACHE_KEEP_RECORDINGS", "false").lower() in ("1", "true", "yes")
+
+try:
+    LIVE_POLL_INTERVAL_SECONDS = int(os.getenv("LIVE_POLL_INTERVAL_SECONDS"))
+except Exception as ex:
+    LIVE_POLL_INTERVAL_SECONDS = 60
+
+try:
+    LIVE_WINDOW_BEFORE_MINUTES = int(os.getenv("LIVE_WINDOW_BEFORE_MINUTES"))
+except Exception as ex:
+    LIVE_WINDOW_BEFORE_MINUTES = 15
+
+try:
+    LIVE_WINDOW_AFTER_MINUTES = int(os.getenv("LIVE_WINDOW_AFTER_MINUTES"))
+except Exception as ex:
+    LIVE_WINDOW_AFTER_MINUTES = 180
+
+# Scheduler jobs (see cronjob/jobs.py) this deployment never runs, comma separated
+SCHEDULER_DISABLED_JOBS = {name.strip() for name in os.getenv("SCHEDULER_DISABLED_JOBS", "").split(",") if name.strip()}
+
+# The job scheduler runs in `python -m cronjob.worker`; only turn this on for
+# single-process deployments
+RUN_SCHEDULER_IN_API = os.getenv("RUN_SCHEDULER_IN_API", "false").lower() in ("1", "true", "yes")
+
+try:
+    WORKER_DB_POOL_SIZE = int(os.getenv("WORKER_DB_POOL_SIZE"))
+except Exception as ex:
+    WORKER_DB_POOL_SIZE = 3
+
+try:
+    WORKER_DB_MAX_OVERFLOW = int(os.getenv("WORKER_DB_MAX_OVERFLOW"))
+except Exception as ex:
+    WORKER_DB_MAX_OVERFLOW = 2
+
+try:
+    WORKER_VALKEY_MAX_CONNECTIONS = int(os.getenv("WORKER_VALKEY_MAX_CONNECTIONS"))
+except Exception as ex:
+    WORKER_VALKEY_MAX_CONNECTIONS = 10
+
+# Trust the signed user_id/username claims of access tokens (plus a token
+# version check in Valkey) instead of loading the user from Postgres
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "true").lower() in ("1", "true", "yes")
+
+try:
+    PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS"))
+except Exception as ex:
+    PASSWORD_HASH_ITERATIONS = 600000
+
+try:
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS"))
+except Exception as ex:
+    PASSWORD_HASH_WORKERS = min(4, os.cpu_count() or 1)
+
+try:
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE"))
+except Exception as ex:
+    DB_POOL_SIZE = 10
+
+try:
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW"))
+except Exception as ex:
+    DB_MAX_OVERFLOW = 10
+
+try:
+    DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS"))
+except Exception as ex:
+    DB_POOL_TIMEOUT_SECONDS = 10
+
+try:
+    DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS"))
+except Exception as ex:
+    DB_POOL_RECYCLE_SECONDS = 300
+
+# Ping every connection on checkout (safer behind proxies that drop idle
+# connections, but one extra round trip per checkout)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+
+# Read replicas for read-only endpoints (comma separated URLs, same driver as DATABASE_URL)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+try:
+    DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS"))
+except Exception as ex:
+    DB_REPLICA_MAX_LAG_SECONDS = 5.0
+
+try:
+    DB_REPLICA_LAG_CHECK_SECONDS = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS"))
+except Exception as ex:
+    DB_REPLICA_LAG_CHECK_SECONDS = 5.0
+
+# Apply pending schema migrations when the API starts. Off by default:
+# with several API processes run `make migrate` once per deploy instead
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+# Live event streams (GET /events/...): seconds between keep-alive comments
+# and events buffered per client before it is told to resync
+try:
+    EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS"))
+except Exception as ex:
+    EVENTS_HEARTBEAT_SECONDS = 15
+
+try:
+    EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE"))
+except Exception as ex:
+    EVENTS_QUEUE_SIZE = 100
+
+# HTTP caching of the reference endpoints (core/http_cache.py): max-age for
+# countries/leagues/rounds, and a shorter one for fixtures, which change
+# during matches
+try:
+    HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS"))
+except Exception as ex:
+    HTTP_CACHE_MAX_AGE_SECONDS = 300
+
+try:
+    HTTP_CACHE_LIVE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_LIVE_MAX_AGE_SECONDS"))
+except Exception as ex:
+    HTTP_CACHE_LIVE_MAX_AGE_SECONDS = 10
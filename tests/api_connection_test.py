@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+import httpx
+import pytest
+import core.api_connection as api_connection
+from core.api_cache import ResponseCache, OfflineCacheMiss
+from core.api_connection import TokenBucket, apiFutbolServicio
+
+
+@pytest.fixture
+def mock_api(monkeypatch, tmp_path):
+    """Route the shared client through a MockTransport, skip backoff sleeps and cache on tmp_path."""
+    calls = []
+    responses = []
+
+    def handler(request: httpx.Request):
+        calls.append(request)
+        status, payload = responses.pop(0)
+        return httpx.Response(status, json=payload)
+
+    monkeypatch.setattr(api_connection, "RETRY_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(api_connection, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(api_connection, "_rate_limiter", TokenBucket(rate_per_minute=60_000, capacity=100))
+    monkeypatch.setattr(api_connection, "_semaphore", None)
+    monkeypatch.setattr(api_connection, "response_cache", ResponseCache(directory=str(tmp_path), offline=False))
+    return calls, responses
+
+
+@pytest.mark.asyncio
+async def test_get_retries_on_429_and_5xx(mock_api):
+    calls, responses = mock_api
+    responses.extend([
+        (429, {"message": "Too many requests"}),
+        (503, {"message": "Unavailable"}),
+        (200, {"response": [{"name": "Argentina"}]}),
+    ])
+
+    result = await apiFutbolServicio("https://api.test").countries_from_api()
+
+    assert result == [{"name": "Argentina"}]
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_does_not_retry_client_errors(mock_api):
+    calls, responses = mock_api
+    responses.append((403, {"message": "Forbidden"}))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await apiFutbolServicio("https://api.test").countries_from_api()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """With capacity 1 and 600/min (10/s), 3 acquisitions take ~0.2s."""
+    bucket = TokenBucket(rate_per_minute=600, capacity=1)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+    assert time.monotonic() - start >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_responses_are_cached_and_replayed_offline(mock_api, tmp_path, monkeypatch):
+    calls, responses = mock_api
+    responses.append((200, {"response": [{"name": "Spain"}]}))
+    api = apiFutbolServicio("https://api.test")
+
+    first = await api.countries_from_api()
+    second = await api.countries_from_api()
+    assert first == second == [{"name": "Spain"}]
+    assert second.from_cache and second.content_hash == first.content_hash
+    assert len(calls) == 1
+
+    cache = api_connection.response_cache
+    assert not await cache.is_ingested(first)
+    await cache.mark_ingested(first)
+    assert await cache.is_ingested(second)
+
+    offline = ResponseCache(directory=str(tmp_path), offline=True)
+    monkeypatch.setattr(api_connection, "response_cache", offline)
+    assert await api.countries_from_api() == [{"name": "Spain"}]
+    with pytest.raises(OfflineCacheMiss):
+        await api.rounds_from_api(liga=1, season=2025)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_follows_paging(mock_api):
+    calls, responses = mock_api
+    responses.extend([
+        (200, {"paging": {"current": 1, "total": 2}, "response": [{"id": 1}, {"id": 2}]}),
+        (200, {"paging": {"current": 2, "total": 2}, "response": [{"id": 3}]}),
+    ])
+    api = apiFutbolServicio("https://api.test")
+
+    pages = [page async for page in api.iter_pages("players", {"league": 39})]
+
+    assert [list(page) for page in pages] == [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+    assert calls[1].url.params["page"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_fixtures_by_ids_chunks_and_skips_cache(mock_api, tmp_path, monkeypatch):
+    calls, responses = mock_api
+    responses.extend([(200, {"response": [{"id": 1}]})] * 4)
+    api = apiFutbolServicio("https://api.test")
+    ids = list(range(1, 26))
+
+    await api.fixtures_by_ids_from_api(ids)
+    await api.fixtures_by_ids_from_api(ids)
+
+    assert len(calls) == 4
+    assert calls[0].url.params["ids"] == "-".join(str(i) for i in range(1, 21))
+    assert calls[1].url.params["ids"] == "21-22-23-24-25"
+    assert not (tmp_path / "fixtures").exists()
+
+    # Offline replay never goes to the network, not even for live polling
+    monkeypatch.setattr(api_connection, "response_cache", ResponseCache(directory=str(tmp_path), offline=True))
+    with pytest.raises(OfflineCacheMiss):
+        await api.fixtures_by_ids_from_api(ids)
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_error_envelope_raises_and_is_not_cached(mock_api):
+    calls, responses = mock_api
+    responses.extend([
+        (200, {"errors": {"requests": "You have reached the request limit for the day"}, "response": []}),
+        (200, {"errors": [], "response": [{"name": "Spain"}]}),
+    ])
+    api = apiFutbolServicio("https://api.test")
+
+    with pytest.raises(api_connection.ApiFootballError):
+        await api.countries_from_api()
+    assert await api.countries_from_api() == [{"name": "Spain"}]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_prune_removes_expired_responses_unless_kept(mock_api, tmp_path):
+    calls, responses = mock_api
+    responses.extend([(200, {"response": [{"name": "Spain"}]}), (200, {"response": [{"id": 1}]})])
+    api = apiFutbolServicio("https://api.test")
+    await api.countries_from_api()
+    await api.fixtures_from_api(liga=1, season=2025, from_d="2025-01-01", to="2025-01-02")
+
+    # The fixtures response is past its 10 minute TTL, countries are not
+    [fixtures_file] = (tmp_path / "fixtures").iterdir()
+    os.utime(fixtures_file, (time.time() - 3600, time.time() - 3600))
+
+    kept = ResponseCache(directory=str(tmp_path), offline=False, keep_recordings=True)
+    assert await kept.prune() == 0
+    assert await api_connection.response_cache.prune() == 1
+    assert not fixtures_file.exists()
+    assert len(list((tmp_path / "countries").iterdir())) == 1
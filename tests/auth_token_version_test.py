@@ -0,0 +1,90 @@
+import pytest
+import pytest_asyncio
+import blueprints.auth.utils as auth_utils
+from blueprints.auth.jwt_handler import create_access_token
+from blueprints.auth.utils import _user_from_token, get_token_version, token_claims
+from models.auth.auth_models import User
+from services.auth_valkey import AuthValkey
+from services.token_postgres import TokenPostgres
+
+
+class FakeValkey:
+    """Strings plus the version cache script."""
+
+    def __init__(self):
+        self.strings = {}
+
+    def flushall(self):
+        self.strings = {}
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def eval(self, script, numkeys, key, version, ttl_seconds):
+        current = self.strings.get(key)
+        if current is not None and int(current) >= int(version):
+            return 0
+        self.strings[key] = str(version).encode()
+        return 1
+
+
+async def revoke(db, valkey_client, user_id: int) -> int:
+    """What logout-all does with the token version."""
+    auth_valkey = AuthValkey(valkey_client)
+    cached_version = await auth_valkey.get_token_version(user_id)
+    version = await TokenPostgres().bump_token_version(db, user_id, floor=cached_version or 0)
+    await auth_valkey.cache_token_version(user_id, version)
+    return version
+
+
+def bearer(user, version: int) -> str:
+    return "Bearer " + create_access_token(token_claims(user, version))
+
+
+@pytest_asyncio.fixture
+async def user(db):
+    user = User(email="ana@example.com", username="ana", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    return user
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("trust_claims", [True, False])
+async def test_revoked_token_stays_revoked_after_valkey_flush(db, user, monkeypatch, trust_claims):
+    monkeypatch.setattr(auth_utils, "AUTH_TRUST_TOKEN_CLAIMS", trust_claims)
+    valkey_client = FakeValkey()
+    old_token = bearer(user, await get_token_version(user.id, valkey_client, db))
+
+    assert await revoke(db, valkey_client, user.id) == 1
+    with pytest.raises(ValueError, match="revocado"):
+        await _user_from_token(old_token, valkey_client, db)
+
+    valkey_client.flushall()
+    with pytest.raises(ValueError, match="revocado"):
+        await _user_from_token(old_token, valkey_client, db)
+
+    new_token = bearer(user, await get_token_version(user.id, valkey_client, db))
+    assert (await _user_from_token(new_token, valkey_client, db)).id == user.id
+    assert await AuthValkey(valkey_client).get_token_version(user.id) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_version_never_overwrites_a_newer_one(db, user):
+    valkey_client = FakeValkey()
+    auth_valkey = AuthValkey(valkey_client)
+    # A reader loads version 0 from Postgres, a revocation lands before it caches it
+    stale = await TokenPostgres().get_token_version(db, user.id)
+    await revoke(db, valkey_client, user.id)
+
+    assert not await auth_valkey.cache_token_version(user.id, stale)
+    assert await auth_valkey.get_token_version(user.id) == 1
+
+
+@pytest.mark.asyncio
+async def test_revoke_moves_past_versions_cached_before_the_column(db, user):
+    valkey_client = FakeValkey()
+    valkey_client.strings[f"auth:token_version:{user.id}"] = b"5"
+
+    assert await revoke(db, valkey_client, user.id) == 6
+    assert await TokenPostgres().get_token_version(db, user.id) == 6
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from models.countries import Country
+from models.fixtures.fixture import Fixture
+from models.fixtures.fixture_status import FixtureStatus
+from models.leagues import League
+from models.teams import Team
+from services.bulk_upsert import bulk_upsert
+from services.fixture_postgres import FixturePostgres
+
+
+def team(id: int, name: str, logo=None) -> dict:
+    return {"id": id, "name": name, "country_name": "Argentina", "logo": logo}
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_counts_and_skips_identical_rows(db):
+    db.add(Country("Argentina", "AR"))
+    await db.commit()
+
+    counts = await bulk_upsert(db, Team, [team(1, "A"), team(2, "B"), team(3, "C")], key=["id"], update_columns=["name", "logo"])
+    assert counts == {"inserted": 3, "updated": 0, "unchanged": 0}
+
+    # NULL logo to NULL is not a change (IS DISTINCT FROM); duplicates keep the last row;
+    # batch_size splits the statement without changing the totals
+    rows = [team(1, "A"), team(2, "old"), team(2, "B2"), team(3, "C", logo="c.png"), team(4, "D")]
+    counts = await bulk_upsert(db, Team, rows, key=["id"], update_columns=["name", "logo"], batch_size=2)
+    await db.commit()
+    assert counts == {"inserted": 1, "updated": 2, "unchanged": 1}
+
+    stored = {row.id: (row.name, row.logo) for row in (await db.execute(select(Team))).scalars()}
+    assert stored == {1: ("A", None), 2: ("B2", None), 3: ("C", "c.png"), 4: ("D", None)}
+
+
+def fixture(id: int, home_id: int = 10, **changes) -> dict:
+    return {
+        "id": id, "league_id": 1, "home_id": home_id, "away_id": 20, "date": datetime(2026, 5, 1, 20, 0),
+        "home_team_score": None, "away_team_score": None, "home_pens_score": None,
+        "away_pens_score": None, "status": FixtureStatus.NS, "round": "Regular Season - 1", **changes
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_fixtures_moves_updated_at_only_on_change(db, monkeypatch):
+    db.add_all([Country("Argentina", "AR"), League(1, "Liga", "Argentina", 2026)])
+    db.add_all([Team(id=10, name="A", country_name="Argentina"), Team(id=20, name="B", country_name="Argentina")])
+    await db.commit()
+
+    clock = {"now": datetime(2026, 5, 1, 20, 0)}
+
+    async def get_db_utcnow(self, db):
+        return clock["now"]
+
+    monkeypatch.setattr(FixturePostgres, "get_db_utcnow", get_db_utcnow)
+    start = clock["now"]
+
+    counts = await FixturePostgres().bulk_upsert_fixtures(db, [fixture(1), fixture(2), fixture(3, home_id=99)])
+    assert (counts["inserted"], counts["updated"], counts["unchanged"]) == (2, 0, 0)
+    assert [skipped["id"] for skipped in counts["skipped"]] == [3]
+
+    clock["now"] = start + timedelta(minutes=1)
+    counts = await FixturePostgres().bulk_upsert_fixtures(db, [fixture(1), fixture(2, home_team_score=1, status=FixtureStatus.H1)])
+    assert (counts["inserted"], counts["updated"], counts["unchanged"], counts["skipped"]) == (0, 1, 1, [])
+
+    stored = {row.id: row for row in (await db.execute(select(Fixture).execution_options(populate_existing=True))).scalars()}
+    assert stored[1].updated_at == start
+    assert stored[2].updated_at == start + timedelta(minutes=1)
+    assert (stored[2].home_team_score, stored[2].status) == (1, FixtureStatus.H1)
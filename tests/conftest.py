@@ -0,0 +1,34 @@
+import os
+
+# database.py builds its engine on import (the models need its Base). It is
+# never connected in the tests, which use the in-memory engine below.
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///unused.db")
+# blueprints.auth.jwt_handler refuses to import without a key
+os.environ.setdefault("JWT_KEY", "test-key-that-is-long-enough-for-hs256")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest_asyncio.fixture
+async def db_sessionmaker():
+    """Fresh in-memory SQLite database with the full schema of the models."""
+    # Registers every model on Base.metadata
+    import models.auth.auth_models, models.countries, models.fixtures.fixture, models.leagues  # noqa: F401
+    import models.predictions, models.rounds, models.teams, models.tournament_participants, models.tournaments  # noqa: F401
+    from database import Base
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(db_sessionmaker):
+    async with db_sessionmaker() as session:
+        yield session
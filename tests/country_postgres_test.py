@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import select
+from models.countries import Country
+from services.country_postgres import CountryPostgres
+
+
+async def stored_codes(db) -> dict:
+    return {name: code for name, code in (await db.execute(select(Country.name, Country.code))).all()}
+
+
+@pytest.mark.asyncio
+async def test_code_moves_to_the_renamed_country(db):
+    service = CountryPostgres()
+    await service.bulk_upsert_countries(db, [
+        {"name": "Swaziland", "code": "SZ", "flag": "sz.svg"},
+        {"name": "World", "code": None, "flag": None},
+    ])
+
+    counts = await service.bulk_upsert_countries(db, [
+        {"name": "Eswatini", "code": "SZ", "flag": "sz.svg"},
+        {"name": "World", "code": None, "flag": None},
+    ])
+
+    assert counts == {"inserted": 1, "updated": 0, "unchanged": 1}
+    # The old row stays (teams and leagues reference it by name), without the code
+    assert await stored_codes(db) == {"Swaziland": None, "World": None, "Eswatini": "SZ"}
+
+
+@pytest.mark.asyncio
+async def test_swapped_and_repeated_codes_in_one_payload(db):
+    service = CountryPostgres()
+    await service.bulk_upsert_countries(db, [
+        {"name": "Alpha", "code": "AA", "flag": None},
+        {"name": "Beta", "code": "BB", "flag": None},
+    ])
+
+    await service.bulk_upsert_countries(db, [
+        {"name": "Alpha", "code": "BB", "flag": None},
+        {"name": "Beta", "code": "AA", "flag": None},
+        # same code as Alpha: the first one keeps it
+        {"name": "Gamma", "code": "BB", "flag": None},
+    ])
+
+    assert await stored_codes(db) == {"Alpha": "BB", "Beta": "AA", "Gamma": None}
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import pytest
+import services.events_valkey as events
+from services.events_valkey import EventBroker, RESYNC_EVENT, league_channel
+
+
+class FakePubSub:
+    """Replays published messages as pmessages, like a PSUBSCRIBE connection."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.patterns = []
+
+    async def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+
+    async def listen(self):
+        for channel, data in self.messages:
+            yield {"type": "pmessage", "pattern": b"events:*", "channel": channel.encode(), "data": data.encode()}
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+class FakeValkey:
+    def __init__(self, messages):
+        self.pubsub_connections = []
+        self.messages = messages
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub(self.messages)
+        self.pubsub_connections.append(pubsub)
+        return pubsub
+
+
+@pytest.mark.asyncio
+async def test_one_subscription_fans_out_per_channel(monkeypatch):
+    fixture = json.dumps({"type": "fixture", "fixture": {"id": 1}})
+    other = json.dumps({"type": "fixture", "fixture": {"id": 2}})
+    valkey_client = FakeValkey([(league_channel(39), fixture), (league_channel(140), other)])
+    monkeypatch.setattr(events, "get_valkey_client", lambda: valkey_client)
+
+    broker = EventBroker(queue_size=10)
+    first = broker.subscribe(league_channel(39))
+    second = broker.subscribe(league_channel(39))
+
+    assert await asyncio.wait_for(first.get(), 1) == fixture
+    assert await asyncio.wait_for(second.get(), 1) == fixture
+    assert first.empty() and second.empty()
+    assert len(valkey_client.pubsub_connections) == 1
+    assert valkey_client.pubsub_connections[0].patterns == ["events:*"]
+
+    broker.unsubscribe(league_channel(39), first)
+    broker.unsubscribe(league_channel(39), second)
+    assert broker.subscriber_count() == 0
+    await broker.close()
+
+
+def test_slow_client_gets_resync_instead_of_a_gap():
+    broker = EventBroker(queue_size=2)
+    queue = asyncio.Queue(maxsize=2)
+    broker._subscribers[league_channel(39)].add(queue)
+
+    for n in range(3):
+        broker.dispatch(league_channel(39), str(n))
+
+    assert queue.get_nowait() == RESYNC_EVENT
+    assert queue.empty()
@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+import services.fixture_valkey as fixture_valkey
+from models.countries import Country
+from models.fixtures.fixture_status import FixtureStatus
+from models.leagues import League
+from models.teams import Team
+from services.fixture_postgres import FixturePostgres
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeValkey:
+    """Just the commands the fixture sync uses."""
+
+    def __init__(self):
+        self.strings = {}
+        self.sets = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def set(self, key, value, nx=False):
+        self.strings[key] = str(value)
+
+    async def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    async def publish(self, channel, message):
+        pass
+
+
+def fixture_row(id: int, home_score=None) -> dict:
+    return {
+        "id": id, "league_id": 1, "home_id": 10, "away_id": 20, "date": datetime(2026, 5, 1, 20, 0),
+        "home_team_score": home_score, "away_team_score": None, "home_pens_score": None,
+        "away_pens_score": None, "status": FixtureStatus.NS, "round": "Regular Season - 1"
+    }
+
+
+@pytest.mark.asyncio
+async def test_late_committed_fixture_is_still_synced(db_sessionmaker, monkeypatch):
+    async with db_sessionmaker() as db:
+        db.add_all([Country("Argentina", "AR"), League(1, "Liga", "Argentina", 2026)])
+        db.add_all([Team(id=10, name="A", country_name="Argentina"), Team(id=20, name="B", country_name="Argentina")])
+        await db.commit()
+
+    clock = {"now": datetime(2026, 5, 1, 20, 0)}
+
+    async def get_db_utcnow(self, db):
+        return clock["now"]
+
+    async def get_db():
+        async with db_sessionmaker() as db:
+            yield db
+
+    monkeypatch.setattr(FixturePostgres, "get_db_utcnow", get_db_utcnow)
+    monkeypatch.setattr(fixture_valkey, "get_db", get_db)
+    client = FakeValkey()
+    sync = fixture_valkey.FixtureValkey(client)
+    start = clock["now"]
+
+    # Fixture 1 is written at start + 30s, the first sync runs a minute in
+    async with db_sessionmaker() as db:
+        clock["now"] = start + timedelta(seconds=30)
+        await FixturePostgres().bulk_upsert_fixtures(db, [fixture_row(1)])
+    clock["now"] = start + timedelta(seconds=60)
+    await sync.add_or_update_fixture()
+
+    # A transaction stamped at `start` (older than every row seen so far)
+    # commits only now
+    async with db_sessionmaker() as db:
+        clock["now"] = start
+        await FixturePostgres().bulk_upsert_fixtures(db, [fixture_row(2, home_score=1)])
+
+    clock["now"] = start + timedelta(seconds=120)
+    await sync.add_or_update_fixture()
+    assert json.loads(client.strings["fixture:2"])["home_team_score"] == 1
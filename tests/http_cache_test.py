@@ -0,0 +1,135 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+import core.http_cache as http_cache
+from core.http_cache import HTTPCacheMiddleware
+from services.data_version_valkey import DataVersionValkey
+
+
+class FakeValkey:
+    """Just the commands DataVersionValkey uses."""
+
+    def __init__(self):
+        self.strings = {}
+        self.commands = []
+
+    async def mget(self, keys):
+        return [self.strings.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        self.commands = []
+        return self
+
+    def set(self, key, value, nx=False):
+        self.commands.append(("set", key, value, nx))
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    async def execute(self):
+        results = []
+        for command in self.commands:
+            if command[0] == "set":
+                _, key, value, nx = command
+                if nx and key in self.strings:
+                    results.append(None)
+                    continue
+                self.strings[key] = str(value).encode()
+                results.append(True)
+            else:
+                results.append(self.strings.get(command[1]))
+        return results
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_skips_endpoint_until_data_changes(monkeypatch):
+    valkey_client = FakeValkey()
+    monkeypatch.setattr(http_cache, "get_valkey_client", lambda: valkey_client)
+    calls = []
+
+    async def countries(request):
+        calls.append(request.url.path)
+        return JSONResponse({"status": "success", "countries": []})
+
+    app = HTTPCacheMiddleware(Starlette(routes=[Route("/countries", countries), Route("/me", countries)]))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/countries")
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.headers["cache-control"].startswith("public, max-age=")
+        assert "last-modified" in first.headers
+
+        cached = await client.get("/countries", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert len(calls) == 1
+
+        await DataVersionValkey(valkey_client).bump("leagues")
+        assert (await client.get("/countries", headers={"If-None-Match": etag})).status_code == 304
+
+        valkey_client.strings["data_version:countries"] = b"1"
+        changed = await client.get("/countries", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+
+        # Routes outside CACHED_ROUTES are left alone
+        assert "etag" not in (await client.get("/me")).headers
+        assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_fresh_change_clears_reference_cache_and_skips_validators(monkeypatch):
+    import time
+    import services.data_version_valkey as data_version
+    from services.reference_cache import reference_cache
+
+    valkey_client = FakeValkey()
+    monkeypatch.setattr(http_cache, "get_valkey_client", lambda: valkey_client)
+    # As with read replicas: a change is visible everywhere only after 10s
+    monkeypatch.setattr(data_version, "SETTLE_SECONDS", 10)
+    valkey_client.strings["data_version:countries"] = b"1"
+    reference_cache.apply_data_versions({"countries": 1})
+    reference_cache.region("countries").set("all", ["stale"])
+    seen = []
+
+    async def countries(request):
+        seen.append(reference_cache.region("countries").get("all"))
+        return JSONResponse({"status": "success", "countries": []})
+
+    app = HTTPCacheMiddleware(Starlette(routes=[Route("/countries", countries)]))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        valkey_client.strings["data_version:countries"] = str(int(time.time() * 1000)).encode()
+        response = await client.get("/countries")
+
+    assert seen == [None]
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert response.headers["cache-control"] == "no-store"
+    # Not refilled until replicas caught up
+    reference_cache.region("countries").set("all", ["from a lagging replica"])
+    assert reference_cache.region("countries").get("all") is None
+    reference_cache.apply_data_versions({"countries": 1})
+
+
+@pytest.mark.asyncio
+async def test_country_change_invalidates_fixtures_and_rounds(monkeypatch):
+    valkey_client = FakeValkey()
+    monkeypatch.setattr(http_cache, "get_valkey_client", lambda: valkey_client)
+    for dataset in ("countries", "leagues", "rounds", "teams", "fixtures"):
+        valkey_client.strings[f"data_version:{dataset}"] = b"1"
+
+    async def endpoint(request):
+        return JSONResponse({"status": "success"})
+
+    app = HTTPCacheMiddleware(Starlette(routes=[Route("/fixtures", endpoint), Route("/rounds/by-league", endpoint)]))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        etags = {path: (await client.get(path)).headers["etag"] for path in ("/fixtures", "/rounds/by-league")}
+
+        # Team and league country info is embedded in these responses
+        valkey_client.strings["data_version:countries"] = b"2"
+        for path, etag in etags.items():
+            response = await client.get(path, headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["etag"] != etag
@@ -0,0 +1,37 @@
+import json
+import random
+import pytest
+from core.json_stream import ResponseStreamParser
+
+
+def test_parser_yields_items_across_arbitrary_chunk_boundaries():
+    document = {
+        "get": "fixtures",
+        "errors": [],
+        "results": 40,
+        "paging": {"current": 1, "total": 3},
+        "response": [{"id": i, "name": "ñandú \"x\"", "score": [i, 2.5, None, True]} for i in range(40)],
+    }
+    raw = json.dumps(document).encode()
+    rng = random.Random(7)
+
+    for _ in range(50):
+        parser = ResponseStreamParser()
+        items = []
+        position = 0
+        while position < len(raw):
+            size = rng.randint(1, 32)
+            items.extend(parser.feed(raw[position:position + size]))
+            position += size
+        items.extend(parser.close())
+
+        assert items == document["response"]
+        assert parser.envelope["paging"] == {"current": 1, "total": 3}
+        assert parser.envelope["results"] == 40
+
+
+def test_parser_rejects_truncated_body():
+    parser = ResponseStreamParser()
+    parser.feed(b'{"results": 2, "response": [{"id": 1}, {"id"')
+    with pytest.raises(ValueError):
+        parser.close()
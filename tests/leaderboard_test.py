@@ -0,0 +1,262 @@
+import json
+from datetime import datetime
+import pytest
+from sqlalchemy import select
+from models.auth.auth_models import User
+from models.countries import Country
+from models.fixtures.fixture import Fixture
+from models.fixtures.fixture_status import FixtureStatus
+from models.leagues import League
+from models.predictions import Prediction
+from models.teams import Team
+from models.tournament_participants import TournamentParticipant
+from models.tournaments import Tournament
+from services.leaderboard_valkey import LeaderboardValkey
+from services.tournament_postgres import TournamentPostgres
+
+TOURNAMENT_ID = 1
+LEAGUE_ID = 1
+
+# username: [(points, exact hit)] per prediction
+PREDICTIONS = {
+    "bob": [(3, True), (1, False)],
+    "alice": [(3, True), (1, False)],
+    "dave": [(3, True)],
+    # byte order: uppercase before lowercase
+    "Zoe": [(3, True)],
+    "carl": [(1, False), (1, False), (1, False)],
+    # joined, never predicted
+    "eve": [],
+}
+
+
+async def seed_tournament(db, predictions: dict = PREDICTIONS) -> dict[str, int]:
+    """Tournament of LEAGUE_ID with the given predictions. Returns {username: user_id}."""
+    db.add_all([Country("Argentina", "AR"), League(LEAGUE_ID, "Liga", "Argentina", 2026)])
+    db.add_all([Team(id=10, name="A", country_name="Argentina"), Team(id=20, name="B", country_name="Argentina")])
+    for match_id in range(1, 4):
+        db.add(Fixture(
+            id=match_id, league_id=LEAGUE_ID, home_id=10, away_id=20, date=datetime(2026, 5, match_id),
+            home_team_score=2, away_team_score=1, home_pens_score=None, away_pens_score=None,
+            status=FixtureStatus.FT, round="Regular Season - 1"
+        ))
+
+    users = {}
+    for username in predictions:
+        user = User(email=f"{username}@example.com", username=username, hashed_password="x")
+        db.add(user)
+        await db.flush()
+        users[username] = user.id
+
+    db.add(Tournament("Prode", creator_id=users[next(iter(predictions))], league_id=LEAGUE_ID))
+    await db.flush()
+    for username, user_predictions in predictions.items():
+        db.add(TournamentParticipant(tournament_id=TOURNAMENT_ID, user_id=users[username]))
+        for match_id, (points, exact) in enumerate(user_predictions, start=1):
+            db.add(Prediction(
+                user_id=users[username], match_id=match_id,
+                goals_home=2 if exact else 0, goals_away=1 if exact else 0, points=points
+            ))
+    await db.commit()
+    return users
+
+
+@pytest.mark.asyncio
+async def test_postgres_leaderboard_ranks_ties_and_members_without_predictions(db):
+    await seed_tournament(db)
+    leaderboard = await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)
+
+    assert [(row["username"], row["points"], row["correct_predictions"], row["rank"]) for row in leaderboard] == [
+        ("alice", 4, 1, 1),
+        ("bob", 4, 1, 1),
+        ("Zoe", 3, 1, 3),
+        ("dave", 3, 1, 3),
+        ("carl", 3, 0, 5),
+        ("eve", 0, 0, 6),
+    ]
+    assert leaderboard[-1]["total_predictions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_postgres_leaderboard_pages_keep_global_ranks(db):
+    await seed_tournament(db)
+    full = await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)
+
+    page = await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID, offset=1, limit=3)
+    assert page == full[1:4]
+    assert [row["rank"] for row in page] == [1, 3, 3]
+    assert await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID, offset=4) == full[4:]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+def _bytes(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+def _in_bounds(score: float, low, high) -> bool:
+    def parse(bound):
+        bound = str(bound)
+        return (float(bound[1:]), True) if bound.startswith("(") else (float(bound), False)
+    (low, low_open), (high, high_open) = parse(low), parse(high)
+    return (score > low if low_open else score >= low) and (score < high if high_open else score <= high)
+
+
+class FakeValkey:
+    """Sorted sets, hashes and strings with Valkey's ordering (equal scores by member bytes)."""
+
+    def __init__(self):
+        self.flushall()
+        self.published = []
+
+    def flushall(self):
+        self.zsets, self.hashes, self.strings = {}, {}, {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _descending(self, key):
+        # ZREVRANGE: score descending, ties in reverse member order
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+    async def exists(self, key):
+        return int(key in self.strings or key in self.zsets or key in self.hashes)
+
+    async def set(self, key, value):
+        self.strings[key] = _bytes(value)
+
+    async def delete(self, *keys):
+        for key in keys:
+            for store in (self.zsets, self.hashes, self.strings):
+                store.pop(key, None)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update({_bytes(member): float(score) for member, score in mapping.items()})
+
+    async def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(_bytes(member), None)
+
+    async def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(_bytes(member))
+
+    async def zmscore(self, key, members):
+        return [await self.zscore(key, member) for member in members]
+
+    async def zcount(self, key, low, high):
+        return sum(1 for score in self.zsets.get(key, {}).values() if _in_bounds(score, low, high))
+
+    async def zrevrange(self, key, start, stop, withscores=False):
+        items = self._descending(key)
+        stop = len(items) + stop if stop < 0 else stop
+        return items[start:stop + 1]
+
+    async def zrevrangebyscore(self, key, high, low, start=None, num=None, withscores=False):
+        items = [item for item in self._descending(key) if _in_bounds(item[1], low, high)]
+        start = start or 0
+        return items[start:None if num is None else start + num]
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({_bytes(field): _bytes(value) for field, value in mapping.items()})
+
+    async def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(_bytes(field), None)
+
+    async def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(_bytes(field)) for field in fields]
+
+    async def publish(self, channel, message):
+        self.published.append(json.loads(message))
+
+
+async def built_leaderboard(db):
+    users = await seed_tournament(db)
+    tournament = await TournamentPostgres().get_tournament_by_id(db, TOURNAMENT_ID)
+    store = LeaderboardValkey(FakeValkey())
+    await store.rebuild(db, tournament)
+    return store, users
+
+
+@pytest.mark.asyncio
+async def test_valkey_leaderboard_matches_postgres_on_every_page(db):
+    store, _users = await built_leaderboard(db)
+    expected = await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)
+
+    assert await store.get_page(TOURNAMENT_ID) == expected
+    # Pages of every size and offset, many of them cutting through a tie group
+    for limit in range(1, len(expected) + 1):
+        for offset in range(len(expected) + 1):
+            assert await store.get_page(TOURNAMENT_ID, offset, limit) == expected[offset:offset + limit], (offset, limit)
+
+
+@pytest.mark.asyncio
+async def test_valkey_leaderboard_around_user_at_both_edges(db):
+    store, users = await built_leaderboard(db)
+    expected = await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)
+
+    assert await store.get_around_user(TOURNAMENT_ID, users["alice"], radius=2) == expected[:3]
+    assert await store.get_around_user(TOURNAMENT_ID, users["eve"], radius=2) == expected[3:]
+    # Inside a tie group: position by username, not by member order
+    assert await store.get_around_user(TOURNAMENT_ID, users["dave"], radius=1) == expected[2:5]
+    assert await store.get_around_user(TOURNAMENT_ID, 999, radius=1) == []
+
+
+@pytest.mark.asyncio
+async def test_newcomer_with_zero_points_is_ranked_and_published(db):
+    store, users = await built_leaderboard(db)
+    newcomer = User(email="adam@example.com", username="adam", hashed_password="x")
+    db.add(newcomer)
+    await db.flush()
+    db.add(TournamentParticipant(tournament_id=TOURNAMENT_ID, user_id=newcomer.id))
+    await db.commit()
+
+    await store.update_participants(db, TOURNAMENT_ID, LEAGUE_ID, [newcomer.id])
+
+    expected = await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)
+    assert await store.get_page(TOURNAMENT_ID) == expected
+    assert [(row["username"], row["rank"]) for row in expected[-2:]] == [("adam", 6), ("eve", 6)]
+    # Nobody scored less than the newcomer, so nobody else moved
+    [event] = store.valkey_client.published
+    assert [(change["username"], change["rank"], change["previous_rank"]) for change in event["changes"]] == [("adam", 6, None)]
+
+
+@pytest.mark.asyncio
+async def test_score_change_publishes_everyone_whose_rank_moved(db):
+    store, users = await built_leaderboard(db)
+    before = {row["username"]: row["rank"] for row in await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)}
+
+    # carl's third prediction becomes an exact hit worth 3: 5 points, 1 exact
+    prediction = await db.scalar(select(Prediction).where(Prediction.user_id == users["carl"], Prediction.match_id == 3))
+    prediction.points, prediction.goals_home, prediction.goals_away = 3, 2, 1
+    await db.commit()
+    await store.update_participants(db, TOURNAMENT_ID, LEAGUE_ID, [users["carl"]])
+
+    expected = await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)
+    assert await store.get_page(TOURNAMENT_ID) == expected
+    after = {row["username"]: row["rank"] for row in expected}
+
+    [event] = store.valkey_client.published
+    changes = {change["username"]: (change["previous_rank"], change["rank"]) for change in event["changes"]}
+    moved = {username: (before[username], after[username]) for username in after if before[username] != after[username]}
+    assert changes == moved == {"carl": (5, 1), "alice": (1, 2), "bob": (1, 2), "Zoe": (3, 4), "dave": (3, 4)}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_after_flush(db):
+    store, _users = await built_leaderboard(db)
+    store.valkey_client.flushall()
+    assert not await store.is_built(TOURNAMENT_ID)
+    assert await store.get_page(TOURNAMENT_ID) == []
+
+    tournament = await TournamentPostgres().get_tournament_by_id(db, TOURNAMENT_ID)
+    assert await store.rebuild(db, tournament) == len(PREDICTIONS)
+    assert await store.get_page(TOURNAMENT_ID) == await TournamentPostgres().get_leaderboard(db, TOURNAMENT_ID, LEAGUE_ID)
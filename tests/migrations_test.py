@@ -0,0 +1,45 @@
+import sys
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from migrations.runner import migrate, pending_migrations
+
+
+@pytest.fixture
+def versions_package(tmp_path, monkeypatch):
+    package = tmp_path / "fake_versions"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "m0001_items.py").write_text(
+        "from sqlalchemy import text\n"
+        "async def upgrade(conn):\n"
+        "    await conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY, kind VARCHAR(20))'))\n"
+    )
+    (package / "m0002_items_kind_index.py").write_text(
+        "from migrations.runner import add_column_if_missing, create_index_if_missing\n"
+        "TRANSACTIONAL = False\n"
+        "async def upgrade(conn):\n"
+        "    await add_column_if_missing(conn, 'items', 'kind', 'kind VARCHAR(20)')\n"
+        "    await create_index_if_missing(conn, 'ix_items_kind', 'items', ['kind'], concurrently=True)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "fake_versions"
+    for name in [name for name in sys.modules if name.startswith("fake_versions")]:
+        del sys.modules[name]
+
+
+@pytest.mark.asyncio
+async def test_migrate_applies_pending_once(versions_package, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+
+    assert [m.version for m in await pending_migrations(engine, versions_package)] == [1, 2]
+    assert await migrate(engine, versions_package) == [1, 2]
+    assert await migrate(engine, versions_package) == []
+    assert await pending_migrations(engine, versions_package) == []
+
+    async with engine.connect() as conn:
+        indexes = await conn.run_sync(lambda c: [i["name"] for i in inspect(c).get_indexes("items")])
+        versions = (await conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))).scalars().all()
+    assert indexes == ["ix_items_kind"]
+    assert versions == [1, 2]
+    await engine.dispose()
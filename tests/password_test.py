@@ -0,0 +1,21 @@
+import pytest
+from werkzeug.security import generate_password_hash
+import blueprints.auth.passwords as passwords
+
+
+@pytest.mark.asyncio
+async def test_hash_verify_and_rehash_when_cost_changes(monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+    hashed = await passwords.hash_password("secreto")
+    assert hashed.startswith("pbkdf2:sha256:1000$")
+    assert await passwords.verify_password("secreto", hashed)
+    assert not await passwords.verify_password("otro", hashed)
+    assert not passwords.password_needs_rehash(hashed)
+
+    # Higher configured cost, or a hash from another method, asks for a rehash
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:2000")
+    assert passwords.password_needs_rehash(hashed)
+    legacy = generate_password_hash("secreto", method="scrypt:1024:8:1")
+    assert await passwords.verify_password("secreto", legacy)
+    assert passwords.password_needs_rehash(legacy)
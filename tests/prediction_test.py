@@ -57,3 +57,90 @@ async def test_database_connection_and_commit():
         assert result is not None
 
     await engine.dispose()
+
+
+class ScoringRow(Base):
+    __tablename__ = "scoring_rows"
+    id = Column(Integer, primary_key=True)
+    pred_home = Column(Integer)
+    pred_away = Column(Integer)
+    real_home = Column(Integer)
+    real_away = Column(Integer)
+
+
+@pytest.mark.asyncio
+async def test_points_expression_matches_score_prediction():
+    """The SQL scoring expression must agree with the Python rules."""
+    from sqlalchemy import select
+
+    service = PredictionPointsService()
+    goals = [None, 0, 1, 2]
+    combos = [
+        (ph, pa, rh, ra)
+        for ph in goals for pa in goals for rh in goals for ra in goals
+    ]
+
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add_all([
+            ScoringRow(id=i, pred_home=ph, pred_away=pa, real_home=rh, real_away=ra)
+            for i, (ph, pa, rh, ra) in enumerate(combos)
+        ])
+        await db.commit()
+
+        expression = service.points_expression(
+            ScoringRow.pred_home, ScoringRow.pred_away, ScoringRow.real_home, ScoringRow.real_away
+        )
+        result = await db.execute(select(ScoringRow.id, expression).order_by(ScoringRow.id))
+        sql_points = dict(result.all())
+
+    await engine.dispose()
+
+    for i, combo in enumerate(combos):
+        assert sql_points[i] == service.score_prediction(*combo)[0], combo
+
+
+def test_score_predictions_batch_matches_score_prediction():
+    """The vectorized kernel must agree with score_prediction, plus the penalty bonus."""
+    from services.prediction_points import REASON_LABELS
+
+    service = PredictionPointsService()
+    goals = [None, 0, 1, 2]
+    combos = [
+        (ph, pa, rh, ra)
+        for ph in goals for pa in goals for rh in goals for ra in goals
+    ]
+    columns = list(zip(*combos))
+
+    points, reasons = service.score_predictions_batch(*columns)
+    for combo, pts, reason in zip(combos, points.tolist(), reasons.tolist()):
+        assert (pts, REASON_LABELS[reason]) == service.score_prediction(*combo), combo
+
+    # penalty bonus only when the four values are present and the shootout is exact
+    points, _reasons = service.score_predictions_batch(
+        [1, 1, 1], [1, 1, 1], [1, 1, 1], [1, 1, 1],
+        [4, 4, None], [3, 2, 3], [4, 4, 4], [3, 3, 3],
+        penalty_bonus_points=3
+    )
+    assert points.tolist() == [6, 3, 3]
+
+
+@pytest.mark.asyncio
+async def test_score_finished_fixtures_counts_fixtures_in_both_modes(db):
+    from services.prediction_postgres import PredictionPostgres
+    from tests.leaderboard_test import seed_tournament
+
+    await seed_tournament(db)
+    service = PredictionPostgres()
+
+    assert (await service.score_finished_fixtures(db))["fixtures_scored"] == 3
+    assert (await service.score_finished_fixtures(db))["fixtures_scored"] == 0
+
+    # A full recompute reports every finished fixture, even with nothing to write
+    full = await service.score_finished_fixtures(db, only_pending=False)
+    assert (full["fixtures_scored"], full["predictions_updated"]) == (3, 0)
+    assert (await service.score_finished_fixtures(db, fixture_ids=[1, 2], only_pending=False))["fixtures_scored"] == 2
@@ -0,0 +1,82 @@
+import time
+from services.reference_cache import LRUCache, ReferenceCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Ensure the cache never grows past maxsize and evicts the LRU entry."""
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+
+    # touch 1 so 2 becomes the least recently used
+    assert cache.get(1) == "a"
+    cache.set(3, "c")
+
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=10, ttl=0.01)
+    cache.set("key", {"id": 1})
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    hits, misses = cache.get_many(["key"])
+    assert hits == {} and misses == ["key"]
+
+
+def test_lru_cache_can_store_none():
+    """A cached None (missing row) must be a hit, not a miss."""
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set(("id", 99), None)
+
+    assert ("id", 99) in cache
+    hits, misses = cache.get_many([("id", 99)])
+    assert hits == {("id", 99): None} and misses == []
+
+
+def test_lru_cache_per_entry_ttl():
+    """Missing rows are cached with a shorter TTL than the region's."""
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set(("id", 99), None, ttl=0.01)
+    cache.set(("id", 1), {"id": 1})
+    time.sleep(0.02)
+
+    assert ("id", 99) not in cache
+    assert cache.get(("id", 1)) == {"id": 1}
+
+
+def test_reference_cache_invalidation_cascades():
+    """Invalidating countries also clears teams and leagues, which embed them."""
+    cache = ReferenceCache(maxsize=10, ttl=60)
+    cache.region("teams").set(1, {"id": 1})
+    cache.region("leagues").set("all", [])
+    cache.region("countries").set("all", [])
+
+    cache.invalidate("teams")
+    assert cache.versions == {"teams": 1, "countries": 0, "leagues": 0}
+    assert len(cache.region("teams")) == 0
+    assert len(cache.region("leagues")) == 1
+
+    cache.invalidate("countries")
+    assert cache.versions == {"teams": 2, "countries": 1, "leagues": 1}
+    assert len(cache.region("leagues")) == 0
+    assert len(cache.region("countries")) == 0
+
+
+def test_reference_cache_follows_shared_data_versions():
+    """A version bumped by another process (the worker) clears the region here."""
+    cache = ReferenceCache(maxsize=10, ttl=60)
+    cache.apply_data_versions({"teams": 1, "countries": 1, "leagues": 1})
+    cache.region("teams").set(1, {"id": 1})
+    cache.region("leagues").set("all", [])
+
+    cache.apply_data_versions({"teams": 1, "countries": 1, "leagues": 1})
+    assert len(cache.region("teams")) == 1
+
+    cache.apply_data_versions({"teams": 2, "countries": 1, "leagues": 1})
+    assert len(cache.region("teams")) == 0
+    assert len(cache.region("leagues")) == 1
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from cronjob.scheduler import Job, JobScheduler
+from services.job_valkey import RELEASE_LOCK_SCRIPT, EXTEND_LOCK_SCRIPT
+
+
+class FakeValkey:
+    """Just the commands JobValkey uses, shared by several 'workers'."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token, *args):
+        if self.strings.get(key) != token:
+            return 0
+        if script == RELEASE_LOCK_SCRIPT:
+            del self.strings[key]
+        assert script in (RELEASE_LOCK_SCRIPT, EXTEND_LOCK_SCRIPT)
+        return 1
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = str(int(values.get(field, 0)) + amount)
+
+
+@pytest.mark.asyncio
+async def test_job_runs_once_across_workers_and_triggers_dependents():
+    client = FakeValkey()
+    calls = []
+
+    async def fixtures(state):
+        calls.append("fixtures")
+        await asyncio.sleep(0.01)
+        return {"changed": True}
+
+    async def score(state):
+        calls.append("score")
+
+    def worker():
+        scheduler = JobScheduler(client)
+        scheduler.register(Job("fixtures", fixtures, interval=timedelta(hours=1), triggers=("score",)))
+        scheduler.register(Job("score", score, interval=timedelta(days=1)))
+        return scheduler
+
+    # score only becomes due when fixtures reports a change
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+    await client.hset("jobs:score:state", mapping={"next_run": tomorrow.isoformat()})
+
+    workers = [worker() for _ in range(3)]
+    await asyncio.gather(*(w.run_due_jobs() for w in workers))
+    assert calls.count("fixtures") == 1
+
+    await asyncio.gather(*(w.run_due_jobs() for w in workers))
+    assert calls == ["fixtures", "score"]
+    assert not client.strings  # every lock released
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_and_reports_error():
+    client = FakeValkey()
+
+    async def broken(state):
+        raise RuntimeError("quota exceeded")
+
+    scheduler = JobScheduler(client)
+    scheduler.register(Job("countries", broken, interval=timedelta(days=7)))
+    await scheduler.run_due_jobs()
+
+    state = await scheduler.job_valkey.get_state("countries")
+    assert "quota exceeded" in state["last_error"]
+    assert "last_success" not in state
+    assert state["next_run"] - state["last_finished"] == timedelta(minutes=10)
+
+
+@pytest.mark.asyncio
+async def test_slow_lane_does_not_block_other_jobs():
+    client = FakeValkey()
+    calls = []
+
+    async def fixtures(state):
+        calls.append("fixtures")
+        await asyncio.sleep(10)
+
+    async def live(state):
+        calls.append("live")
+        return {"next_run_in": 60}
+
+    scheduler = JobScheduler(client)
+    scheduler.register(Job("fixtures", fixtures, interval=timedelta(hours=1), lane="ingest"))
+    scheduler.register(Job("live", live, interval=timedelta(minutes=1)))
+
+    task = asyncio.create_task(scheduler.run_forever())
+    await asyncio.sleep(0.2)
+    assert calls == ["fixtures", "live"]
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert not client.strings  # the cancelled lane released its lock
+
+
+@pytest.mark.parametrize("offline", [False, True])
+def test_live_job_is_not_registered_offline(monkeypatch, offline):
+    import cronjob.jobs as jobs
+
+    monkeypatch.setattr(jobs, "API_FOOTBALL_OFFLINE", offline)
+    scheduler = jobs.build_scheduler(valkey_client=None)
+    assert ("live" in scheduler.jobs) is not offline
+    assert "fixtures" in scheduler.jobs